@@ -0,0 +1,187 @@
+import hashlib
+import json
+import os
+import shutil
+import time
+from concurrent.futures import ThreadPoolExecutor
+import joblib
+import numpy as np
+import pandas as pd
+
+ARTIFACT_FORMAT_VERSION = 1
+MANIFEST = "manifest.json"
+VERIFY_CHECKSUMS = os.getenv("ARTIFACT_VERIFY_CHECKSUMS", "1") == "1"
+
+try:
+    import pyarrow  # noqa: F401
+    HAS_PARQUET = True
+except ImportError:
+    HAS_PARQUET = False
+
+class ArtifactError(Exception):
+    pass
+
+# --- Versioned bundle directories: root/versions/<version>, with root/CURRENT naming the published one ---
+def current_version_path(root):
+    # Falls back to root itself for bundles written before versioning
+    pointer = os.path.join(root, "CURRENT")
+    if os.path.exists(pointer):
+        with open(pointer) as f:
+            path = os.path.join(root, "versions", f.read().strip())
+        if os.path.isdir(path):
+            return path
+    return root
+
+def publish_version(version, root, keep=3):
+    pointer = os.path.join(root, "CURRENT")
+    with open(pointer + ".tmp", "w") as f:
+        f.write(version)
+    os.replace(pointer + ".tmp", pointer)
+    versions_dir = os.path.join(root, "versions")
+    for old in sorted(os.listdir(versions_dir))[:-keep]:
+        if old != version:
+            shutil.rmtree(os.path.join(versions_dir, old), ignore_errors=True)
+
+def new_version_name():
+    return time.strftime("%Y%m%d-%H%M%S") + "-" + os.urandom(3).hex()
+
+def sha256_file(path, chunk_size=1 << 20):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(chunk_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+class ArtifactWriter:
+    """
+    Collects files for a bundle directory and writes manifest.json (format version, meta,
+    kind/size/sha256 per file) last, so a bundle without a manifest is never picked up.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.files = {}
+        os.makedirs(path, exist_ok=True)
+
+    def _file(self, name):
+        return os.path.join(self.path, name)
+
+    def add_array(self, name, arr):
+        with open(self._file(f"{name}.npy"), "wb") as f:
+            np.save(f, arr)
+        self.files[name] = {"file": f"{name}.npy", "kind": "npy"}
+
+    def add_frame(self, name, df):
+        # Columnar Parquet when pyarrow is installed, pandas pickle otherwise
+        if HAS_PARQUET:
+            df.to_parquet(self._file(f"{name}.parquet"))
+            self.files[name] = {"file": f"{name}.parquet", "kind": "parquet"}
+        else:
+            df.to_pickle(self._file(f"{name}.pkl"))
+            self.files[name] = {"file": f"{name}.pkl", "kind": "pandas_pickle"}
+
+    def add_xgb(self, name, model):
+        model.save_model(self._file(f"{name}.ubj"))
+        self.files[name] = {"file": f"{name}.ubj", "kind": "xgb"}
+
+    def add_object(self, name, obj):
+        joblib.dump(obj, self._file(f"{name}.joblib"))
+        self.files[name] = {"file": f"{name}.joblib", "kind": "joblib"}
+
+    def add_existing(self, name, relpath, kind):
+        # A file written by someone else (e.g. the feature store) that should still be checksummed
+        self.files[name] = {"file": relpath, "kind": kind}
+
+    def write(self, meta=None):
+        with ThreadPoolExecutor() as pool:
+            names = list(self.files)
+            digests = pool.map(lambda n: sha256_file(self._file(self.files[n]["file"])), names)
+            for name, digest in zip(names, digests):
+                self.files[name]["sha256"] = digest
+                self.files[name]["bytes"] = os.path.getsize(self._file(self.files[name]["file"]))
+        manifest = {
+            "format_version": ARTIFACT_FORMAT_VERSION,
+            "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "meta": meta or {},
+            "files": self.files,
+        }
+        tmp = self._file(MANIFEST + ".tmp")
+        with open(tmp, "w") as f:
+            json.dump(manifest, f, indent=2)
+        os.replace(tmp, self._file(MANIFEST))
+
+class ArtifactBundle:
+    """
+    Read side of ArtifactWriter. Files are loaded on first access with get(), or several at once
+    in parallel with get_many(). verify() checks sizes and checksums and raises ArtifactError.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        manifest_path = os.path.join(path, MANIFEST)
+        if not os.path.exists(manifest_path):
+            raise ArtifactError(f"No {MANIFEST} in {path}")
+        with open(manifest_path) as f:
+            self.manifest = json.load(f)
+        if self.manifest.get("format_version") != ARTIFACT_FORMAT_VERSION:
+            raise ArtifactError(
+                f"{path} has artifact format {self.manifest.get('format_version')}, "
+                f"expected {ARTIFACT_FORMAT_VERSION}"
+            )
+        self.meta = self.manifest.get("meta", {})
+        self.files = self.manifest["files"]
+        self._loaded = {}
+
+    @staticmethod
+    def exists(path):
+        return os.path.exists(os.path.join(path, MANIFEST))
+
+    def __contains__(self, name):
+        return name in self.files
+
+    def _file(self, name):
+        return os.path.join(self.path, self.files[name]["file"])
+
+    def _verify_one(self, name):
+        entry = self.files[name]
+        path = self._file(name)
+        if not os.path.exists(path):
+            raise ArtifactError(f"Missing artifact file {path}")
+        if os.path.getsize(path) != entry["bytes"]:
+            raise ArtifactError(f"Size mismatch for {path}")
+        if VERIFY_CHECKSUMS and sha256_file(path) != entry["sha256"]:
+            raise ArtifactError(f"Checksum mismatch for {path}")
+
+    def verify(self, names=None):
+        with ThreadPoolExecutor() as pool:
+            list(pool.map(self._verify_one, names or self.files))
+
+    def get(self, name):
+        if name not in self._loaded:
+            if name not in self.files:
+                raise ArtifactError(f"{self.path} has no artifact named {name}")
+            kind = self.files[name]["kind"]
+            path = self._file(name)
+            if kind == "npy":
+                value = np.load(path)
+            elif kind == "npy_mmap":
+                value = np.load(path, mmap_mode="r")
+            elif kind == "parquet":
+                value = pd.read_parquet(path)
+            elif kind == "pandas_pickle":
+                value = pd.read_pickle(path)
+            elif kind == "xgb":
+                from xgboost import XGBRegressor
+                value = XGBRegressor()
+                value.load_model(path)
+            elif kind == "joblib":
+                value = joblib.load(path)
+            else:
+                raise ArtifactError(f"Unknown artifact kind {kind} for {name}")
+            self._loaded[name] = value
+        return self._loaded[name]
+
+    def get_many(self, names):
+        with ThreadPoolExecutor() as pool:
+            values = list(pool.map(self.get, names))
+        return dict(zip(names, values))
@@ -2,13 +2,21 @@ from fastapi import Depends, HTTPException, status, Request
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
 from jose import JWTError, jwt
 from passlib.context import CryptContext
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from database import get_db
+from database import get_async_db
 from models import User
 from datetime import datetime, timedelta
 from starlette.requests import Request
 from dotenv import load_dotenv
+from collections import OrderedDict
+from typing import NamedTuple
+import asyncio
 import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 
 load_dotenv()
 
@@ -16,9 +24,15 @@ load_dotenv()
 SECRET_KEY = os.getenv("SECRET_KEY")
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
+USER_CACHE_TTL = int(os.getenv("USER_CACHE_TTL", "60"))
+USER_CACHE_SIZE = int(os.getenv("USER_CACHE_SIZE", "10000"))
+
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+PASSWORD_WORKERS = int(os.getenv("PASSWORD_WORKERS", "2"))
+PASSWORD_QUEUE_LIMIT = int(os.getenv("PASSWORD_QUEUE_LIMIT", "32"))
 
 # Password hashing
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=BCRYPT_ROUNDS)
 
 # OAuth2 for JWT
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
@@ -29,6 +43,60 @@ def verify_password(plain_password, hashed_password):
 def get_password_hash(password):
     return pwd_context.hash(password)
 
+class PasswordPool:
+    """
+    Runs bcrypt hashing/verification on a small dedicated thread pool so a burst of logins does
+    not block the event loop or starve the default threadpool. At most queue_limit operations
+    may be pending; beyond that callers get a 503 with Retry-After instead of queueing forever.
+    """
+
+    def __init__(self, workers=PASSWORD_WORKERS, queue_limit=PASSWORD_QUEUE_LIMIT):
+        self.workers = workers
+        self.queue_limit = queue_limit
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="bcrypt")
+        self.pending = 0
+        self.counters = {
+            "completed": 0, "rejected": 0, "max_pending": 0,
+            "wait_seconds_total": 0.0, "run_seconds_total": 0.0,
+        }
+
+    async def run(self, fn, *args):
+        # pending is only touched from the event loop thread
+        if self.pending >= self.queue_limit:
+            self.counters["rejected"] += 1
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Too many concurrent password operations, please retry",
+                headers={"Retry-After": "1"},
+            )
+        self.pending += 1
+        self.counters["max_pending"] = max(self.counters["max_pending"], self.pending)
+        queued_at = time.perf_counter()
+
+        def timed():
+            started = time.perf_counter()
+            return fn(*args), started - queued_at, time.perf_counter() - started
+
+        try:
+            result, waited, ran = await asyncio.get_running_loop().run_in_executor(self.executor, timed)
+        finally:
+            self.pending -= 1
+        self.counters["completed"] += 1
+        self.counters["wait_seconds_total"] += waited
+        self.counters["run_seconds_total"] += ran
+        return result
+
+    def stats(self):
+        return dict(self.counters, pending=self.pending, workers=self.workers, queue_limit=self.queue_limit)
+
+password_pool = PasswordPool()
+
+async def verify_password_async(plain_password, hashed_password):
+    return await password_pool.run(verify_password, plain_password, hashed_password)
+
+async def get_password_hash_async(password):
+    return await password_pool.run(get_password_hash, password)
+
 def create_access_token(data: dict, expires_delta: timedelta = None):
     to_encode = data.copy()
     if expires_delta:
@@ -39,7 +107,7 @@ def create_access_token(data: dict, expires_delta: timedelta = None):
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
-async def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)) -> User:
+async def get_current_user(token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_async_db)) -> User:
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
@@ -52,10 +120,82 @@ async def get_current_user(token: str = Depends(oauth2_scheme), db: Session = De
             raise credentials_exception
     except JWTError:
         raise credentials_exception
-    user = db.query(User).filter(User.username == username).first()
+    user = (await db.execute(select(User).where(User.username == username))).scalars().first()
     if user is None:
         raise credentials_exception
     return user
 
+class TokenUser(NamedTuple):
+    id: int
+    username: str
+    email: str
+
+# Token subject (username) -> (expires_at, TokenUser)
+_user_cache = OrderedDict()
+_user_cache_lock = threading.Lock()
+_user_cache_counters = {"hits": 0, "misses": 0, "evictions": 0}
+
+def user_cache_stats():
+    return dict(_user_cache_counters, size=len(_user_cache), max_entries=USER_CACHE_SIZE)
+
+def invalidate_user(username: str):
+    with _user_cache_lock:
+        _user_cache.pop(username, None)
+
+def _cached_user(username: str):
+    with _user_cache_lock:
+        entry = _user_cache.get(username)
+        if entry is None:
+            _user_cache_counters["misses"] += 1
+            return None
+        expires_at, user = entry
+        if expires_at <= time.monotonic():
+            del _user_cache[username]
+            _user_cache_counters["misses"] += 1
+            return None
+        _user_cache.move_to_end(username)
+        _user_cache_counters["hits"] += 1
+        return user
+
+def _cache_user(user: TokenUser):
+    with _user_cache_lock:
+        _user_cache[user.username] = (time.monotonic() + USER_CACHE_TTL, user)
+        _user_cache.move_to_end(user.username)
+        while len(_user_cache) > USER_CACHE_SIZE:
+            _user_cache.popitem(last=False)
+            _user_cache_counters["evictions"] += 1
+
+async def get_token_user(token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_async_db)) -> TokenUser:
+    """
+    Lightweight current user for endpoints that only need the id. Served from a short-TTL cache
+    keyed by the token subject; the DB is only hit on a miss. Tokens carrying a uid claim must
+    match the user found for their subject.
+    """
+    credentials_exception = HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Could not validate credentials",
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+    try:
+        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        username: str = payload.get("sub")
+        if username is None:
+            raise credentials_exception
+    except JWTError:
+        raise credentials_exception
+    user_id = payload.get("uid")
+    user = _cached_user(username)
+    if user is None:
+        row = (await db.execute(
+            select(User.id, User.username, User.email).where(User.username == username)
+        )).first()
+        if row is None:
+            raise credentials_exception
+        user = TokenUser(row.id, row.username, row.email)
+        _cache_user(user)
+    if user_id is not None and user_id != user.id:
+        raise credentials_exception
+    return user
+
 def get_user(db: Session, username: str):
     return db.query(User).filter(User.username == username).first()
\ No newline at end of file
@@ -0,0 +1,63 @@
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+import auth
+from auth import create_access_token, get_current_user, get_token_user, invalidate_user
+from models import Base, User
+
+# Microbenchmark for the per-request auth dependency: DB lookup on every call (get_current_user)
+# versus the cached token path (get_token_user) on hits and misses. Uses a temporary SQLite file
+# through aiosqlite, like the API's async session.
+
+def bench(label, fn, iterations):
+    started = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    elapsed = time.perf_counter() - started
+    print(f"{label:<32} {elapsed / iterations * 1e6:9.1f} us/call")
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--iterations", type=int, default=20000)
+    args = parser.parse_args()
+
+    if not auth.SECRET_KEY:
+        auth.SECRET_KEY = "bench-secret"
+    path = os.path.join(tempfile.mkdtemp(), "bench_auth.db")
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(bind=engine)
+    sync_db = sessionmaker(bind=engine)()
+    user = User(username="bench", email="bench@example.com", hashed_password="x")
+    sync_db.add(user)
+    sync_db.commit()
+    token = create_access_token({"sub": user.username, "uid": user.id})
+
+    loop = asyncio.new_event_loop()
+    run = loop.run_until_complete
+    async_engine = create_async_engine(f"sqlite+aiosqlite:///{path}", poolclass=StaticPool)
+    db = async_sessionmaker(async_engine, expire_on_commit=False)()
+    bench("jwt decode only", lambda: auth.jwt.decode(token, auth.SECRET_KEY, algorithms=[auth.ALGORITHM]), args.iterations)
+    bench("get_current_user (DB query)", lambda: run(get_current_user(token, db)), args.iterations)
+    run(get_token_user(token, db))
+    bench("get_token_user (cache hit)", lambda: run(get_token_user(token, db)), args.iterations)
+
+    def miss():
+        invalidate_user(user.username)
+        run(get_token_user(token, db))
+    bench("get_token_user (cache miss)", miss, args.iterations)
+    run(db.close())
+    run(async_engine.dispose())
+    loop.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from sqlalchemy import create_engine, select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+from database import async_database_url, pool_options
+from http_client import percentiles
+from models import Base, Movie, Rating, User
+
+# Throughput of the per-request query mix (user lookup, the user's ratings, a page of movies)
+# under concurrency, comparing blocking sync sessions called from async handlers (the old
+# setup, which serializes on the event loop) with AsyncSession on the async engine.
+#   python bench/bench_db_throughput.py                       # temporary SQLite file via aiosqlite
+#   python bench/bench_db_throughput.py --url postgresql://user:pw@localhost/bench
+
+def seed(url, users, movies, ratings_per_user):
+    engine = create_engine(url, **pool_options(url))
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(bind=engine)()
+    if db.query(User.id).filter(User.username == "bench_0").first() is None:
+        rng = random.Random(0)
+        first_movie = (db.query(Movie.id).order_by(Movie.id.desc()).limit(1).scalar() or 0) + 1
+        db.bulk_insert_mappings(Movie, [{
+            "id": first_movie + i, "titleType": "movie", "title": f"Bench movie {i}", "genres": "Drama",
+            "averageRating": rng.uniform(1, 10), "numVotes": rng.randint(0, 100000),
+        } for i in range(movies)])
+        db.bulk_insert_mappings(User, [
+            {"username": f"bench_{u}", "email": f"bench_{u}@example.com", "hashed_password": "x"} for u in range(users)
+        ])
+        db.commit()
+        user_ids = [i for (i,) in db.query(User.id).filter(User.username.like("bench_%"))]
+        db.bulk_insert_mappings(Rating, [
+            {"user_id": u, "movie_id": first_movie + rng.randrange(movies), "rating": rng.randint(1, 10)}
+            for u in user_ids for _ in range(ratings_per_user)
+        ])
+        db.commit()
+    db.close()
+    return engine
+
+def sync_request(db, username):
+    user = db.execute(select(User.id).where(User.username == username)).first()
+    ratings = db.execute(select(Rating.movie_id, Rating.rating).where(Rating.user_id == user.id)).all()
+    db.execute(select(Movie).where(Movie.id.in_([m for m, _ in ratings[:50]]))).scalars().all()
+
+async def async_request(db, username):
+    user = (await db.execute(select(User.id).where(User.username == username))).first()
+    ratings = (await db.execute(select(Rating.movie_id, Rating.rating).where(Rating.user_id == user.id))).all()
+    (await db.execute(select(Movie).where(Movie.id.in_([m for m, _ in ratings[:50]])))).scalars().all()
+
+async def drive(handler, requests, concurrency, users):
+    latencies = []
+    queue = asyncio.Queue()
+    for i in range(requests):
+        queue.put_nowait(f"bench_{i % users}")
+
+    async def worker():
+        while not queue.empty():
+            username = queue.get_nowait()
+            started = time.perf_counter()
+            await handler(username)
+            latencies.append((time.perf_counter() - started) * 1000)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    return dict(percentiles(latencies), requests_per_sec=requests / elapsed)
+
+async def main_async(args):
+    url = args.url or f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench_db.db')}"
+    engine = seed(url, args.users, args.movies, args.ratings_per_user)
+    SyncSession = sessionmaker(bind=engine)
+    async_engine = create_async_engine(async_database_url(url), **({} if url.startswith("sqlite") else pool_options(url)))
+    AsyncSessionLocal = async_sessionmaker(async_engine, expire_on_commit=False)
+
+    async def blocking_handler(username):
+        with SyncSession() as db:
+            sync_request(db, username)
+
+    async def async_handler(username):
+        async with AsyncSessionLocal() as db:
+            await async_request(db, username)
+
+    results = {"database": url.split("://")[0], "concurrency": args.concurrency, "requests": args.requests}
+    results["blocking_sync_session"] = await drive(blocking_handler, args.requests, args.concurrency, args.users)
+    results["async_session"] = await drive(async_handler, args.requests, args.concurrency, args.users)
+    await async_engine.dispose()
+    engine.dispose()
+    return results
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--url", help="sync database URL; defaults to a temporary SQLite file")
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--movies", type=int, default=5000)
+    parser.add_argument("--ratings-per-user", type=int, default=30)
+    args = parser.parse_args()
+    print(json.dumps(asyncio.run(main_async(args)), indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+import argparse
+import json
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from http_client import Client, percentiles
+
+# Measures /search and /recommendations latency for a logged-in user while a burst of logins
+# hits /token, to show whether bcrypt work stalls unrelated requests. Run against a live server:
+#   python bench/bench_login_burst.py --url http://localhost:8000 --logins 200 --concurrency 32
+
+def probe(client, token, stop, samples):
+    while not stop.is_set():
+        for method, path, body in (("POST", "/search", {"title": "the", "limit": 20}), ("GET", "/recommendations", None)):
+            status, _, elapsed = client.request(method, path, json_body=body, token=token)
+            if status == 200:
+                samples.setdefault(path, []).append(elapsed * 1000)
+
+def run_phase(client, token, duration, burst=None):
+    stop = threading.Event()
+    samples = {}
+    worker = threading.Thread(target=probe, args=(client, token, stop, samples))
+    worker.start()
+    login_stats = None
+    if burst:
+        login_stats = burst()
+    else:
+        time.sleep(duration)
+    stop.set()
+    worker.join()
+    summary = {path: dict(percentiles(ms), requests=len(ms)) for path, ms in samples.items()}
+    return summary, login_stats
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--logins", type=int, default=200, help="login attempts in the burst")
+    parser.add_argument("--concurrency", type=int, default=32, help="concurrent login threads")
+    parser.add_argument("--baseline-seconds", type=float, default=5.0)
+    args = parser.parse_args()
+
+    client = Client(args.url)
+    username, password = f"bench_{uuid.uuid4().hex[:8]}", "bench-password"
+    status, data, _ = client.request("POST", "/register", json_body={
+        "username": username, "email": f"{username}@example.com", "password": password,
+    })
+    if status != 200:
+        raise SystemExit(f"Register failed with HTTP {status}: {data}")
+    token = client.login(username, password)
+
+    def burst():
+        codes = {}
+        latencies = []
+        lock = threading.Lock()
+
+        def login(_):
+            status, _, elapsed = client.request("POST", "/token", form={"username": username, "password": password})
+            with lock:
+                codes[status] = codes.get(status, 0) + 1
+                latencies.append(elapsed * 1000)
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(args.concurrency) as pool:
+            list(pool.map(login, range(args.logins)))
+        elapsed = time.perf_counter() - started
+        return dict(percentiles(latencies), status_codes=codes, logins_per_sec=args.logins / elapsed)
+
+    baseline, _ = run_phase(client, token, args.baseline_seconds)
+    during, logins = run_phase(client, token, None, burst)
+    print(json.dumps({"baseline_ms": baseline, "during_burst_ms": during, "login_burst": logins}, indent=2))
+
+if __name__ == "__main__":
+    main()
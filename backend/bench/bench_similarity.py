@@ -0,0 +1,75 @@
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import numpy as np
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.preprocessing import MultiLabelBinarizer
+from bench_clustering import synthetic_genres
+from http_client import percentiles
+from recommender import split_comma_space
+from similarity import SimilarityIndex, item_embeddings
+
+# Build time, query latency and recall@k of the similar-titles IVF index against exact
+# brute-force cosine on the same embeddings, on a synthetic catalog with skewed crew names.
+#   python bench/bench_similarity.py --movies 200000 --n-probe 4 8 16
+
+def synthetic_names(n, pool, rng, prefix):
+    # 1-3 names per title, a few prolific people and a long tail
+    people = np.minimum(rng.zipf(1.3, 3 * n), pool) - 1
+    counts = rng.integers(1, 4, n)
+    starts = np.concatenate([[0], np.cumsum(counts)[:-1]])
+    return [", ".join(f"{prefix} {p}" for p in dict.fromkeys(people[s:s + c])) for s, c in zip(starts, counts)]
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--movies", type=int, default=100000)
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--n-probe", type=int, nargs="+", default=[1, 4, 8, 16])
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    genres_lists = synthetic_genres(args.movies, rng)
+    directors = synthetic_names(args.movies, args.movies // 3, rng, "Director")
+    writers = synthetic_names(args.movies, args.movies // 2, rng, "Writer")
+    mlb = MultiLabelBinarizer().fit(genres_lists)
+    vectorizer = lambda: TfidfVectorizer(tokenizer=split_comma_space, lowercase=False, token_pattern=None)
+    embeddings = item_embeddings(genres_lists, directors, writers, mlb, vectorizer().fit(directors), vectorizer().fit(writers))
+
+    started = time.perf_counter()
+    index = SimilarityIndex.build(np.arange(1, args.movies + 1), embeddings)
+    results = {"movies": args.movies, "lists": len(index.centroids), "build_seconds": time.perf_counter() - started}
+    print(f"Index built for {args.movies} movies ({len(index.centroids)} lists) in {results['build_seconds']:.2f}s")
+
+    queries = rng.choice(args.movies, args.queries, replace=False) + 1
+    exact = {}
+    timings = []
+    for movie_id in queries:
+        started = time.perf_counter()
+        similarity = (embeddings @ embeddings[movie_id - 1].T).toarray().ravel()
+        similarity[movie_id - 1] = -np.inf
+        exact[movie_id] = set(np.argpartition(-similarity, args.k)[:args.k] + 1)
+        timings.append(time.perf_counter() - started)
+    results["brute_force"] = {k: v * 1000 for k, v in percentiles(timings).items()}
+
+    for n_probe in args.n_probe:
+        timings, hits = [], 0
+        for movie_id in queries:
+            started = time.perf_counter()
+            found, _ = index.similar(movie_id, args.k, n_probe)
+            timings.append(time.perf_counter() - started)
+            hits += len(exact[movie_id] & set(found))
+        results[f"n_probe_{n_probe}"] = dict(
+            {k: v * 1000 for k, v in percentiles(timings).items()}, recall=hits / (args.k * len(queries))
+        )
+        print(f"n_probe={n_probe:<3} p50 {results[f'n_probe_{n_probe}']['p50']:.2f} ms  recall@{args.k} {hits / (args.k * len(queries)):.3f}")
+    print(json.dumps(results, indent=2))
+
+if __name__ == "__main__":
+    main()
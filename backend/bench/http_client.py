@@ -0,0 +1,67 @@
+import http.client
+import json
+import threading
+import time
+from urllib.parse import urlencode, urlsplit
+
+# Tiny stdlib HTTP client for the bench scripts: one keep-alive connection per thread.
+
+class Client:
+    def __init__(self, base_url, timeout=30):
+        parts = urlsplit(base_url)
+        self.host = parts.hostname
+        self.port = parts.port or (443 if parts.scheme == "https" else 80)
+        self.https = parts.scheme == "https"
+        self.timeout = timeout
+        self.local = threading.local()
+
+    def _connection(self):
+        conn = getattr(self.local, "conn", None)
+        if conn is None:
+            cls = http.client.HTTPSConnection if self.https else http.client.HTTPConnection
+            conn = self.local.conn = cls(self.host, self.port, timeout=self.timeout)
+        return conn
+
+    def request(self, method, path, params=None, json_body=None, form=None, token=None):
+        """Return (status, parsed body or raw bytes, seconds)."""
+        headers = {}
+        body = None
+        if params:
+            path = f"{path}?{urlencode(params)}"
+        if json_body is not None:
+            body = json.dumps(json_body)
+            headers["Content-Type"] = "application/json"
+        elif form is not None:
+            body = urlencode(form)
+            headers["Content-Type"] = "application/x-www-form-urlencoded"
+        if token:
+            headers["Authorization"] = f"Bearer {token}"
+        started = time.perf_counter()
+        try:
+            conn = self._connection()
+            conn.request(method, path, body=body, headers=headers)
+            response = conn.getresponse()
+            data = response.read()
+        except (http.client.HTTPException, OSError):
+            # Drop the broken connection so the next call reconnects
+            self.local.conn = None
+            return 0, None, time.perf_counter() - started
+        elapsed = time.perf_counter() - started
+        if response.getheader("Content-Type", "").startswith("application/json"):
+            try:
+                data = json.loads(data)
+            except ValueError:
+                pass
+        return response.status, data, elapsed
+
+    def login(self, username, password):
+        status, data, _ = self.request("POST", "/token", form={"username": username, "password": password})
+        if status != 200:
+            raise RuntimeError(f"Login as {username} failed with HTTP {status}: {data}")
+        return data["access_token"]
+
+def percentiles(samples, points=(50, 95, 99)):
+    if not samples:
+        return {f"p{p}": None for p in points}
+    ordered = sorted(samples)
+    return {f"p{p}": ordered[min(len(ordered) - 1, int(round(p / 100 * (len(ordered) - 1))))] for p in points}
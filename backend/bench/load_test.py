@@ -0,0 +1,171 @@
+import argparse
+import json
+import os
+import random
+import subprocess
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from http_client import Client, percentiles
+
+# Drives a running API with concurrent clients and writes per-endpoint throughput and latency
+# percentiles as JSON, tagged with the git commit, so runs can be compared between commits.
+# Seed the database first with bench/seed_catalog.py, start uvicorn against it, then:
+#   python bench/load_test.py --url http://localhost:8000 --clients 32 --duration 60
+#   python bench/load_test.py ... --baseline bench/results/<earlier run>.json
+
+# Relative share of each operation in the request mix
+DEFAULT_MIX = {"search": 40, "top10": 20, "recommendations": 15, "predict": 15, "rate": 8, "token": 2}
+
+def git_commit():
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=os.path.dirname(__file__), text=True
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+class Recorder:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.latencies = {}
+        self.statuses = {}
+
+    def record(self, endpoint, status, seconds):
+        with self.lock:
+            self.latencies.setdefault(endpoint, []).append(seconds * 1000)
+            codes = self.statuses.setdefault(endpoint, {})
+            codes[str(status)] = codes.get(str(status), 0) + 1
+
+    def summary(self, elapsed):
+        result = {}
+        for endpoint, ms in sorted(self.latencies.items()):
+            codes = self.statuses[endpoint]
+            errors = sum(n for code, n in codes.items() if not code.startswith("2"))
+            result[endpoint] = dict(
+                percentiles(ms),
+                mean=sum(ms) / len(ms),
+                requests=len(ms),
+                errors=errors,
+                status_codes=codes,
+                requests_per_sec=len(ms) / elapsed,
+            )
+        return result
+
+def virtual_client(client, manifest, mix, deadline, recorder, rng):
+    username = rng.choice(manifest["users"])
+    status, data, elapsed = client.request(
+        "POST", "/token", form={"username": username, "password": manifest["password"]}
+    )
+    recorder.record("POST /token", status, elapsed)
+    if status != 200:
+        return
+    token = data["access_token"]
+    ops, weights = zip(*mix.items())
+    low, high = manifest["min_movie_id"], manifest["max_movie_id"]
+    while time.monotonic() < deadline:
+        op = rng.choices(ops, weights)[0]
+        if op == "search":
+            body = {"title": rng.choice(manifest["title_words"]), "limit": 20}
+            if rng.random() < 0.3:
+                body["genres"] = rng.choice(manifest["genres"])
+            status, _, elapsed = client.request("POST", "/search", json_body=body, token=token)
+            recorder.record("POST /search", status, elapsed)
+        elif op == "top10":
+            status, _, elapsed = client.request("GET", "/top10", token=token)
+            recorder.record("GET /top10", status, elapsed)
+        elif op == "recommendations":
+            status, _, elapsed = client.request("GET", "/recommendations", token=token)
+            recorder.record("GET /recommendations", status, elapsed)
+        elif op == "predict":
+            status, _, elapsed = client.request("POST", f"/predict/{rng.randint(low, high)}", token=token)
+            recorder.record("POST /predict/{movie_id}", status, elapsed)
+        elif op == "rate":
+            body = {"movie_id": rng.randint(low, high), "rating": rng.randint(1, 10)}
+            status, _, elapsed = client.request("POST", "/rate", json_body=body, token=token)
+            recorder.record("POST /rate", status, elapsed)
+        elif op == "token":
+            status, _, elapsed = client.request(
+                "POST", "/token", form={"username": username, "password": manifest["password"]}
+            )
+            recorder.record("POST /token", status, elapsed)
+
+def compare(current, baseline):
+    # Relative change of p50/p99/throughput against an earlier run, per endpoint
+    lines = []
+    for endpoint, stats in current["endpoints"].items():
+        before = baseline.get("endpoints", {}).get(endpoint)
+        if not before:
+            continue
+        deltas = []
+        for key in ("p50", "p99", "requests_per_sec"):
+            if before.get(key):
+                deltas.append(f"{key} {100 * (stats[key] - before[key]) / before[key]:+.1f}%")
+        lines.append(f"{endpoint:<28} {'  '.join(deltas)}")
+    return "\n".join(lines)
+
+def main():
+    parser = argparse.ArgumentParser(description="Concurrent load test for the MovieMatch API.")
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--manifest", default=os.path.join(os.path.dirname(__file__), "seed_manifest.json"))
+    parser.add_argument("--clients", type=int, default=16, help="concurrent virtual clients")
+    parser.add_argument("--duration", type=float, default=30.0, help="seconds of load per client")
+    parser.add_argument("--warmup", type=float, default=5.0, help="seconds of unrecorded load first")
+    parser.add_argument("--mix", type=json.loads, default=DEFAULT_MIX, help='JSON weights, e.g. {"search": 1}')
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", help="result JSON path (default bench/results/load-<commit>-<time>.json)")
+    parser.add_argument("--baseline", help="earlier result JSON to compare against")
+    args = parser.parse_args()
+
+    with open(args.manifest) as f:
+        manifest = json.load(f)
+    client = Client(args.url)
+
+    def run(duration, recorder):
+        deadline = time.monotonic() + duration
+        with ThreadPoolExecutor(args.clients) as pool:
+            futures = [
+                pool.submit(virtual_client, client, manifest, args.mix, deadline, recorder,
+                            random.Random(args.seed * 1000 + i))
+                for i in range(args.clients)
+            ]
+        for future in futures:
+            future.result()
+
+    if args.warmup > 0:
+        run(args.warmup, Recorder())
+    recorder = Recorder()
+    started = time.perf_counter()
+    run(args.duration, recorder)
+    elapsed = time.perf_counter() - started
+
+    endpoints = recorder.summary(elapsed)
+    result = {
+        "commit": git_commit(),
+        "started_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "url": args.url,
+        "clients": args.clients,
+        "duration_seconds": elapsed,
+        "mix": args.mix,
+        "catalog": {k: manifest[k] for k in ("database", "movies", "ratings")},
+        "total_requests_per_sec": sum(s["requests"] for s in endpoints.values()) / elapsed,
+        "endpoints": endpoints,
+    }
+    out = args.out or os.path.join(
+        os.path.dirname(__file__), "results", f"load-{result['commit'] or 'nogit'}-{time.strftime('%Y%m%d-%H%M%S')}.json"
+    )
+    os.makedirs(os.path.dirname(os.path.abspath(out)), exist_ok=True)
+    with open(out, "w") as f:
+        json.dump(result, f, indent=2)
+
+    for endpoint, stats in endpoints.items():
+        print(f"{endpoint:<28} {stats['requests_per_sec']:8.1f} req/s  p50 {stats['p50']:7.1f}ms  "
+              f"p95 {stats['p95']:7.1f}ms  p99 {stats['p99']:7.1f}ms  errors {stats['errors']}")
+    print(f"Results written to {out}")
+    if args.baseline:
+        with open(args.baseline) as f:
+            print(compare(result, json.load(f)))
+
+if __name__ == "__main__":
+    main()
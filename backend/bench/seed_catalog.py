@@ -0,0 +1,131 @@
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import numpy as np
+import pandas as pd
+from database import SQLALCHEMY_DATABASE_URL, SessionLocal, engine
+from load_imdb import MOVIE_COLUMNS, load_imdb_data
+from models import Movie, Rating, User
+from auth import get_password_hash
+from search_index import build_search_tables
+
+# Seeds a synthetic catalog, users and ratings at a configurable scale into DATABASE_URL for the
+# load tests, and writes a manifest that bench/load_test.py reads (users, password, id range,
+# title words). Movies go through load_imdb.py, so the import path is exercised as well.
+#   DATABASE_URL=sqlite:///bench.db python bench/seed_catalog.py --movies 100000 --ratings 1000000
+
+GENRES = [
+    "Action", "Adventure", "Animation", "Biography", "Comedy", "Crime", "Documentary", "Drama",
+    "Family", "Fantasy", "History", "Horror", "Music", "Mystery", "Romance", "Sci-Fi", "Sport",
+    "Thriller", "War", "Western",
+]
+TITLE_WORDS = [
+    "night", "love", "city", "last", "dark", "house", "war", "man", "girl", "story", "blood", "day",
+    "king", "summer", "river", "road", "star", "secret", "ghost", "heart", "time", "world", "home",
+]
+SEED_PASSWORD = "load-test-password"
+
+def _log(msg):
+    print(f"{time.strftime('%H:%M:%S')} - {msg}")
+
+def synthetic_movies(n, rng, first_id=1):
+    genre_count = rng.integers(1, 4, n)
+    genres = [",".join(sorted(rng.choice(GENRES, k, replace=False))) for k in genre_count]
+    words = rng.choice(TITLE_WORDS, (n, 3))
+    people = max(n // 5, 10)
+    ids = np.arange(first_id, first_id + n)
+    return pd.DataFrame({
+        "id": ids,
+        "tconst": [f"tt{i:07d}" for i in ids],
+        "titleType": rng.choice(["movie", "tvSeries", "tvMiniSeries"], n, p=[0.8, 0.15, 0.05]),
+        "title": [f"The {a.title()} {b.title()} {c.title()} {i}" for i, (a, b, c) in enumerate(words)],
+        "startYear": rng.integers(1920, 2025, n),
+        "endYear": pd.array([None] * n, dtype="Int64"),
+        "runtimeMinutes": rng.integers(60, 200, n),
+        "genres": genres,
+        "totalEpisodes": pd.array([None] * n, dtype="Int64"),
+        "directors": [f"Director {d}" for d in rng.integers(0, people, n)],
+        "writers": [f"Writer {a}, Writer {b}" for a, b in rng.integers(0, people, (n, 2))],
+        "averageRating": np.round(np.clip(rng.normal(6.5, 1.2, n), 1, 10), 1),
+        # Heavy-tailed vote counts so the VOTE_THRESHOLD filter keeps a realistic share
+        "numVotes": np.minimum(rng.pareto(1.2, n) * 200, 3_000_000).astype(np.int64),
+    })[MOVIE_COLUMNS]
+
+def seed_users(db, n_users):
+    hashed = get_password_hash(SEED_PASSWORD)  # one bcrypt for every seeded user
+    existing = {u for (u,) in db.query(User.username).filter(User.username.like("load_%"))}
+    db.bulk_insert_mappings(User, [
+        {"username": f"load_{i}", "email": f"load_{i}@example.com", "hashed_password": hashed}
+        for i in range(n_users) if f"load_{i}" not in existing
+    ])
+    db.commit()
+    return [i for (i,) in db.query(User.id).filter(User.username.like("load_%")).order_by(User.id)]
+
+def seed_ratings(db, user_ids, movie_ids, n_ratings, rng, chunksize=50000):
+    # Popular titles get most ratings, like real traffic; one rating per (user, movie)
+    weights = np.sort(rng.pareto(1.1, len(movie_ids)))[::-1] + 1e-3
+    weights /= weights.sum()
+    users = rng.choice(user_ids, n_ratings)
+    movies = rng.choice(movie_ids, n_ratings, p=weights)
+    pairs = pd.DataFrame({"user_id": users, "movie_id": movies}).drop_duplicates()
+    pairs["rating"] = rng.integers(1, 11, len(pairs)).astype(float)
+    started = time.perf_counter()
+    for start in range(0, len(pairs), chunksize):
+        db.bulk_insert_mappings(Rating, pairs.iloc[start:start + chunksize].to_dict("records"))
+        db.commit()
+    _log(f"Seeded {len(pairs)} ratings in {time.perf_counter() - started:.1f}s")
+    return len(pairs)
+
+def main():
+    parser = argparse.ArgumentParser(description="Seed a synthetic catalog for load testing.")
+    parser.add_argument("--movies", type=int, default=10000)
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--ratings", type=int, default=100000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--chunksize", type=int, default=20000)
+    parser.add_argument("--manifest", default=os.path.join(os.path.dirname(__file__), "seed_manifest.json"))
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    Movie.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    try:
+        if db.query(Movie.id).first() is not None:
+            raise SystemExit("The movies table is not empty; point DATABASE_URL at a fresh database.")
+        csv_path = os.path.join(tempfile.mkdtemp(), "synthetic_imdb.csv")
+        started = time.perf_counter()
+        for start in range(0, args.movies, args.chunksize):
+            chunk = synthetic_movies(min(args.chunksize, args.movies - start), rng, first_id=start + 1)
+            chunk.to_csv(csv_path, mode="a", header=start == 0, index=False)
+        _log(f"Generated {args.movies} movies in {time.perf_counter() - started:.1f}s")
+        load_imdb_data(csv_path, chunksize=args.chunksize)
+        build_search_tables(db)
+        user_ids = seed_users(db, args.users)
+        n_ratings = seed_ratings(db, np.array(user_ids), np.arange(1, args.movies + 1), args.ratings, rng)
+    finally:
+        db.close()
+
+    manifest = {
+        "database": SQLALCHEMY_DATABASE_URL.split("://")[0],
+        "movies": args.movies,
+        "min_movie_id": 1,
+        "max_movie_id": args.movies,
+        "users": [f"load_{i}" for i in range(args.users)],
+        "password": SEED_PASSWORD,
+        "ratings": n_ratings,
+        "title_words": TITLE_WORDS,
+        "genres": GENRES,
+        "seed": args.seed,
+    }
+    with open(args.manifest, "w") as f:
+        json.dump(manifest, f, indent=2)
+    _log(f"Manifest written to {args.manifest}. Train the predictor with: python train_predictor.py")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,25 @@
+from sqlalchemy import func, inspect, text
+from sqlalchemy.orm import Session
+from models import CatalogVersion, Movie
+
+def catalog_signature(db: Session) -> str:
+    # Cheap fingerprint of the movies table, used to tell whether derived artifacts are stale
+    count, max_id, votes, rating = db.query(
+        func.count(Movie.id), func.max(Movie.id), func.sum(Movie.numVotes), func.sum(Movie.averageRating)
+    ).one()
+    version = db.query(func.max(CatalogVersion.id)).scalar() or 0
+    return f"v{version}-{count}-{max_id or 0}-{votes or 0}-{round(rating or 0.0, 2)}"
+
+def ensure_catalog_schema(engine):
+    # create_all does not add columns to existing tables; movies gained tconst after the first release
+    Movie.metadata.create_all(bind=engine)
+    if "tconst" not in {c["name"] for c in inspect(engine).get_columns("movies")}:
+        with engine.begin() as connection:
+            connection.execute(text("ALTER TABLE movies ADD COLUMN tconst VARCHAR"))
+            connection.execute(text("CREATE UNIQUE INDEX IF NOT EXISTS ix_movies_tconst ON movies (tconst)"))
+
+def bump_catalog_version(db: Session, source=None, added=0, updated=0) -> int:
+    entry = CatalogVersion(source=source, added=added, updated=updated)
+    db.add(entry)
+    db.commit()
+    return entry.id
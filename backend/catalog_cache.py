@@ -0,0 +1,126 @@
+import threading
+import time
+from collections import OrderedDict, namedtuple
+from sqlalchemy.orm import Session
+from catalog import catalog_signature
+from models import Movie
+
+MOVIE_FIELDS = [
+    "id", "titleType", "title", "startYear", "endYear", "runtimeMinutes",
+    "genres", "totalEpisodes", "directors", "writers", "averageRating", "numVotes"
+]
+CachedMovie = namedtuple("CachedMovie", MOVIE_FIELDS)
+TOP_LIST_SIZE = 100
+
+def _freeze(movie):
+    return CachedMovie(*(getattr(movie, f) for f in MOVIE_FIELDS))
+
+class CatalogCache:
+    """
+    Read-through cache for catalog data that only changes on import: an immutable snapshot with
+    the top lists and the genre list, plus an LRU/TTL cache of single movies by id. Everything is
+    dropped when the catalog signature changes, which is re-checked every version_check_seconds.
+    """
+
+    def __init__(self, max_entries=20000, ttl_seconds=600, version_check_seconds=30):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.version_check_seconds = version_check_seconds
+        self.version = None
+        self._version_checked_at = 0.0
+        self._snapshot = {}
+        self._movies = OrderedDict()
+        self._lock = threading.Lock()
+        self.counters = {"hits": 0, "misses": 0, "evictions": 0, "expired": 0, "invalidations": 0}
+
+    def _check_version(self, db: Session):
+        now = time.monotonic()
+        if now - self._version_checked_at < self.version_check_seconds:
+            return
+        version = catalog_signature(db)
+        with self._lock:
+            self._version_checked_at = now
+            if version != self.version:
+                if self.version is not None:
+                    self.counters["invalidations"] += 1
+                self.version = version
+                self._snapshot = {}
+                self._movies.clear()
+
+    def current_version(self, db: Session):
+        """Catalog signature as of the last version check (at most version_check_seconds old)."""
+        self._check_version(db)
+        return self.version
+
+    def invalidate(self):
+        with self._lock:
+            self._version_checked_at = 0.0
+            self.version = None
+            self._snapshot = {}
+            self._movies.clear()
+            self.counters["invalidations"] += 1
+
+    def _snapshot_value(self, key, build):
+        with self._lock:
+            snapshot = self._snapshot
+            if key in snapshot:
+                self.counters["hits"] += 1
+                return snapshot[key]
+            self.counters["misses"] += 1
+        value = build()  # outside the lock: it queries the database
+        with self._lock:
+            # Dropped if the snapshot was replaced meanwhile, so a stale build is not published
+            snapshot[key] = value
+        return value
+
+    def top_movies(self, db: Session, n=10):
+        self._check_version(db)
+        if n > TOP_LIST_SIZE:
+            return tuple(_freeze(m) for m in db.query(Movie).order_by(Movie.numVotes.desc()).limit(n))
+        top = self._snapshot_value(
+            "top_by_votes",
+            lambda: tuple(_freeze(m) for m in db.query(Movie).order_by(Movie.numVotes.desc()).limit(TOP_LIST_SIZE))
+        )
+        return top[:n]
+
+    def genres(self, db: Session):
+        self._check_version(db)
+
+        def build():
+            genres = set()
+            for g in db.query(Movie.genres).distinct():
+                if g[0]:
+                    for genre in g[0].split(","):
+                        genres.add(genre.strip())
+            return tuple(sorted(genres))
+
+        return self._snapshot_value("genres", build)
+
+    def get_movie(self, db: Session, movie_id: int):
+        """Cached Movie row as a CachedMovie (None if it does not exist)."""
+        self._check_version(db)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._movies.get(movie_id)
+            if entry is not None:
+                expires_at, movie = entry
+                if expires_at > now:
+                    self._movies.move_to_end(movie_id)
+                    self.counters["hits"] += 1
+                    return movie
+                del self._movies[movie_id]
+                self.counters["expired"] += 1
+            self.counters["misses"] += 1
+        row = db.query(Movie).filter(Movie.id == movie_id).first()
+        movie = _freeze(row) if row is not None else None
+        with self._lock:
+            self._movies[movie_id] = (now + self.ttl_seconds, movie)
+            self._movies.move_to_end(movie_id)
+            while len(self._movies) > self.max_entries:
+                self._movies.popitem(last=False)
+                self.counters["evictions"] += 1
+        return movie
+
+    def stats(self):
+        with self._lock:
+            return dict(self.counters, version=self.version, cached_movies=len(self._movies))
@@ -0,0 +1,128 @@
+import os
+import numpy as np
+import pandas as pd
+from scipy import sparse
+from sklearn.cluster import KMeans, MiniBatchKMeans
+
+N_CLUSTERS = 50
+CLUSTER_ENGINE = os.getenv("CLUSTER_ENGINE", "kmeans")  # kmeans or minibatch
+CLUSTER_BATCH_SIZE = int(os.getenv("CLUSTER_BATCH_SIZE", "4096"))
+CLUSTER_EPOCHS = int(os.getenv("CLUSTER_EPOCHS", "10"))  # passes over the encoded batches in fit_batches
+_SEP = "\x1f"  # genre labels may themselves contain commas
+
+class GenreClusterer:
+    """
+    Clusters movies on their genre sets. Movies are reduced to their distinct genre combinations
+    (a few hundred to a few thousand on the real catalog) with counts as sample weights, encoded
+    as a sparse CSR matrix with each genre once. Doubling the genre block, as the feature store
+    does, scales every distance by the same factor, so the partition is unchanged;
+    cluster_centers_ is reported in the doubled layout to stay comparable with the feature store.
+    """
+
+    def __init__(self, mlb_genres, n_clusters=N_CLUSTERS, engine=CLUSTER_ENGINE,
+                 batch_size=CLUSTER_BATCH_SIZE, random_state=42, init_centers=None):
+        if engine not in ("kmeans", "minibatch"):
+            raise ValueError("Unknown clustering engine: choose 'kmeans' or 'minibatch'")
+        self.classes = {g: i for i, g in enumerate(mlb_genres.classes_)}
+        self.n_clusters = n_clusters
+        self.engine = engine
+        self.batch_size = batch_size
+        self.random_state = random_state
+        init = self._init_from(init_centers)
+        if engine == "kmeans":
+            self.model = KMeans(
+                n_clusters=n_clusters, random_state=random_state,
+                init=init if init is not None else "k-means++", n_init=1 if init is not None else 10
+            )
+        else:
+            self.model = MiniBatchKMeans(
+                n_clusters=n_clusters, random_state=random_state, batch_size=batch_size,
+                init=init if init is not None else "k-means++", n_init=1 if init is not None else 3
+            )
+
+    def _init_from(self, centers):
+        # Warm start from previously published centroids (doubled layout) when the shapes still match
+        if centers is None:
+            return None
+        centers = np.asarray(centers, dtype=float)
+        n_genres = len(self.classes)
+        if centers.shape != (self.n_clusters, 2 * n_genres):
+            return None
+        return centers[:, :n_genres]
+
+    def encode(self, genres_lists):
+        """Return (CSR of distinct genre combinations, their counts, combination index per movie)."""
+        keys = [
+            _SEP.join(sorted({g for g in genres if g in self.classes})) if isinstance(genres, list) else ""
+            for genres in genres_lists
+        ]
+        codes, combos = pd.factorize(pd.Series(keys, dtype=object))
+        weights = np.bincount(codes, minlength=len(combos)).astype(float)
+        rows, cols = [], []
+        for row, combo in enumerate(combos):
+            for genre in combo.split(_SEP) if combo else ():
+                rows.append(row)
+                cols.append(self.classes[genre])
+        matrix = sparse.csr_matrix(
+            (np.ones(len(rows), dtype=np.float32), (rows, cols)), shape=(len(combos), len(self.classes))
+        )
+        return matrix, weights, codes
+
+    def fit(self, genres_lists):
+        """Fit on all movies and return one cluster label per movie."""
+        matrix, weights, codes = self.encode(genres_lists)
+        if matrix.shape[0] < self.n_clusters:
+            # Fewer distinct combinations than clusters (tiny catalogs): fit on every movie instead
+            self.model.fit(matrix[codes])
+        else:
+            self.model.fit(matrix, sample_weight=weights)
+        return self.model.predict(matrix)[codes]
+
+    def partial_fit(self, genres_lists):
+        # For streaming the catalog in chunks; minibatch engine only
+        if self.engine != "minibatch":
+            raise ValueError("partial_fit requires the minibatch engine")
+        matrix, weights, _ = self.encode(genres_lists)
+        self.model.partial_fit(matrix, sample_weight=weights)
+        return self
+
+    def fit_batches(self, batches, n_epochs=CLUSTER_EPOCHS):
+        """
+        Minibatch fit over an iterable of genre-list batches, e.g. streamed from the database. Each
+        batch is kept only as its distinct combinations, and those are replayed with partial_fit for
+        n_epochs passes; labels come from predict afterwards.
+        """
+        if self.engine != "minibatch":
+            raise ValueError("fit_batches requires the minibatch engine")
+        encoded, pending = [], []
+        for genres_lists in batches:
+            # The first partial_fit needs at least n_clusters rows, so small batches are merged
+            pending.extend(genres_lists)
+            matrix, weights, _ = self.encode(pending)
+            if encoded or matrix.shape[0] >= self.n_clusters:
+                encoded.append((matrix, weights))
+                pending = []
+        if not encoded:
+            # The whole catalog has fewer combinations than clusters
+            self.fit(pending)
+            return self
+        if pending:
+            encoded.append(self.encode(pending)[:2])
+        for _ in range(n_epochs):
+            for matrix, weights in encoded:
+                self.model.partial_fit(matrix, sample_weight=weights)
+        return self
+
+    def predict(self, genres_lists):
+        matrix, _, codes = self.encode(genres_lists)
+        return self.model.predict(matrix)[codes]
+
+    @property
+    def cluster_centers_(self):
+        centers = self.model.cluster_centers_
+        return np.hstack([centers, centers])
+
+    @property
+    def inertia_(self):
+        # In the doubled space, like the previous dense KMeans
+        return 2 * self.model.inertia_
@@ -1,116 +1,157 @@
+import argparse
+import csv
+import os
+import resource
+import time
 import pandas as pd
-import numpy as np
-import re
 
-# Load datasets
-title_basics = pd.read_csv("title.basics.tsv", sep='\t', na_values='\\N', dtype=str)
-title_crew = pd.read_csv("title.crew.tsv", sep='\t', na_values='\\N', dtype=str)
-title_episode = pd.read_csv("title.episode.tsv", sep='\t', na_values='\\N', dtype=str)
-title_ratings = pd.read_csv("title.ratings.tsv", sep='\t', na_values='\\N', dtype=str)
-name_basics = pd.read_csv("name.basics.tsv", sep='\t', na_values='\\N', dtype=str)
-
-# Remove unwanted columns from title_basics
-title_basics = title_basics.drop(columns=["originalTitle", "isAdult"])
-
-# Remove entries with titleType == "tvEpisode"
-title_basics = title_basics[title_basics["titleType"] != "tvEpisode"]
-
-# Convert startYear and endYear to numeric and remove titles before 1920
-title_basics["startYear"] = pd.to_numeric(title_basics["startYear"], errors="coerce")
-title_basics["endYear"] = pd.to_numeric(title_basics["endYear"], errors="coerce")
-title_basics = title_basics[title_basics["startYear"] >= 1920]
-
-# Convert runtimeMinutes to numeric
-title_basics["runtimeMinutes"] = pd.to_numeric(title_basics["runtimeMinutes"], errors="coerce")
-
-# Aggregate episode data
-episode_counts = title_episode.groupby("parentTconst").agg(
-    totalEpisodes=("tconst", "count")
-).reset_index()
-
-# Merge episode count into title_basics on tconst == parentTconst
-title_basics = title_basics.merge(episode_counts, left_on="tconst", right_on="parentTconst", how="left")
-title_basics = title_basics.drop(columns=["parentTconst"])
-
-# Merge crew data
-title_combined = title_basics.merge(title_crew, on="tconst", how="left")
-
-# Replace nconsts with primary names
-nconst_map = name_basics.set_index("nconst")["primaryName"].to_dict()
-
-def nconsts_to_names(nconst_str):
-    if pd.isna(nconst_str):
-        return np.nan
-    names = []
-    for n in str(nconst_str).split(","):
-        n = str(n).strip()
-        names.append(str(nconst_map.get(n, n)))
-    return ", ".join(names)
-
-title_combined["directors"] = title_combined["directors"].apply(nconsts_to_names)
-title_combined["writers"] = title_combined["writers"].apply(nconsts_to_names)
-
-# Merge ratings data
-title_combined = title_combined.merge(title_ratings, on="tconst", how="left")
-
-# Convert numVotes to numeric and filter titles with at least 1000 votes
-title_combined["numVotes"] = pd.to_numeric(title_combined["numVotes"], errors="coerce")
-title_combined = title_combined[title_combined["numVotes"] >= 1000]
-
-# Convert all specified columns to integer, replacing NaN with 0 where appropriate
-title_combined["startYear"] = title_combined["startYear"].fillna(0).astype(int)
-title_combined["endYear"] = title_combined["endYear"].fillna(0).astype(int)
-title_combined["runtimeMinutes"] = title_combined["runtimeMinutes"].fillna(0).astype(int)
-title_combined["totalEpisodes"] = title_combined["totalEpisodes"].fillna(0).astype(int)
-title_combined["numVotes"] = title_combined["numVotes"].astype(int)
-
-# Filter out entries where titleType is 'video' or 'videoGame'
-title_combined = title_combined[~title_combined["titleType"].isin(["video", "videoGame"])]
-
-# Remove quotation marks from all string columns (in the DataFrame)
-string_columns = title_combined.select_dtypes(include=["object"]).columns
-for column in string_columns:
-    title_combined[column] = title_combined[column].astype(str).str.replace('"', '', regex=False)
-
-# Debug: Print a few rows to verify quotation marks are removed from the DataFrame
-print("Sample rows before saving (first 2 rows):")
-print(title_combined.head(2).to_string())
-
-# Filter: keep only titles with Latin alphabet (including Romanian diacritics)
-latin_pattern = re.compile(r'^[\w\s\-\',:;.!?ăĂâÂîÎșȘțȚéÉöÖüÜäÄßçÇñÑøØåÅèÈ]+$')
-
-def is_latin(s):
-    if pd.isna(s):
-        return False
-    return bool(latin_pattern.match(s))
-
-title_combined = title_combined[title_combined["primaryTitle"].apply(is_latin)]
-
-# Replace tconst with integer id starting from 1 after all filtering
-title_combined["id"] = range(1, len(title_combined) + 1)
-title_combined = title_combined.drop(columns=["tconst"])
-
-# Move id column to the first position
-cols = ['id'] + [col for col in title_combined.columns if col != 'id']
-title_combined = title_combined[cols]
-
-# Change "primaryTitle" column to "title"
-title_combined.rename(columns={"primaryTitle": "title"}, inplace=True)
-
-# Replace 0 with NULL for 'endYear' and 'totalEpisodes'
-title_combined['endYear'] = title_combined['endYear'].replace(0, pd.NA)
-title_combined['totalEpisodes'] = title_combined['totalEpisodes'].replace(0, pd.NA)
-
-# Save final CSV as imdb.csv with default quoting (will add quotes around fields with commas)
-title_combined.to_csv("imdb.csv", index=False)
-
-print("Data processing complete. Final CSV saved as imdb.csv")
-
-# Debug: Read and print the first few lines of the saved CSV to verify
-with open("imdb.csv", "r", encoding="utf-8") as f:
-    print("\nFirst 3 lines of imdb.csv:")
-    for i, line in enumerate(f):
-        if i < 3:  # Print first 3 lines
-            print(line.strip())
-        else:
-            break
\ No newline at end of file
+# Builds imdb.csv (and imdb.parquet when pyarrow is installed) from the IMDb TSV dumps.
+# Every TSV is streamed in chunks with only the needed columns, titles are filtered (type,
+# year, votes, Latin title) before any join, and crew nconsts are resolved with explode/merge
+# against only the names that are actually referenced.
+#   python dataset_merging.py --data-dir . --out-dir .
+
+MIN_VOTES = 1000
+MIN_YEAR = 1920
+EXCLUDED_TYPES = ["tvEpisode", "video", "videoGame"]
+OUTPUT_COLUMNS = [
+    "id", "tconst", "titleType", "title", "startYear", "endYear", "runtimeMinutes",
+    "genres", "totalEpisodes", "directors", "writers", "averageRating", "numVotes"
+]
+
+# Keep only titles with Latin alphabet (including Romanian diacritics)
+LATIN_PATTERN = r'^[\w\s\-\',:;.!?ăĂâÂîÎșȘțȚéÉöÖüÜäÄßçÇñÑøØåÅèÈ]+$'
+
+def peak_memory_mb():
+    # ru_maxrss is in KiB on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+def log_stage(name, started):
+    print(f"{time.strftime('%H:%M:%S')} - {name}: {time.perf_counter() - started:.1f}s, peak RSS {peak_memory_mb():.0f} MB")
+
+def read_tsv(data_dir, name, usecols, dtype, chunksize):
+    # IMDb dumps are unquoted TSV with \N for nulls
+    return pd.read_csv(
+        os.path.join(data_dir, name), sep="\t", na_values="\\N", usecols=usecols, dtype=dtype,
+        quoting=csv.QUOTE_NONE, chunksize=chunksize
+    )
+
+def load_ratings(data_dir, chunksize, min_votes):
+    chunks = read_tsv(
+        data_dir, "title.ratings.tsv", ["tconst", "averageRating", "numVotes"],
+        {"tconst": str, "averageRating": "float64", "numVotes": "int32"}, chunksize
+    )
+    return pd.concat(c[c["numVotes"] >= min_votes] for c in chunks).set_index("tconst")
+
+def load_titles(data_dir, chunksize, keep):
+    usecols = ["tconst", "titleType", "primaryTitle", "startYear", "endYear", "runtimeMinutes", "genres"]
+    dtype = {
+        "tconst": str, "titleType": "category", "primaryTitle": str, "startYear": "float32",
+        "endYear": "float32", "runtimeMinutes": str, "genres": str,
+    }
+    parts = []
+    for chunk in read_tsv(data_dir, "title.basics.tsv", usecols, dtype, chunksize):
+        chunk = chunk[
+            chunk["tconst"].isin(keep)
+            & ~chunk["titleType"].isin(EXCLUDED_TYPES)
+            & (chunk["startYear"] >= MIN_YEAR)
+        ].copy()
+        chunk["primaryTitle"] = chunk["primaryTitle"].str.replace('"', '', regex=False)
+        chunk = chunk[chunk["primaryTitle"].str.match(LATIN_PATTERN, na=False)].copy()
+        # runtimeMinutes has a few non-numeric values in the dump
+        chunk["runtimeMinutes"] = pd.to_numeric(chunk["runtimeMinutes"], errors="coerce").astype("float32")
+        chunk["titleType"] = chunk["titleType"].astype(str)
+        parts.append(chunk)
+    return pd.concat(parts, ignore_index=True)
+
+def count_episodes(data_dir, chunksize, keep):
+    counts = None
+    for chunk in read_tsv(data_dir, "title.episode.tsv", ["parentTconst"], {"parentTconst": str}, chunksize):
+        part = chunk.loc[chunk["parentTconst"].isin(keep), "parentTconst"].value_counts()
+        counts = part if counts is None else counts.add(part, fill_value=0)
+    return counts.rename("totalEpisodes") if counts is not None else pd.Series(name="totalEpisodes", dtype="int64")
+
+def load_crew(data_dir, chunksize, keep):
+    chunks = read_tsv(data_dir, "title.crew.tsv", ["tconst", "directors", "writers"], str, chunksize)
+    return pd.concat(c[c["tconst"].isin(keep)] for c in chunks)
+
+def resolve_names(data_dir, chunksize, crew):
+    """Map each title's comma-separated nconsts to "Name One, Name Two" for directors and writers."""
+    long = crew.melt(id_vars="tconst", value_vars=["directors", "writers"], var_name="role", value_name="nconst")
+    long = long.dropna(subset=["nconst"])
+    long["nconst"] = long["nconst"].str.split(",")
+    long = long.explode("nconst", ignore_index=True)
+    long["nconst"] = long["nconst"].str.strip()
+
+    needed = set(long["nconst"].unique())
+    names = pd.concat(
+        c[c["nconst"].isin(needed)]
+        for c in read_tsv(data_dir, "name.basics.tsv", ["nconst", "primaryName"], str, chunksize)
+    )
+    long = long.merge(names, on="nconst", how="left", sort=False)
+    # Unknown nconsts are kept as-is, like before
+    long["primaryName"] = long["primaryName"].fillna(long["nconst"])
+    joined = long.groupby(["tconst", "role"], sort=False)["primaryName"].agg(", ".join)
+    return joined.unstack("role").reindex(columns=["directors", "writers"])
+
+def merge_datasets(data_dir=".", out_dir=".", chunksize=500000, min_votes=MIN_VOTES):
+    started = time.perf_counter()
+    stage = time.perf_counter()
+    ratings = load_ratings(data_dir, chunksize, min_votes)
+    log_stage(f"Ratings with >= {min_votes} votes: {len(ratings)}", stage)
+
+    stage = time.perf_counter()
+    titles = load_titles(data_dir, chunksize, ratings.index)
+    keep = pd.Index(titles["tconst"])
+    log_stage(f"Titles after type/year/votes/title filters: {len(titles)}", stage)
+
+    stage = time.perf_counter()
+    episodes = count_episodes(data_dir, chunksize, keep)
+    log_stage(f"Episode counts for {len(episodes)} series", stage)
+
+    stage = time.perf_counter()
+    crew = resolve_names(data_dir, chunksize, load_crew(data_dir, chunksize, keep))
+    log_stage(f"Crew names resolved for {len(crew)} titles", stage)
+
+    stage = time.perf_counter()
+    combined = (
+        titles.set_index("tconst")
+        .join(episodes)
+        .join(crew)
+        .join(ratings)
+        .reset_index()
+        .rename(columns={"primaryTitle": "title"})
+    )
+    combined["startYear"] = combined["startYear"].astype("int32")
+    combined["runtimeMinutes"] = combined["runtimeMinutes"].fillna(0).astype("int32")
+    combined["endYear"] = combined["endYear"].astype("Int32")
+    combined["totalEpisodes"] = combined["totalEpisodes"].astype("Int32")
+    for column in ("genres", "directors", "writers"):
+        combined[column] = combined[column].str.replace('"', '', regex=False)
+    combined["id"] = range(1, len(combined) + 1)
+    combined = combined[OUTPUT_COLUMNS]
+    log_stage("Merged", stage)
+
+    stage = time.perf_counter()
+    os.makedirs(out_dir, exist_ok=True)
+    combined.to_csv(os.path.join(out_dir, "imdb.csv"), index=False)
+    try:
+        combined.to_parquet(os.path.join(out_dir, "imdb.parquet"), index=False)
+    except ImportError:
+        print("pyarrow is not installed; skipping imdb.parquet")
+    log_stage(f"Wrote {len(combined)} titles to {out_dir}", stage)
+    print(
+        f"{time.strftime('%H:%M:%S')} - Data processing complete in {time.perf_counter() - started:.1f}s, "
+        f"peak RSS {peak_memory_mb():.0f} MB"
+    )
+    print(combined.head(3).to_string())
+    return combined
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Merge the IMDb TSV dumps into imdb.csv / imdb.parquet.")
+    parser.add_argument("--data-dir", default=".", help="directory with the *.tsv files")
+    parser.add_argument("--out-dir", default=".", help="where imdb.csv and imdb.parquet are written")
+    parser.add_argument("--chunksize", type=int, default=500000, help="TSV rows per chunk")
+    parser.add_argument("--min-votes", type=int, default=MIN_VOTES)
+    args = parser.parse_args()
+    merge_datasets(args.data_dir, args.out_dir, args.chunksize, args.min_votes)
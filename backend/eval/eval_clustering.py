@@ -1,5 +1,10 @@
+import argparse
+import json
 import os
 import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
 import numpy as np
 import matplotlib
 matplotlib.use('Agg')
@@ -10,41 +15,136 @@ sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 from sklearn.cluster import KMeans
 from sklearn.metrics import silhouette_score
-from recommender import Recommender
-from database import get_db
-
-os.makedirs("eval", exist_ok=True)
-db = next(get_db())
-recommender = Recommender(db)
-# Asigură-te că ai acces la datele de intrare pentru clustering
-if hasattr(recommender, "features"):
-    features = recommender.features
-else:
-    # Reconstruiește features dacă nu există ca atribut
-    # Poți folosi movie_data fără coloanele non-numerice
-    features = recommender.movie_data.drop(columns=["title", "startYear"], errors="ignore").values
-
-inertias = []
-silhouettes = []
-K = range(2, 21)
-for k in K:
-    kmeans = KMeans(n_clusters=k, random_state=42, n_init=10)
-    labels = kmeans.fit_predict(features)
-    inertias.append(kmeans.inertia_)
-    silhouettes.append(silhouette_score(features, labels))
-
-plt.figure(figsize=(12,5))
-plt.subplot(1,2,1)
-plt.plot(K, inertias, 'bx-')
-plt.xlabel('k')
-plt.ylabel('Inertia')
-plt.title('Elbow Method')
-plt.subplot(1,2,2)
-plt.plot(K, silhouettes, 'rx-')
-plt.xlabel('k')
-plt.ylabel('Silhouette Score')
-plt.title('Silhouette Score')
-plt.tight_layout()
-plt.savefig("eval/kmeans_eval.svg")
-plt.close()
-print("KMeans evaluation plots saved to eval/kmeans_eval.svg")
\ No newline at end of file
+from threadpoolctl import threadpool_limits
+
+# Elbow/silhouette sweep over k for the genre clustering. The feature matrix is read once from the
+# published feature store (or built from the database without fitting anything), each k runs in
+# a worker process on the deduplicated rows with counts as weights, and the silhouette score is
+# computed on a fixed-seed sample. Per-k metrics and timings go to eval/kmeans_eval.json.
+
+_features = None
+_unique = None
+_weights = None
+_inverse = None
+
+def load_features():
+    """Return (genre feature matrix, catalog version), preferring the published feature store."""
+    from feature_store import FeatureStore
+    from recommender import current_artifact_path
+    path = os.path.join(current_artifact_path(), "features")
+    if os.path.exists(os.path.join(path, "meta.json")):
+        store = FeatureStore.load(path)
+        return np.asarray(store.genre_features, dtype=np.float32), store.catalog_version
+
+    from sklearn.preprocessing import MultiLabelBinarizer
+    from catalog import catalog_signature
+    from database import SessionLocal
+    from models import Movie
+    from recommender import split_comma_space
+    db = SessionLocal()
+    try:
+        genres_lists = [split_comma_space(g) for (g,) in db.query(Movie.genres)]
+        version = catalog_signature(db)
+    finally:
+        db.close()
+    encoded = MultiLabelBinarizer().fit_transform(genres_lists).astype(np.float32)
+    return np.hstack([encoded, encoded]), version
+
+def _init_worker(features_path, threads):
+    # The matrix is memory-mapped, so all workers share one page-cached copy
+    global _features, _unique, _weights, _inverse
+    threadpool_limits(threads)
+    _features = np.load(features_path, mmap_mode="r")
+    _unique, _inverse, counts = np.unique(np.asarray(_features), axis=0, return_inverse=True, return_counts=True)
+    _inverse = _inverse.ravel()
+    _weights = counts.astype(float)
+
+def _evaluate(k, n_init, sample_size, seed):
+    started = time.perf_counter()
+    kmeans = KMeans(n_clusters=k, random_state=seed, n_init=n_init)
+    kmeans.fit(_unique, sample_weight=_weights)
+    labels = kmeans.labels_[_inverse]
+    fit_seconds = time.perf_counter() - started
+
+    started = time.perf_counter()
+    if len(np.unique(labels)) > 1:
+        silhouette = float(silhouette_score(
+            _features, labels, sample_size=min(sample_size, len(labels)) if sample_size else None, random_state=seed
+        ))
+    else:
+        silhouette = None
+    return {
+        "k": k,
+        "inertia": float(kmeans.inertia_),
+        "silhouette": silhouette,
+        "n_iter": int(kmeans.n_iter_),
+        "fit_seconds": fit_seconds,
+        "silhouette_seconds": time.perf_counter() - started,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Parallel k sweep for the genre clustering.")
+    parser.add_argument("--k-min", type=int, default=2)
+    parser.add_argument("--k-max", type=int, default=20)
+    parser.add_argument("--n-init", type=int, default=10)
+    parser.add_argument("--sample-size", type=int, default=20000, help="silhouette sample size (0 = all rows, O(n^2))")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--threads-per-worker", type=int, default=1)
+    parser.add_argument("--out-dir", default="eval")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    os.makedirs(args.out_dir, exist_ok=True)
+    features, catalog_version = load_features()
+    features_path = os.path.join(tempfile.mkdtemp(), "genre_features.npy")
+    np.save(features_path, features)
+    n_unique = len(np.unique(features, axis=0))
+    print(f"{time.strftime('%H:%M:%S')} - {len(features)} movies, {n_unique} distinct genre rows, catalog {catalog_version}")
+
+    K = list(range(args.k_min, min(args.k_max, n_unique) + 1))
+    with ProcessPoolExecutor(args.workers, initializer=_init_worker,
+                             initargs=(features_path, args.threads_per_worker)) as pool:
+        futures = [pool.submit(_evaluate, k, args.n_init, args.sample_size, args.seed) for k in K]
+        results = []
+        for future in futures:
+            result = future.result()
+            results.append(result)
+            print(f"{time.strftime('%H:%M:%S')} - k={result['k']}: inertia {result['inertia']:.1f}, "
+                  f"silhouette {result['silhouette']}, fit {result['fit_seconds']:.1f}s, "
+                  f"silhouette {result['silhouette_seconds']:.1f}s")
+    os.remove(features_path)
+
+    report = {
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "catalog_version": catalog_version,
+        "movies": len(features),
+        "distinct_rows": n_unique,
+        "n_init": args.n_init,
+        "sample_size": args.sample_size or None,
+        "seed": args.seed,
+        "workers": args.workers,
+        "total_seconds": time.perf_counter() - started,
+        "results": results,
+    }
+    with open(os.path.join(args.out_dir, "kmeans_eval.json"), "w") as f:
+        json.dump(report, f, indent=2)
+
+    plt.figure(figsize=(12,5))
+    plt.subplot(1,2,1)
+    plt.plot(K, [r["inertia"] for r in results], 'bx-')
+    plt.xlabel('k')
+    plt.ylabel('Inertia')
+    plt.title('Elbow Method')
+    plt.subplot(1,2,2)
+    plt.plot(K, [r["silhouette"] for r in results], 'rx-')
+    plt.xlabel('k')
+    plt.ylabel('Silhouette Score')
+    plt.title('Silhouette Score')
+    plt.tight_layout()
+    plt.savefig(os.path.join(args.out_dir, "kmeans_eval.svg"))
+    plt.close()
+    print(f"KMeans evaluation plots saved to {args.out_dir}/kmeans_eval.svg, metrics to {args.out_dir}/kmeans_eval.json")
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,6 @@
 import os
 import sys
+import time
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 import numpy as np
 import matplotlib
@@ -7,38 +8,35 @@ matplotlib.use('Agg')
 import matplotlib.pyplot as plt
 from sklearn.metrics import classification_report, confusion_matrix, accuracy_score
 from database import get_db
-from models import Movie, Rating
-from recommender import Recommender
+from recommender import load_or_fit_recommender
 from predict import RatingPredictor
-from utils import extract_features
+from training_data import iter_rating_batches
 
 os.makedirs("eval", exist_ok=True)
 db = next(get_db())
-recommender = Recommender(db)
-movies = db.query(Movie).all()
-ratings = db.query(Rating).all()
+recommender = load_or_fit_recommender(db)
 mlb_genres = recommender.mlb_genres
 
 rating_predictor = RatingPredictor(model_dir="models")
 rating_predictor.load()
 
-# Prepare data
-X = []
-y = []
-for r in ratings:
-    movie = next((m for m in movies if m.id == r.movie_id), None)
-    if movie:
-        X.append(extract_features(movie, mlb_genres))
-        y.append(int(round(r.rating)))
-X = np.array(X)
-y = np.array(y)
-
-# Predict with XGBoost
-y_pred_xgb = rating_predictor.xgb.predict(rating_predictor.scaler.transform(X))
-y_pred_xgb = np.clip(np.round(y_pred_xgb), 1, 10).astype(int)
-# Predict with Random Forest
-y_pred_rf = rating_predictor.rf.predict(rating_predictor.scaler.transform(X))
-y_pred_rf = np.clip(np.round(y_pred_rf), 1, 10).astype(int)
+# Stream rating/movie batches joined in SQL and predict each batch with both models
+timings = {}
+y, y_pred_xgb, y_pred_rf = [], [], []
+predict_seconds = 0.0
+for X_batch, y_batch in iter_rating_batches(db, mlb_genres, feature_store=recommender.feature_store, timings=timings):
+    started = time.perf_counter()
+    X_scaled = rating_predictor.scaler.transform(X_batch)
+    y.append(np.round(y_batch).astype(int))
+    # Predict with XGBoost
+    y_pred_xgb.append(np.clip(np.round(rating_predictor.xgb.predict(X_scaled)), 1, 10).astype(int))
+    # Predict with Random Forest
+    y_pred_rf.append(np.clip(np.round(rating_predictor.rf.predict(X_scaled)), 1, 10).astype(int))
+    predict_seconds += time.perf_counter() - started
+y = np.concatenate(y)
+y_pred_xgb = np.concatenate(y_pred_xgb)
+y_pred_rf = np.concatenate(y_pred_rf)
+print(f"Loaded {len(y)} ratings in {timings.get('load', 0.0):.2f}s, predicted in {predict_seconds:.2f}s")
 
 # Classification report and confusion matrix for XGBoost
 report_xgb = classification_report(y, y_pred_xgb, digits=4)
@@ -0,0 +1,76 @@
+import json
+import os
+import numpy as np
+import pandas as pd
+
+class FeatureStore:
+    """
+    Float32 movie feature matrix (doubled genres + averageRating + numVotes, see utils.extract_features)
+    with an id -> row index. Saved as .npy and opened with mmap_mode="r", so every process
+    reading the same catalog version shares one page-cached copy.
+    """
+
+    def __init__(self, matrix=None, ids=None, n_genres=0, catalog_version=None):
+        self.matrix = matrix
+        self.ids = ids
+        self.n_genres = n_genres
+        self.catalog_version = catalog_version
+        self._index = pd.Index(ids) if ids is not None else None
+
+    def __len__(self):
+        return 0 if self.ids is None else len(self.ids)
+
+    @property
+    def genre_features(self):
+        # The doubled genre block used for clustering
+        return self.matrix[:, :2 * self.n_genres]
+
+    def positions(self, ids):
+        return self._index.get_indexer(np.asarray(ids))
+
+    def contains_all(self, ids):
+        return self._index is not None and bool((self.positions(ids) >= 0).all())
+
+    def rows(self, ids):
+        pos = self.positions(ids)
+        if (pos < 0).any():
+            raise KeyError("Movie ids missing from the feature store")
+        return np.asarray(self.matrix[pos])
+
+    def with_rows(self, ids, rows, catalog_version):
+        """Copy with the given rows replaced (known ids) or appended (new ids)."""
+        ids = np.asarray(ids)
+        pos = self.positions(ids)
+        known = pos >= 0
+        matrix = np.array(self.matrix, dtype=np.float32)  # writable copy of the (possibly mmapped) matrix
+        matrix[pos[known]] = rows[known]
+        return FeatureStore(
+            np.vstack([matrix, rows[~known].astype(np.float32)]),
+            np.concatenate([self.ids, ids[~known]]),
+            self.n_genres,
+            catalog_version,
+        )
+
+    def save(self, path):
+        meta_path = os.path.join(path, "meta.json")
+        if os.path.exists(meta_path):
+            with open(meta_path) as f:
+                meta = json.load(f)
+            if meta.get("catalog_version") == self.catalog_version and meta.get("rows") == len(self):
+                return  # already written for this catalog version
+        os.makedirs(path, exist_ok=True)
+        for name, arr in (("features.npy", self.matrix.astype(np.float32)), ("ids.npy", self.ids)):
+            tmp = os.path.join(path, name + ".tmp")
+            with open(tmp, "wb") as f:
+                np.save(f, arr)
+            os.replace(tmp, os.path.join(path, name))
+        with open(meta_path, "w") as f:
+            json.dump({"catalog_version": self.catalog_version, "rows": len(self), "n_genres": self.n_genres}, f)
+
+    @classmethod
+    def load(cls, path):
+        with open(os.path.join(path, "meta.json")) as f:
+            meta = json.load(f)
+        matrix = np.load(os.path.join(path, "features.npy"), mmap_mode="r")
+        ids = np.load(os.path.join(path, "ids.npy"))
+        return cls(matrix, ids, meta["n_genres"], meta["catalog_version"])
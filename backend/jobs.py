@@ -0,0 +1,87 @@
+import multiprocessing
+import os
+import time
+import threading
+import traceback
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from recommender import ARTIFACT_ROOT, new_version_name, publish_artifacts
+
+MAX_JOBS = 50  # finished jobs kept for the status endpoint; older ones are dropped
+
+def _retrain(root):
+    # Runs in a worker process: fit from the database and write a new versioned artifact dir
+    from database import SessionLocal
+    from recommender import Recommender, previous_centers, previous_genre_encoder
+    db = SessionLocal()
+    try:
+        started = time.perf_counter()
+        recommender = Recommender(db, init_centers=previous_centers(root), mlb_genres=previous_genre_encoder(root))
+        version = new_version_name()
+        recommender.save(os.path.join(root, "versions", version))
+        return version, time.perf_counter() - started
+    finally:
+        db.close()
+
+class RetrainJobs:
+    """
+    Runs Recommender retraining in a separate process. When a job finishes, on_ready(path) builds
+    the new model from the written artifacts, the caller swaps its reference, and the version is
+    published as CURRENT.
+    """
+
+    def __init__(self, on_ready, root=ARTIFACT_ROOT):
+        self.on_ready = on_ready
+        self.root = root
+        self.jobs = {}
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def submit(self):
+        with self._lock:
+            running = next((j for j in self.jobs.values() if j["status"] == "running"), None)
+            if running is not None:
+                return dict(running)
+            if self._executor is None:
+                # spawn, not fork: a forked child would inherit the parent's DB pool sockets and the
+                # state of its running threads (bcrypt pool, event loop)
+                self._executor = ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn"))
+            self._prune()
+            job_id = uuid.uuid4().hex
+            self.jobs[job_id] = {
+                "job_id": job_id,
+                "status": "running",
+                "submitted_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                "finished_at": None,
+                "version": None,
+                "train_seconds": None,
+                "error": None,
+            }
+            future = self._executor.submit(_retrain, self.root)
+        future.add_done_callback(lambda f: self._finish(job_id, f))
+        return dict(self.jobs[job_id])
+
+    def _prune(self):
+        finished = [job_id for job_id, job in self.jobs.items() if job["status"] != "running"]
+        for job_id in finished[:max(0, len(self.jobs) - MAX_JOBS + 1)]:
+            del self.jobs[job_id]
+
+    def _finish(self, job_id, future):
+        job = self.jobs[job_id]
+        try:
+            version, seconds = future.result()
+            self.on_ready(os.path.join(self.root, "versions", version))
+            publish_artifacts(version, self.root)
+            job.update(status="done", version=version, train_seconds=round(seconds, 2))
+        except Exception as e:
+            traceback.print_exc()
+            job.update(status="failed", error=str(e))
+        job["finished_at"] = time.strftime("%Y-%m-%dT%H:%M:%S")
+
+    def status(self, job_id):
+        job = self.jobs.get(job_id)
+        return dict(job) if job is not None else None
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,281 @@
+import argparse
+import io
+import time
+import pandas as pd
+import os
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+from catalog import bump_catalog_version, ensure_catalog_schema
+from database import engine, SessionLocal
+from models import Movie
+from search_index import build_search_tables
+
+MOVIE_COLUMNS = [
+    "id", "tconst", "titleType", "title", "startYear", "endYear", "runtimeMinutes",
+    "genres", "totalEpisodes", "directors", "writers", "averageRating", "numVotes"
+]
+# Columns diffed by the delta refresh; TEXT_COLUMNS feed the search tables and recommender genres
+COMPARE_COLUMNS = [c for c in MOVIE_COLUMNS if c not in ("id", "tconst")]
+TEXT_COLUMNS = ["title", "genres", "directors", "writers"]
+CSV_DTYPES = {
+    "id": "int64",
+    "tconst": "str",
+    "startYear": "Int64",
+    "endYear": "Int64",
+    "runtimeMinutes": "Int64",
+    "totalEpisodes": "Int64",
+    "averageRating": "float64",
+    "numVotes": "Int64",
+}
+
+def _log(msg):
+    print(f"{time.strftime('%H:%M:%S')} - {msg}")
+
+def read_chunks(csv_path, chunksize):
+    # CSVs from before the tconst column still load; their tconst is left empty
+    chunks = pd.read_csv(csv_path, usecols=lambda c: c in MOVIE_COLUMNS, dtype=CSV_DTYPES, chunksize=chunksize)
+    for chunk in chunks:
+        yield chunk.reindex(columns=MOVIE_COLUMNS)
+
+def _copy_upsert(connection, chunk: pd.DataFrame, conflict="id"):
+    # COPY the chunk into a temp staging table, then upsert it into movies on conflict (id or tconst).
+    # Stored ids and tconsts are never overwritten, so a CSV without tconst cannot clear them.
+    columns = ", ".join(f'"{c}"' for c in MOVIE_COLUMNS)
+    updates = ", ".join(f'"{c}" = EXCLUDED."{c}"' for c in MOVIE_COLUMNS if c not in ("id", "tconst"))
+    buf = io.StringIO()
+    chunk[MOVIE_COLUMNS].to_csv(buf, index=False, header=False, na_rep="")
+    buf.seek(0)
+    cursor = connection.cursor()
+    try:
+        cursor.execute("CREATE TEMP TABLE IF NOT EXISTS movies_staging (LIKE movies INCLUDING DEFAULTS)")
+        cursor.execute("TRUNCATE movies_staging")
+        cursor.copy_expert(f"COPY movies_staging ({columns}) FROM STDIN WITH (FORMAT csv)", buf)
+        cursor.execute(
+            f"INSERT INTO movies ({columns}) SELECT {columns} FROM movies_staging "
+            f'ON CONFLICT ("{conflict}") DO UPDATE SET {updates}'
+        )
+        connection.commit()
+    except Exception:
+        connection.rollback()
+        raise
+    finally:
+        cursor.close()
+
+def _mappings_upsert(db: Session, chunk: pd.DataFrame):
+    # Upserts on id, so rows with a tconst must already carry the stored id (see _resolve_ids)
+    rows = chunk[MOVIE_COLUMNS].astype(object).where(chunk[MOVIE_COLUMNS].notna(), None).to_dict("records")
+    ids = [row["id"] for row in rows]
+    existing = {i for (i,) in db.query(Movie.id).filter(Movie.id.in_(ids))}
+    db.bulk_update_mappings(Movie, [
+        {c: v for c, v in row.items() if c != "tconst" or v is not None} for row in rows if row["id"] in existing
+    ])
+    db.bulk_insert_mappings(Movie, [row for row in rows if row["id"] not in existing])
+    db.commit()
+
+def _resolve_ids(db: Session, chunk: pd.DataFrame, next_id):
+    """
+    Rows with a tconst take the id already stored for it, so ratings stay attached. Unseen titles
+    keep their CSV id unless another title holds it, and then get a fresh id from next_id.
+    Returns (chunk, next_id).
+    """
+    chunk = chunk.copy()
+    keyed = chunk["tconst"].notna()
+    stored = dict(db.query(Movie.tconst, Movie.id).filter(Movie.tconst.in_(chunk.loc[keyed, "tconst"].tolist())))
+    matched = keyed & chunk["tconst"].isin(list(stored))
+    chunk.loc[matched, "id"] = chunk.loc[matched, "tconst"].map(stored)
+    unseen = keyed & ~matched
+    taken = {i for (i,) in db.query(Movie.id).filter(Movie.id.in_(chunk.loc[unseen, "id"].tolist()))}
+    clash = unseen & chunk["id"].isin(taken)
+    if clash.any():
+        # Past every CSV id in the chunk too, so a fresh id cannot collide with a row inserted alongside it
+        next_id = max(next_id, int(chunk["id"].max()) + 1)
+        chunk.loc[clash, "id"] = range(next_id, next_id + int(clash.sum()))
+        next_id += int(clash.sum())
+    return chunk, next_id
+
+def _upsert(db: Session, raw_connection, chunk: pd.DataFrame):
+    if raw_connection is None:
+        _mappings_upsert(db, chunk)
+        return
+    keyed = chunk["tconst"].notna()
+    if keyed.any():
+        _copy_upsert(raw_connection, chunk[keyed], conflict="tconst")
+    if not keyed.all():
+        _copy_upsert(raw_connection, chunk[~keyed])
+
+def load_imdb_data(csv_path="imdb.csv", chunksize=10000, resume=False):
+    """
+    Stream imdb.csv into the movies table in chunks, upserting on tconst (on id for rows without one).
+    Uses COPY into a staging table on PostgreSQL and bulk mappings elsewhere.
+    Every chunk is committed on its own, so an interrupted import can simply be rerun.
+    """
+    ensure_catalog_schema(engine)
+    db = SessionLocal()
+    untagged = db.query(func.count(Movie.id)).filter(Movie.tconst.is_(None)).scalar()
+    if untagged and "tconst" in pd.read_csv(csv_path, nrows=0).columns:
+        # Keyed on tconst, every untagged movie would be inserted again under a new id
+        db.close()
+        raise SystemExit(
+            f"{untagged} stored movies have no tconst yet; run python load_imdb.py --backfill-tconst --csv {csv_path} "
+            "first (movies it cannot match must be tagged or removed by hand)."
+        )
+    use_copy = engine.dialect.name == "postgresql"
+    raw_connection = engine.raw_connection() if use_copy else None
+    start_after = 0
+    if resume:
+        start_after = db.query(func.max(Movie.id)).scalar() or 0
+        _log(f"Resuming after movie id {start_after}")
+    next_id = (db.query(func.max(Movie.id)).scalar() or 0) + 1
+
+    total = 0
+    started = time.perf_counter()
+    try:
+        for chunk in read_chunks(csv_path, chunksize):
+            if start_after:
+                chunk = chunk[chunk["id"] > start_after]
+                if chunk.empty:
+                    continue
+            chunk, next_id = _resolve_ids(db, chunk, next_id)
+            _upsert(db, raw_connection, chunk)
+            total += len(chunk)
+            elapsed = time.perf_counter() - started
+            _log(f"Loaded {total} movies ({total / elapsed:.0f} rows/sec)")
+        bump_catalog_version(db, source=os.path.basename(csv_path), added=total)
+    finally:
+        if raw_connection is not None:
+            raw_connection.close()
+        db.close()
+
+    elapsed = time.perf_counter() - started
+    _log(f"Movies loaded successfully: {total} rows in {elapsed:.1f}s ({total / max(elapsed, 1e-9):.0f} rows/sec)")
+    return total
+
+_MISSING = object()
+
+def _stored_catalog(db: Session):
+    columns = [Movie.id, Movie.tconst] + [getattr(Movie, c) for c in COMPARE_COLUMNS]
+    rows = db.query(*columns).filter(Movie.tconst.isnot(None)).all()
+    return pd.DataFrame(rows, columns=["id", "tconst"] + COMPARE_COLUMNS).set_index("tconst")
+
+def _changed_mask(new: pd.DataFrame, old: pd.DataFrame, columns):
+    # Row-wise "any column differs"; missing values are mapped to one sentinel so NA == NA
+    a = new[columns].astype(object).where(new[columns].notna(), _MISSING).to_numpy()
+    b = old[columns].astype(object).where(old[columns].notna(), _MISSING).to_numpy()
+    return (a != b).any(axis=1)
+
+def refresh_catalog(csv_path="imdb.csv", chunksize=10000):
+    """
+    Delta refresh keyed on tconst: titles already stored keep their id (so ratings stay valid) and
+    are upserted only if a column changed; unseen titles get fresh ids after the current max id.
+    Titles missing from the snapshot are kept. Bumps the catalog version and returns
+    (updated ids, added ids, whether any text column changed).
+    """
+    ensure_catalog_schema(engine)
+    db = SessionLocal()
+    use_copy = engine.dialect.name == "postgresql"
+    raw_connection = engine.raw_connection() if use_copy else None
+    started = time.perf_counter()
+    updated_ids, added_ids = [], []
+    text_changed = False
+    try:
+        stored = _stored_catalog(db)
+        if stored.empty and db.query(Movie.id).first() is not None:
+            raise SystemExit("Stored movies have no tconst yet; run python load_imdb.py --backfill-tconst first.")
+        next_id = (db.query(func.max(Movie.id)).scalar() or 0) + 1
+        _log(f"Diffing {csv_path} against {len(stored)} stored titles")
+        for chunk in read_chunks(csv_path, chunksize):
+            chunk = chunk.dropna(subset=["tconst"])
+            matched = chunk["tconst"].isin(stored.index)
+
+            added = chunk[~matched].copy()
+            added["id"] = range(next_id, next_id + len(added))
+            next_id += len(added)
+
+            existing = chunk[matched].copy()
+            before = stored.loc[existing["tconst"]].set_axis(existing.index)
+            existing["id"] = before["id"].to_numpy()
+            changed = existing[_changed_mask(existing, before, COMPARE_COLUMNS)]
+            if len(added) or _changed_mask(changed, before.loc[changed.index], TEXT_COLUMNS).any():
+                text_changed = True
+
+            rows = pd.concat([changed, added])
+            if rows.empty:
+                continue
+            _upsert(db, raw_connection, rows)
+            updated_ids.extend(changed["id"].tolist())
+            added_ids.extend(added["id"].tolist())
+            _log(f"{len(updated_ids)} updated, {len(added_ids)} added so far")
+        if updated_ids or added_ids:
+            bump_catalog_version(db, source=os.path.basename(csv_path), added=len(added_ids), updated=len(updated_ids))
+    finally:
+        if raw_connection is not None:
+            raw_connection.close()
+        db.close()
+    _log(f"Catalog refreshed: {len(updated_ids)} updated, {len(added_ids)} added in {time.perf_counter() - started:.1f}s")
+    return updated_ids, added_ids, text_changed
+
+def backfill_tconst(csv_path="imdb.csv", chunksize=10000):
+    """
+    Set tconst on stored movies that have none (loaded before the column existed) by matching
+    title and startYear against the CSV. Keys that are ambiguous on either side are left alone.
+    Returns the number of movies tagged.
+    """
+    ensure_catalog_schema(engine)
+    db = SessionLocal()
+    started = time.perf_counter()
+    try:
+        rows = db.query(Movie.id, Movie.title, Movie.startYear).filter(Movie.tconst.is_(None)).all()
+        stored = pd.DataFrame(rows, columns=["id", "title", "startYear"]).astype({"startYear": "Int64"})
+        known = {t for (t,) in db.query(Movie.tconst).filter(Movie.tconst.isnot(None))}
+        _log(f"{len(stored)} movies without tconst, {len(known)} already tagged")
+        snapshot = pd.concat(
+            chunk.loc[chunk["tconst"].notna() & ~chunk["tconst"].isin(known), ["tconst", "title", "startYear"]]
+            for chunk in read_chunks(csv_path, chunksize)
+        )
+        keys = ["title", "startYear"]
+        matches = stored.drop_duplicates(keys, keep=False).merge(snapshot.drop_duplicates(keys, keep=False), on=keys)
+        _log(f"{len(matches)} matched on title and year")
+        for start in range(0, len(matches), chunksize):
+            batch = matches.iloc[start:start + chunksize]
+            db.bulk_update_mappings(Movie, [
+                {"id": int(i), "tconst": t} for i, t in zip(batch["id"], batch["tconst"])
+            ])
+            db.commit()
+    finally:
+        db.close()
+    _log(f"Backfilled tconst on {len(matches)} of {len(stored)} movies in {time.perf_counter() - started:.1f}s")
+    return len(matches)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Bulk load imdb.csv into the movies table.")
+    parser.add_argument("--csv", default="imdb.csv", help="path to the merged IMDb CSV")
+    parser.add_argument("--chunksize", type=int, default=10000, help="rows per COPY/commit batch")
+    parser.add_argument("--resume", action="store_true", help="skip rows with an id at or below the current max id")
+    parser.add_argument("--skip-search-tables", action="store_true", help="do not rebuild the genre/people search tables")
+    parser.add_argument("--refresh", action="store_true",
+                        help="delta refresh keyed on tconst: keep ids, upsert changed and new titles only")
+    parser.add_argument("--skip-recommender", action="store_true",
+                        help="with --refresh, do not patch and republish the recommender artifacts")
+    parser.add_argument("--backfill-tconst", action="store_true",
+                        help="set tconst on stored movies without one by matching title and year, then exit")
+    args = parser.parse_args()
+    if args.backfill_tconst:
+        backfill_tconst(args.csv, args.chunksize)
+        raise SystemExit(0)
+    rebuild_search = not args.skip_search_tables
+    changed_ids = None
+    if args.refresh:
+        updated_ids, added_ids, text_changed = refresh_catalog(args.csv, args.chunksize)
+        rebuild_search = rebuild_search and text_changed
+        changed_ids = updated_ids + added_ids
+    else:
+        load_imdb_data(args.csv, args.chunksize, args.resume)
+    db = SessionLocal()
+    try:
+        if rebuild_search:
+            build_search_tables(db)
+        if changed_ids and not args.skip_recommender:
+            from recommender import refresh_recommender
+            refresh_recommender(db, changed_ids)
+    finally:
+        db.close()
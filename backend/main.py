@@ -1,16 +1,27 @@
 import time
 import logging
-from fastapi import FastAPI, Depends, HTTPException, Request, status, APIRouter
+import threading
+from fastapi import FastAPI, Depends, HTTPException, Request, Response, status, APIRouter
 from fastapi.middleware.cors import CORSMiddleware
-from sqlalchemy import or_
+from sqlalchemy import or_, and_, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from database import engine, Base, get_db
+from database import engine, get_async_db, get_async_engine, SessionLocal
 from models import Movie, Rating, User, UserUpdate
-from recommender import Recommender
+from recommender import ARTIFACT_ROOT, Recommender, current_artifact_path, load_or_fit_recommender
+from jobs import RetrainJobs
+from search_index import SORT_COLUMNS, SearchIndex, ensure_search_tables, sql_search_query
+from catalog import catalog_signature, ensure_catalog_schema
+from catalog_cache import CatalogCache
+from recommendation_cache import RecommendationCache
+from streaming import STREAM_BATCH_SIZE, batched, stream_response
 from predict import RatingPredictor
+import metrics
+from metrics import MODEL_LOAD_SECONDS, RECOMMENDER_PHASE, REQUEST_DB_QUERIES, REQUEST_LATENCY
 from auth import (
-    oauth2_scheme, create_access_token, get_password_hash,
-    verify_password, get_current_user
+    oauth2_scheme, create_access_token,
+    verify_password_async, get_password_hash_async, get_current_user, get_token_user,
+    invalidate_user, user_cache_stats, password_pool, TokenUser
 )
 from fastapi.security import OAuth2PasswordRequestForm
 from pydantic import BaseModel
@@ -19,12 +30,19 @@ from datetime import datetime, timedelta
 from jose import jwt, JWTError
 from dotenv import load_dotenv
 import os
+import base64
+import json
+import math
 from functools import lru_cache
-from utils import extract_features
 
 load_dotenv()
 
 SECRET_KEY = os.getenv("SECRET_KEY")
+PREDICTION_MODEL = os.getenv("PREDICTION_MODEL", "xgb")  # xgb, rf or ensemble
+SEARCH_PAGE_SIZE = 50
+MAX_SEARCH_PAGE_SIZE = 200
+SEARCH_TOTAL_CAP = 10000  # totals above this are reported as approximate
+LOG_HEADERS = os.getenv("LOG_HEADERS", "0") == "1"  # debug: log every response's headers
 
 
 # --- FastAPI app setup ---
@@ -79,6 +97,15 @@ class SearchQuery(BaseModel):
     directors: Optional[str] = None
     sort_by: Optional[str] = "averageRating"
     sort_order: Optional[str] = "desc"
+    cursor: Optional[str] = None
+    limit: int = SEARCH_PAGE_SIZE
+    include_total: bool = False
+
+class SearchPage(BaseModel):
+    items: List[MovieResponse]
+    next_cursor: Optional[str] = None
+    total: Optional[int] = None
+    total_is_exact: bool = True
 
 class RatingUpdate(BaseModel):
     rating: float
@@ -90,85 +117,226 @@ def create_access_token(data: dict):
     to_encode.update({"exp": expire})
     return jwt.encode(to_encode, SECRET_KEY, algorithm="HS256")
 
+def movie_dict(movie, user_rating=None, predicted_rating=None):
+    # Plain-dict form of MovieResponse for the streaming responses
+    return {
+        "id": movie.id,
+        "title": movie.title,
+        "titleType": movie.titleType,
+        "startYear": movie.startYear,
+        "endYear": movie.endYear,
+        "totalEpisodes": movie.totalEpisodes,
+        "genres": movie.genres,
+        "runtimeMinutes": movie.runtimeMinutes,
+        "numVotes": movie.numVotes,
+        "averageRating": movie.averageRating,
+        "writers": movie.writers,
+        "directors": movie.directors,
+        "userRating": user_rating,
+        "predictedRating": None if predicted_rating is None else float(predicted_rating),
+    }
+
+def my_rating_dict(r, movie):
+    return {
+        "rating_id": r.id,  # rating ID
+        "movie_id": movie.id,
+        "title": movie.title,
+        "titleType": movie.titleType,
+        "startYear": movie.startYear,
+        "endYear": movie.endYear,
+        "totalEpisodes": movie.totalEpisodes,
+        "genres": movie.genres,
+        "runtimeMinutes": movie.runtimeMinutes,
+        "numVotes": movie.numVotes,
+        "averageRating": movie.averageRating,
+        "writers": movie.writers,
+        "directors": movie.directors,
+        "rating": r.rating
+    }
+
+def predict_or_none(movies):
+    # A predictor failure degrades predictedRating to None instead of failing the whole endpoint
+    if rating_predictor is None:
+        return [None] * len(movies)
+    try:
+        return rating_predictor.predict_many(
+            movies, recommender.mlb_genres, model=PREDICTION_MODEL, feature_store=recommender.feature_store
+        )
+    except Exception:
+        logger.exception("Rating prediction failed; serving results without predictedRating")
+        return [None] * len(movies)
+
+SEARCH_INDEX_CHECK_SECONDS = int(os.getenv("SEARCH_INDEX_CHECK_SECONDS", "30"))
+search_index_checked_at = 0.0
+search_index_rebuild = threading.Lock()
+
+def check_search_index(db: Session):
+    # Rebuild the in-process index in the background once the catalog version moves (refresh/reload)
+    global search_index_checked_at
+    now = time.monotonic()
+    if search_index is None or now - search_index_checked_at < SEARCH_INDEX_CHECK_SECONDS:
+        return
+    search_index_checked_at = now
+    if catalog_signature(db) != search_index.catalog_version and search_index_rebuild.acquire(blocking=False):
+        threading.Thread(target=rebuild_search_index, daemon=True).start()
+
+def rebuild_search_index():
+    # The old index keeps serving until the new one replaces it
+    global search_index
+    try:
+        db = SessionLocal()
+        try:
+            search_index = SearchIndex.from_db(db)
+        finally:
+            db.close()
+        logger.info(f"Search index rebuilt for catalog {search_index.catalog_version}")
+    except Exception:
+        logger.exception("Search index rebuild failed; serving the previous index")
+    finally:
+        search_index_rebuild.release()
+
+def encode_cursor(sort_value, movie_id):
+    return base64.urlsafe_b64encode(json.dumps([sort_value, movie_id]).encode()).decode()
+
+def decode_cursor(cursor, sort_by, allow_null=False):
+    # Cursors come back from clients, so everything that reaches the keyset comparison is checked here.
+    # Only the SQL path can page past a NULL relevance (similarity() of a NULL title).
+    try:
+        sort_value, movie_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if sort_value is None:
+        valid_value = allow_null and sort_by == "relevance"
+    else:
+        valid_value = isinstance(sort_value, (int, float)) and not isinstance(sort_value, bool) and math.isfinite(sort_value)
+    if not valid_value or not isinstance(movie_id, int) or isinstance(movie_id, bool):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return sort_value, movie_id
+
 # --- Startup event ---
 @app.on_event("startup")
 async def startup_event():
+    started = time.perf_counter()
     print(f"{time.strftime('%H:%M:%S')} - Starting startup event...")
-    Base.metadata.create_all(bind=engine)
-    print(f"{time.strftime('%H:%M:%S')} - Database tables created")
-    db = next(get_db())
-    load_imdb_data(db)
-    print(f"{time.strftime('%H:%M:%S')} - IMDb data loaded")
-    global recommender, rating_predictor
-    recommender = Recommender(db)
-    recommender.load()
+    ensure_catalog_schema(engine)
+    print(f"{time.strftime('%H:%M:%S')} - Database tables created ({time.perf_counter() - started:.2f}s)")
+    db = SessionLocal()
+    if db.query(Movie.id).first() is None:
+        logger.warning("The movies table is empty. Import the catalog with: python load_imdb.py --csv imdb.csv")
+    global recommender, recommender_version, rating_predictor, search_index
+    phase = time.perf_counter()
+    if engine.dialect.name == "postgresql":
+        search_index = None
+        ensure_search_tables(db)
+    else:
+        search_index = SearchIndex.from_db(db)
+    MODEL_LOAD_SECONDS.set(time.perf_counter() - phase, "search_index")
+    print(f"{time.strftime('%H:%M:%S')} - Search ready ({time.perf_counter() - phase:.2f}s)")
+    phase = time.perf_counter()
+    recommender = load_or_fit_recommender(db)
+    recommender_version = os.path.basename(current_artifact_path(ARTIFACT_ROOT))
+    MODEL_LOAD_SECONDS.set(time.perf_counter() - phase, "recommender")
+    print(f"{time.strftime('%H:%M:%S')} - Recommender ready ({time.perf_counter() - phase:.2f}s)")
+    db.close()  # the recommender reads everything it needs up front and keeps no session in use
+    phase = time.perf_counter()
     rating_predictor = RatingPredictor(model_dir="models")
     rating_predictor.load()
-    print(f"{time.strftime('%H:%M:%S')} - Recommender and RatingPredictor initialized")
+    if not rating_predictor.accepts(recommender.n_features):
+        logger.error(
+            f"Rating models expect {rating_predictor.n_features} features but the recommender produces "
+            f"{recommender.n_features}; predictions are disabled until the predictor is retrained (python train_predictor.py)"
+        )
+        rating_predictor = None
+    MODEL_LOAD_SECONDS.set(time.perf_counter() - phase, "rating_predictor")
+    print(f"{time.strftime('%H:%M:%S')} - RatingPredictor ready ({time.perf_counter() - phase:.2f}s)")
+    print(f"{time.strftime('%H:%M:%S')} - Startup finished in {time.perf_counter() - started:.2f}s")
     logger.info(f"Recommender initialized: {recommender is not None}")
 
-def load_imdb_data(db: Session):
-    if db.query(Movie).count() == 0:
-        print(f"{time.strftime('%H:%M:%S')} - Loading movies from imdb_normalized.csv...")
-        import pandas as pd
-        df = pd.read_csv("imdb.csv")
-        print(f"{time.strftime('%H:%M:%S')} - Number of movies to load: {len(df)}")
-        for i, row in df.iterrows():
-            if i % 1000 == 0:
-                print(f"{time.strftime('%H:%M:%S')} - Loaded {i} movies...")
-            movie = Movie(
-                id=row["id"],
-                titleType=row["titleType"],
-                title=row["title"],
-                startYear=row["startYear"],
-                endYear=row["endYear"] if pd.notna(row["endYear"]) else None,
-                runtimeMinutes=row["runtimeMinutes"] if pd.notna(row["runtimeMinutes"]) else None,
-                genres=row["genres"],
-                totalEpisodes=row["totalEpisodes"] if pd.notna(row["totalEpisodes"]) else None,
-                directors=row["directors"],
-                writers=row["writers"],
-                averageRating=row["averageRating"],
-                numVotes=row["numVotes"]
-            )
-            db.add(movie)
-        db.commit()
-        print(f"{time.strftime('%H:%M:%S')} - Movies loaded successfully")
+@app.on_event("shutdown")
+async def shutdown_event():
+    retrain_jobs.shutdown()
+    await recommendation_cache.close()
+    await get_async_engine().dispose()
+
+def swap_recommender(path):
+    # Build the new model off the event loop, then publish it with a single reference swap
+    global recommender, recommender_version
+    started = time.perf_counter()
+    db = SessionLocal()
+    try:
+        new_recommender = Recommender(db, load_only=True, path=path)
+    finally:
+        db.close()
+    MODEL_LOAD_SECONDS.set(time.perf_counter() - started, "recommender")
+    if rating_predictor is not None and not rating_predictor.accepts(new_recommender.n_features):
+        # Refuse the swap (the job is marked failed and the version is not published) rather than serve 500s
+        raise ValueError(
+            f"New recommender produces {new_recommender.n_features} features, "
+            f"the rating models expect {rating_predictor.n_features}"
+        )
+    recommender = new_recommender
+    recommender_version = os.path.basename(os.path.normpath(path))
+    logger.info(f"Recommender swapped to {path}")
+
+retrain_jobs = RetrainJobs(on_ready=swap_recommender)
+catalog_cache = CatalogCache(
+    max_entries=int(os.getenv("CATALOG_CACHE_SIZE", "20000")),
+    ttl_seconds=int(os.getenv("CATALOG_CACHE_TTL", "600"))
+)
+recommendation_cache = RecommendationCache()
+
+metrics.instrument_engine(engine)
+metrics.instrument_engine(get_async_engine().sync_engine)
+metrics.register_collector("catalog_cache", lambda: catalog_cache.stats())
+metrics.register_collector("auth_user_cache", user_cache_stats)
+metrics.register_collector("password_pool", password_pool.stats)
+metrics.register_collector("recommendation_cache", lambda: recommendation_cache.stats())
 
 @app.middleware("http")
 async def log_request(request: Request, call_next):
+    started = time.perf_counter()
+    queries = metrics.start_query_count()
     response = await call_next(request)
+    # Label by route template (/predict/{movie_id}) rather than raw path to bound cardinality
+    route = request.scope.get("route")
+    route_path = route.path if route is not None else "unmatched"
+    REQUEST_LATENCY.observe(time.perf_counter() - started, request.method, route_path, response.status_code)
+    REQUEST_DB_QUERIES.observe(queries[0], request.method, route_path)
     logger.info(f"Request: {request.method} {request.url} - Status: {response.status_code}")
-    logger.info(f"Response headers: {dict(response.headers)}")
+    if LOG_HEADERS:
+        logger.info(f"Response headers: {dict(response.headers)}")
     return response
 
 # --- Auth endpoints ---
 @app.post("/register", response_model=Token)
-async def register(user: UserCreate, db: Session = Depends(get_db)):
-    if db.query(User).filter(User.username == user.username).first():
+async def register(user: UserCreate, db: AsyncSession = Depends(get_async_db)):
+    if (await db.execute(select(User.id).where(User.username == user.username))).first():
         raise HTTPException(status_code=400, detail="Username already registered")
-    if db.query(User).filter(User.email == user.email).first():
+    if (await db.execute(select(User.id).where(User.email == user.email))).first():
         raise HTTPException(status_code=400, detail="Email already registered")
-    hashed_password = get_password_hash(user.password)
+    hashed_password = await get_password_hash_async(user.password)
     db_user = User(username=user.username, email=user.email, hashed_password=hashed_password)
     db.add(db_user)
-    db.commit()
-    db.refresh(db_user)
-    access_token = create_access_token(data={"sub": user.username})
+    await db.commit()
+    access_token = create_access_token(data={"sub": user.username, "uid": db_user.id})
     return {"access_token": access_token, "token_type": "bearer"}
 
 @app.post("/token", response_model=Token)
-async def login_for_access_token(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
-    user = db.query(User).filter(User.username == form_data.username).first()
-    if not user or not verify_password(form_data.password, user.hashed_password):
+async def login_for_access_token(form_data: OAuth2PasswordRequestForm = Depends(), db: AsyncSession = Depends(get_async_db)):
+    user = (await db.execute(select(User).where(User.username == form_data.username))).scalars().first()
+    if not user or not await verify_password_async(form_data.password, user.hashed_password):
         raise HTTPException(status_code=401, detail="Incorrect username or password")
-    access_token = create_access_token(data={"sub": user.username})
+    access_token = create_access_token(data={"sub": user.username, "uid": user.id})
     return {"access_token": access_token, "token_type": "bearer"}
 
 # --- Movie endpoints ---
 @app.get("/top10", response_model=List[MovieResponse])
-async def get_top10(current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
-    movies = db.query(Movie).order_by(Movie.numVotes.desc()).limit(10).all()
-    user_ratings = {r.movie_id: r.rating for r in db.query(Rating).filter(Rating.user_id == current_user.id).all()}
+async def get_top10(current_user: TokenUser = Depends(get_token_user), db: AsyncSession = Depends(get_async_db)):
+    movies = await db.run_sync(catalog_cache.top_movies, 10)
+    user_ratings = dict((await db.execute(
+        select(Rating.movie_id, Rating.rating).where(Rating.user_id == current_user.id)
+    )).all())
+    predicted = predict_or_none(movies)
     return [
         MovieResponse(
             id=m.id,
@@ -184,112 +352,153 @@ async def get_top10(current_user: User = Depends(get_current_user), db: Session
             writers=m.writers,          
             directors=m.directors,       
             userRating=user_ratings.get(m.id),
-            predictedRating=None
-        ) for m in movies
+            predictedRating=p
+        ) for m, p in zip(movies, predicted)
     ]
 
 @app.post("/predict/{movie_id}", response_model=dict)
 async def predict_rating(
     movie_id: int,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: TokenUser = Depends(get_token_user),
+    db: AsyncSession = Depends(get_async_db)
 ):
-    movie = db.query(Movie).filter(Movie.id == movie_id).first()
+    movie = await db.run_sync(catalog_cache.get_movie, movie_id)
     if not movie:
         raise HTTPException(status_code=404, detail="Movie not found")
-    features = extract_features(movie, recommender.mlb_genres)
-    predicted = rating_predictor.predict(movie, recommender.mlb_genres, model="xgb")
-    return {"predictedRating": predicted}
+    predicted = predict_or_none([movie])[0]
+    return {"predictedRating": None if predicted is None else float(predicted)}
+
+@app.get("/movies/{movie_id}/similar", response_model=List[MovieResponse])
+async def similar_movies(
+    movie_id: int,
+    limit: int = 10,
+    current_user: TokenUser = Depends(get_token_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    if recommender is None or recommender.similarity is None:
+        raise HTTPException(status_code=503, detail="Similar titles index not built")
+    if not (1 <= limit <= 100):
+        raise HTTPException(status_code=400, detail="limit must be between 1 and 100")
+    try:
+        similar_ids, _ = recommender.similarity.similar(movie_id, limit)
+    except KeyError:
+        raise HTTPException(status_code=404, detail="Movie not found")
+    similar_ids = [int(i) for i in similar_ids]
+    movies = (await db.execute(select(Movie).where(Movie.id.in_(similar_ids)))).scalars().all()
+    movie_map = {m.id: m for m in movies}
+    movies = [movie_map[i] for i in similar_ids if i in movie_map]
+    user_ratings = dict((await db.execute(
+        select(Rating.movie_id, Rating.rating).where(Rating.user_id == current_user.id, Rating.movie_id.in_(similar_ids))
+    )).all())
+    predicted = predict_or_none(movies)
+    return [movie_dict(m, user_ratings.get(m.id), p) for m, p in zip(movies, predicted)]
 
 @app.post("/rate", response_model=RatingCreate)
-async def rate_movie(rating: RatingCreate, current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
-    movie = db.query(Movie).filter(Movie.id == rating.movie_id).first()
+async def rate_movie(rating: RatingCreate, current_user: TokenUser = Depends(get_token_user), db: AsyncSession = Depends(get_async_db)):
+    movie = await db.run_sync(catalog_cache.get_movie, rating.movie_id)
     if not movie:
         raise HTTPException(status_code=404, detail="Movie not found")
     if not (1 <= rating.rating <= 10):
         raise HTTPException(status_code=400, detail="Rating must be between 1 and 10")
-    existing_rating = db.query(Rating).filter(
-        Rating.user_id == current_user.id, Rating.movie_id == rating.movie_id
-    ).first()
+    existing_rating = (await db.execute(
+        select(Rating).where(Rating.user_id == current_user.id, Rating.movie_id == rating.movie_id)
+    )).scalars().first()
     if existing_rating:
         existing_rating.rating = rating.rating
     else:
         db_rating = Rating(user_id=current_user.id, movie_id=rating.movie_id, rating=rating.rating)
         db.add(db_rating)
-    db.commit()
+    await db.commit()
+    await recommendation_cache.invalidate_user(current_user.id)
     return rating
 
 @app.get("/recommendations", response_model=List[MovieResponse])
-async def get_recommendations(current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
+async def get_recommendations(
+    stream: Optional[str] = None,
+    current_user: TokenUser = Depends(get_token_user),
+    db: AsyncSession = Depends(get_async_db)
+):
     if recommender is None:
         raise HTTPException(status_code=500, detail="Recommender not initialized")
-    user_ratings = db.query(Rating).filter(Rating.user_id == current_user.id).all()
+    catalog_version = await db.run_sync(catalog_cache.current_version)
+    cache_key = await recommendation_cache.key(
+        current_user.id, f"{recommender_version}:{PREDICTION_MODEL}", catalog_version
+    )
+    results = await recommendation_cache.get(current_user.id, cache_key)
+    if results is None:
+        results = await compute_recommendations(current_user.id, db)
+        await recommendation_cache.set(current_user.id, cache_key, results)
+    if stream:
+        return stream_response(results, stream)
+    return results
+
+async def compute_recommendations(user_id: int, db: AsyncSession):
+    # The user's ratings are read from the database, so every worker computes from the same state
+    user_ratings = dict((await db.execute(
+        select(Rating.movie_id, Rating.rating).where(Rating.user_id == user_id)
+    )).all())
     if not user_ratings:
         raise HTTPException(status_code=404, detail="Nothing to recommend! Try rating a few titles.")
-    recs = recommender.get_recommendations(current_user.id)
+    recs = recommender.get_recommendations(
+        user_ratings, rating_predictor=rating_predictor, prediction_model=PREDICTION_MODEL
+    )
     rec_ids = [rec['id'] for rec in recs]
-    movies = db.query(Movie).filter(Movie.id.in_(rec_ids)).all()
+    with RECOMMENDER_PHASE.time("db_fetch"):
+        movies = (await db.execute(select(Movie).where(Movie.id.in_(rec_ids)))).scalars().all()
     movie_map = {m.id: m for m in movies}
-    results = []
-    for rec in recs:
-        movie = movie_map.get(rec['id'])
-        if not movie:
-            continue
-        results.append(MovieResponse(
-            id=movie.id,
-            title=movie.title,
-            titleType=movie.titleType,
-            startYear=movie.startYear,
-            endYear=movie.endYear,
-            totalEpisodes=movie.totalEpisodes,
-            genres=movie.genres,
-            runtimeMinutes=movie.runtimeMinutes,
-            numVotes=movie.numVotes,
-            averageRating=movie.averageRating,
-            writers=movie.writers,      
-            directors=movie.directors,    
-            userRating=None,
-            predictedRating=None
-        ))
-    return results
+    return [
+        movie_dict(movie_map[rec['id']], predicted_rating=rec.get('predicted_rating'))
+        for rec in recs if rec['id'] in movie_map
+    ]
 
-@app.post("/search", response_model=List[MovieResponse])
+@app.post("/search", response_model=SearchPage)
 async def search_movies(
     query: SearchQuery,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    stream: Optional[str] = None,
+    current_user: TokenUser = Depends(get_token_user),
+    db: AsyncSession = Depends(get_async_db)
 ):
-    db_query = db.query(Movie)
-    if query.title:
-        db_query = db_query.filter(Movie.title.ilike(f"%{query.title}%"))
-    if query.genres:
-        genres = query.genres.split(",")
-        conditions = [Movie.genres.ilike(f"%{genre.strip()}%") for genre in genres]
-        db_query = db_query.filter(or_(*conditions))
-    if query.writers:
-        writers = query.writers.split(",")
-        conditions = [Movie.writers.ilike(f"%{writer.strip()}%") for writer in writers]
-        db_query = db_query.filter(or_(*conditions))
-    if query.directors:
-        directors = query.directors.split(",")
-        conditions = [Movie.directors.ilike(f"%{director.strip()}%") for director in directors]
-        db_query = db_query.filter(or_(*conditions))
-    if query.sort_by == "averageRating":
-        order_column = Movie.averageRating
-    elif query.sort_by == "numVotes":
-        order_column = Movie.numVotes
-    else:
-        raise HTTPException(status_code=400, detail="Invalid sort_by parameter. Use 'averageRating' or 'numVotes'.")
-    if query.sort_order == "desc":
-        db_query = db_query.order_by(order_column.desc())
-    elif query.sort_order == "asc":
-        db_query = db_query.order_by(order_column.asc())
-    else:
+    if query.sort_by not in SORT_COLUMNS:
+        raise HTTPException(status_code=400, detail="Invalid sort_by parameter. Use 'averageRating', 'numVotes' or 'relevance'.")
+    if query.sort_by == "relevance" and not query.title:
+        raise HTTPException(status_code=400, detail="Sorting by relevance requires a title query.")
+    if query.sort_order not in ("asc", "desc"):
         raise HTTPException(status_code=400, detail="Invalid sort_order parameter. Use 'asc' or 'desc'.")
-    movies = db_query.all()
-    user_ratings = {r.movie_id: r.rating for r in db.query(Rating).filter(Rating.user_id == current_user.id).all()}
+    limit = min(max(query.limit, 1), MAX_SEARCH_PAGE_SIZE)
+    filters = dict(title=query.title, genres=query.genres, writers=query.writers, directors=query.directors)
+    if stream:
+        # Export mode: every match, unpaginated, serialized while it is read
+        return stream_response(stream_search_rows(query, filters, current_user.id), stream)
+
+    if search_index is not None:
+        # In-process index (SQLite/test setups): filter, sort and page in memory, then fetch the page
+        await db.run_sync(check_search_index)
+        page_ids, next_key, total = search_index.search(
+            **filters, sort_by=query.sort_by, sort_order=query.sort_order,
+            after=decode_cursor(query.cursor, query.sort_by) if query.cursor else None, limit=limit
+        )
+        movie_map = {
+            m.id: m for m in (await db.execute(select(Movie).where(Movie.id.in_(page_ids)))).scalars()
+        } if page_ids else {}
+        movies = [movie_map[i] for i in page_ids if i in movie_map]
+        next_cursor = encode_cursor(*next_key) if next_key else None
+        total_is_exact = True
+        if not query.include_total:
+            total = None
+    else:
+        after = decode_cursor(query.cursor, query.sort_by, allow_null=True) if query.cursor else None
+        movies, next_cursor, total, total_is_exact = await db.run_sync(
+            sql_search_page, query, filters, after, limit
+        )
+
+    page_ids = [m.id for m in movies]
+    user_ratings = dict((await db.execute(
+        select(Rating.movie_id, Rating.rating)
+        .where(Rating.user_id == current_user.id, Rating.movie_id.in_(page_ids))
+    )).all()) if page_ids else {}
+    predicted = predict_or_none(movies)
     results = []
-    for movie in movies:
+    for movie, predicted_rating in zip(movies, predicted):
         results.append(
             MovieResponse(
                 id=movie.id,
@@ -305,10 +514,66 @@ async def search_movies(
                 writers=movie.writers,     
                 directors=movie.directors,
                 userRating=user_ratings.get(movie.id),
-                predictedRating=None
+                predictedRating=predicted_rating
             )
         )
-    return results
+    return SearchPage(items=results, next_cursor=next_cursor, total=total, total_is_exact=total_is_exact)
+
+def sql_search_page(db: Session, query: SearchQuery, filters, after, limit):
+    """One keyset page of the SQL search path: (movies, next cursor, total, total is exact)."""
+    db_query, sort_expr = sql_search_query(db, **filters, sort_by=query.sort_by)
+    total, total_is_exact = None, True
+    if query.include_total:
+        # Count at most SEARCH_TOTAL_CAP + 1 rows so broad filters stay cheap
+        total = db_query.order_by(None).limit(SEARCH_TOTAL_CAP + 1).count()
+        if total > SEARCH_TOTAL_CAP:
+            total, total_is_exact = SEARCH_TOTAL_CAP, False
+
+    # Keyset pagination on (sort value, id)
+    if after:
+        sort_value, last_id = after
+        if query.sort_order == "desc":
+            db_query = db_query.filter(or_(sort_expr < sort_value, and_(sort_expr == sort_value, Movie.id < last_id)))
+        else:
+            db_query = db_query.filter(or_(sort_expr > sort_value, and_(sort_expr == sort_value, Movie.id > last_id)))
+    if query.sort_order == "desc":
+        db_query = db_query.order_by(sort_expr.desc(), Movie.id.desc())
+    else:
+        db_query = db_query.order_by(sort_expr.asc(), Movie.id.asc())
+    rows = db_query.limit(limit + 1).all()
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1][1], rows[-1][0].id)
+    return [movie for movie, _ in rows], next_cursor, total, total_is_exact
+
+def stream_search_rows(query: SearchQuery, filters, user_id):
+    db = SessionLocal()
+    try:
+        user_ratings = dict(db.query(Rating.movie_id, Rating.rating).filter(Rating.user_id == user_id).all())
+        index = search_index
+        if index is not None:
+            ids, _, _ = index.search(
+                **filters, sort_by=query.sort_by, sort_order=query.sort_order, limit=len(index.ids)
+            )
+            def movie_batches():
+                for id_batch in batched(ids):
+                    movie_map = {m.id: m for m in db.query(Movie).filter(Movie.id.in_(id_batch))}
+                    yield [movie_map[i] for i in id_batch if i in movie_map]
+        else:
+            db_query, sort_expr = sql_search_query(db, **filters, sort_by=query.sort_by)
+            if query.sort_order == "desc":
+                db_query = db_query.order_by(sort_expr.desc(), Movie.id.desc())
+            else:
+                db_query = db_query.order_by(sort_expr.asc(), Movie.id.asc())
+            def movie_batches():
+                yield from batched(movie for movie, _ in db_query.yield_per(STREAM_BATCH_SIZE))
+        for movies in movie_batches():
+            predicted = predict_or_none(movies)
+            for movie, predicted_rating in zip(movies, predicted):
+                yield movie_dict(movie, user_ratings.get(movie.id), predicted_rating)
+    finally:
+        db.close()
 
 @app.get("/test-cors")
 async def test_cors(request: Request):
@@ -316,13 +581,16 @@ async def test_cors(request: Request):
     return {"message": "CORS is working"}
 
 @app.get("/genres", response_model=list[str])
-async def get_genres(db: Session = Depends(get_db)):
-    genres = set()
-    for g in db.query(Movie.genres).distinct():
-        if g[0]:
-            for genre in g[0].split(","):
-                genres.add(genre.strip())
-    return sorted(genres)
+async def get_genres(db: AsyncSession = Depends(get_async_db)):
+    return list(await db.run_sync(catalog_cache.genres))
+
+@app.get("/metrics")
+async def metrics_endpoint():
+    return Response(metrics.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+@app.get("/catalog-cache/stats")
+async def catalog_cache_stats(current_user: TokenUser = Depends(get_token_user)):
+    return catalog_cache.stats()
 
 # --- Account endpoints using a router ---
 account_router = APIRouter()
@@ -335,89 +603,97 @@ def get_me(current_user: User = Depends(get_current_user)):
     }
 
 @account_router.put("/me")
-def update_me(
+async def update_me(
     user_update: UserUpdate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     # Verify current password is provided and correct
     if not hasattr(user_update, 'current_password') or not user_update.current_password:
         raise HTTPException(status_code=400, detail="Current password is required")
     
-    if not verify_password(user_update.current_password, current_user.hashed_password):
+    if not await verify_password_async(user_update.current_password, current_user.hashed_password):
         raise HTTPException(status_code=400, detail="Current password is incorrect")
     
+    previous_username = current_user.username
     if user_update.email:
         current_user.email = user_update.email
     if user_update.username:
         current_user.username = user_update.username
     if user_update.password:
-        current_user.hashed_password = get_password_hash(user_update.password)
-    db.commit()
-    db.refresh(current_user)
+        current_user.hashed_password = await get_password_hash_async(user_update.password)
+    await db.commit()
+    invalidate_user(previous_username)
     return {"msg": "Account updated"}
 
 @account_router.get("/my-ratings")
-def get_my_ratings(db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
-    ratings = (
-        db.query(Rating)
+async def get_my_ratings(
+    stream: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: TokenUser = Depends(get_token_user)
+):
+    if stream:
+        return stream_response(stream_my_ratings(current_user.id), stream)
+    rows = (await db.execute(
+        select(Rating, Movie)
         .join(Movie, Rating.movie_id == Movie.id)
-        .filter(Rating.user_id == current_user.id)
-        .all()
-    )
-    return [
-        {
-            "rating_id": r.id,  # rating ID
-            "movie_id": r.movie.id,
-            "title": r.movie.title,
-            "titleType": r.movie.titleType,
-            "startYear": r.movie.startYear,
-            "endYear": r.movie.endYear,
-            "totalEpisodes": r.movie.totalEpisodes,
-            "genres": r.movie.genres,
-            "runtimeMinutes": r.movie.runtimeMinutes,
-            "numVotes": r.movie.numVotes,
-            "averageRating": r.movie.averageRating,
-            "writers": r.movie.writers,
-            "directors": r.movie.directors,
-            "rating": r.rating
-        }
-        for r in ratings if r.movie is not None
-    ]
+        .where(Rating.user_id == current_user.id)
+    )).all()
+    return [my_rating_dict(r, movie) for r, movie in rows]
+
+def stream_my_ratings(user_id):
+    db = SessionLocal()
+    try:
+        rows = (
+            db.query(Rating, Movie)
+            .join(Movie, Rating.movie_id == Movie.id)
+            .filter(Rating.user_id == user_id)
+            .yield_per(STREAM_BATCH_SIZE)
+        )
+        for r, movie in rows:
+            yield my_rating_dict(r, movie)
+    finally:
+        db.close()
 
 @account_router.put("/my-ratings/{rating_id}")
-def update_rating(
+async def update_rating(
     rating_id: int,
     rating_update: RatingUpdate,  # pydantic
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: TokenUser = Depends(get_token_user)
 ):
-    r = db.query(Rating).filter_by(id=rating_id, user_id=current_user.id).first()
+    r = (await db.execute(select(Rating).filter_by(id=rating_id, user_id=current_user.id))).scalars().first()
     if not r:
         raise HTTPException(status_code=404, detail="Rating not found")
     r.rating = rating_update.rating
-    db.commit()
+    await db.commit()
+    await recommendation_cache.invalidate_user(current_user.id)
     return {"msg": "Rating updated"}
 
 @account_router.delete("/my-ratings/{rating_id}")
-def delete_rating(rating_id: int, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
-    r = db.query(Rating).filter_by(id=rating_id, user_id=current_user.id).first()
+async def delete_rating(rating_id: int, db: AsyncSession = Depends(get_async_db), current_user: TokenUser = Depends(get_token_user)):
+    r = (await db.execute(select(Rating).filter_by(id=rating_id, user_id=current_user.id))).scalars().first()
     if not r:
         raise HTTPException(status_code=404, detail="Rating not found")
-    db.delete(r)
-    db.commit()
+    await db.delete(r)
+    await db.commit()
+    await recommendation_cache.invalidate_user(current_user.id)
     return {"msg": "Rating deleted"}
 
 # --- Register the router ---
 app.include_router(account_router)
 
 @app.post("/retrain-recommender")
-async def retrain_recommender_endpoint(current_user: User = Depends(get_current_user)):
+async def retrain_recommender_endpoint(current_user: TokenUser = Depends(get_token_user)):
     """
-    Retrain the recommender (KMeans and XGBoost) and reload the model in memory.
+    Start retraining the recommender in a background process. The new model is swapped in
+    when the job finishes; poll GET /retrain-recommender/{job_id} for its status.
     """
-    global recommender
-    recommender.train_model()
-    recommender.save()
-    recommender.load()
-    return {"msg": "Recommender retrained and updated."}
\ No newline at end of file
+    return retrain_jobs.submit()
+
+@app.get("/retrain-recommender/{job_id}")
+async def retrain_status(job_id: str, current_user: TokenUser = Depends(get_token_user)):
+    job = retrain_jobs.status(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
@@ -0,0 +1,131 @@
+import bisect
+import contextvars
+import threading
+import time
+from contextlib import contextmanager
+
+# Minimal in-process metrics in the Prometheus text exposition format. Histograms keep fixed
+# bucket counts per label set, so recording is a bisect and two additions under a lock.
+
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+_registry = []
+_collectors = []
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+def _format_labels(names, values):
+    if not names:
+        return ""
+    return "{" + ",".join(f'{n}="{_escape(v)}"' for n, v in zip(names, values)) + "}"
+
+class Histogram:
+    def __init__(self, name, help, labels=(), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self.buckets = tuple(buckets)
+        self._series = {}  # label values -> [bucket counts..., +Inf count, sum]
+        self._lock = threading.Lock()
+        _registry.append(self)
+
+    def observe(self, value, *label_values):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                series = self._series[label_values] = [0] * (len(self.buckets) + 1) + [0.0]
+            series[index] += 1
+            series[-1] += value
+
+    @contextmanager
+    def time(self, *label_values):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, *label_values)
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            series = {k: list(v) for k, v in self._series.items()}
+        for label_values, counts in sorted(series.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                labels = _format_labels(self.labels + ("le",), label_values + (le,))
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.labels, label_values)
+            lines.append(f"{self.name}_sum{labels} {counts[-1]}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+class Gauge:
+    def __init__(self, name, help, labels=()):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self._values = {}
+        _registry.append(self)
+
+    def set(self, value, *label_values):
+        self._values[label_values] = value
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} gauge"]
+        for label_values, value in sorted(self._values.items()):
+            lines.append(f"{self.name}{_format_labels(self.labels, label_values)} {value}")
+        return lines
+
+def register_collector(prefix, stats_fn):
+    """Export a stats() dict (e.g. CatalogCache.stats) as gauges named <prefix>_<key> on every scrape."""
+    _collectors.append((prefix, stats_fn))
+
+def render():
+    lines = []
+    for metric in _registry:
+        lines.extend(metric.render())
+    for prefix, stats_fn in _collectors:
+        for key, value in stats_fn().items():
+            if isinstance(value, bool) or not isinstance(value, (int, float)):
+                continue
+            lines.append(f"# TYPE {prefix}_{key} gauge")
+            lines.append(f"{prefix}_{key} {value}")
+    return "\n".join(lines) + "\n"
+
+# --- Per-request DB query counting ---
+_query_counter = contextvars.ContextVar("query_counter", default=None)
+
+def start_query_count():
+    # A mutable holder, so queries issued from copied contexts (threadpool, run_sync) still count
+    counter = [0]
+    _query_counter.set(counter)
+    return counter
+
+def _count_query(*args):
+    counter = _query_counter.get()
+    if counter is not None:
+        counter[0] += 1
+
+def instrument_engine(engine):
+    from sqlalchemy import event
+    event.listen(engine, "before_cursor_execute", _count_query)
+
+# --- Metrics shared across modules ---
+REQUEST_LATENCY = Histogram(
+    "http_request_duration_seconds", "Request latency by route", ("method", "route", "status")
+)
+REQUEST_DB_QUERIES = Histogram(
+    "http_request_db_queries", "SQL statements executed per request", ("method", "route"),
+    buckets=(0, 1, 2, 3, 5, 10, 20, 50, 100)
+)
+RECOMMENDER_PHASE = Histogram(
+    "recommender_phase_seconds", "Time spent in each get_recommendations phase", ("phase",)
+)
+PREDICTOR_LATENCY = Histogram(
+    "predictor_predict_seconds", "RatingPredictor.predict_features latency", ("model",)
+)
+MODEL_LOAD_SECONDS = Gauge("model_load_seconds", "Duration of the last model load", ("model",))
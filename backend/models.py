@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, Boolean, ForeignKey
+from sqlalchemy import Column, Integer, String, Float, Boolean, DateTime, ForeignKey, Index, func
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship
 from typing import Optional
@@ -10,6 +10,7 @@ class Movie(Base):
     __tablename__ = "movies"
 
     id = Column(Integer, primary_key=True, index=True)
+    tconst = Column(String, unique=True, index=True, nullable=True)  # stable IMDb id, used by delta refreshes
     titleType = Column(String)
     title = Column(String)
     startYear = Column(Integer)
@@ -24,6 +25,46 @@ class Movie(Base):
 
     ratings = relationship("Rating", back_populates="movie")
 
+    # Keyset pagination in /search walks (sort column, id)
+    __table_args__ = (
+        Index("ix_movies_averageRating_id", "averageRating", "id"),
+        Index("ix_movies_numVotes_id", "numVotes", "id"),
+    )
+
+class CatalogVersion(Base):
+    # One row per catalog import or delta refresh; the latest version is part of the catalog signature
+    __tablename__ = "catalog_versions"
+    id = Column(Integer, primary_key=True)
+    created_at = Column(DateTime, server_default=func.now())
+    source = Column(String)
+    added = Column(Integer, default=0)
+    updated = Column(Integer, default=0)
+
+class Genre(Base):
+    __tablename__ = "genres"
+    id = Column(Integer, primary_key=True)
+    name = Column(String, unique=True, nullable=False)
+
+class Person(Base):
+    __tablename__ = "people"
+    id = Column(Integer, primary_key=True)
+    name = Column(String, unique=True, nullable=False)
+
+class MovieGenre(Base):
+    __tablename__ = "movie_genres"
+    movie_id = Column(Integer, ForeignKey("movies.id"), primary_key=True)
+    genre_id = Column(Integer, ForeignKey("genres.id"), primary_key=True, index=True)
+
+class MoviePerson(Base):
+    __tablename__ = "movie_people"
+    movie_id = Column(Integer, ForeignKey("movies.id"), primary_key=True)
+    person_id = Column(Integer, ForeignKey("people.id"), primary_key=True)
+    role = Column(String, primary_key=True)  # "director" or "writer"
+
+    __table_args__ = (
+        Index("ix_movie_people_person_role", "person_id", "role"),
+    )
+
 class Rating(Base):
     __tablename__ = "ratings"
     id = Column(Integer, primary_key=True, index=True)
@@ -1,72 +1,182 @@
-import pandas as pd
 import numpy as np
 from xgboost import XGBRegressor
 from sklearn.ensemble import RandomForestRegressor
 from sklearn.model_selection import train_test_split
 from sklearn.preprocessing import StandardScaler
 import joblib
+import math
 import os
-from utils import extract_features
+import time
+from artifacts import ArtifactBundle, ArtifactWriter, current_version_path, new_version_name, publish_version
+from training_data import count_ratings, iter_rating_batches
+from utils import extract_features_many
+from metrics import PREDICTOR_LATENCY
 
 class RatingPredictor:
     def __init__(self, model_dir="models"):
+        # model_dir holds versions/<version> bundles and a CURRENT pointer; each version is
+        # written once and never modified, so lazily loaded parts always match the scaler
         self.model_dir = model_dir
+        self.path = model_dir
+        self.n_features = None
+        self._bundle = None
         self.xgb = XGBRegressor(n_estimators=300, random_state=42, max_depth=3, verbosity=0)
         self.rf = RandomForestRegressor(n_estimators=200, random_state=42)
         self.scaler = StandardScaler()
         self.fitted = False
+        self.timings = {}
 
-    def fit(self, movies, ratings, mlb_genres):
-        X = []
-        y = []
-        for r in ratings:
-            movie = next((m for m in movies if m.id == r.movie_id), None)
-            if movie:
-                X.append(extract_features(movie, mlb_genres))
-                y.append(r.rating)
-        X = np.array(X)
-        y = np.array(y)
+    def fit(self, db, mlb_genres, feature_store=None, batch_size=100000):
+        """
+        Train on every rating joined to its movie in SQL. If the ratings fit in one batch the
+        models are fit in memory as before; otherwise the scaler, XGBoost and the random forest
+        are fit chunk by chunk (partial_fit, boosting continuation and warm-started trees).
+        """
+        self.timings = {}
+        started = time.perf_counter()
+        n_batches = max(1, math.ceil(count_ratings(db) / batch_size))
+        if n_batches == 1:
+            self._fit_in_memory(db, mlb_genres, feature_store, batch_size)
+        else:
+            self._fit_chunked(db, mlb_genres, feature_store, batch_size, n_batches)
+        self.fitted = True
+        self._time("save", self._save)
+        self.timings["total"] = time.perf_counter() - started
+        print("\n--- Timings (s) ---")
+        for stage, seconds in self.timings.items():
+            print(f"{stage}: {seconds:.2f}")
+
+    def _time(self, stage, fn, *args, **kwargs):
+        started = time.perf_counter()
+        result = fn(*args, **kwargs)
+        self.timings[stage] = self.timings.get(stage, 0.0) + time.perf_counter() - started
+        return result
+
+    def _fit_in_memory(self, db, mlb_genres, feature_store, batch_size):
+        batches = list(iter_rating_batches(db, mlb_genres, batch_size, feature_store, self.timings))
+        X = np.vstack([b[0] for b in batches])
+        y = np.concatenate([b[1] for b in batches])
         X_train, X_test, y_train, y_test = train_test_split(
             X, y, test_size=0.3, random_state=42
         )
         X_res, y_res = X_train, y_train
-        X_res_scaled = self.scaler.fit_transform(X_res)
+        X_res_scaled = self._time("scale", self.scaler.fit_transform, X_res)
         X_test_scaled = self.scaler.transform(X_test)
-        self.xgb.fit(X_res_scaled, y_res)
-        self.rf.fit(X_res_scaled, y_res)
-        self.fitted = True
-        if not os.path.exists(self.model_dir):
-            os.makedirs(self.model_dir)
-        joblib.dump(self.xgb, os.path.join(self.model_dir, "xgb_regressor.pkl"))
-        joblib.dump(self.rf, os.path.join(self.model_dir, "rf_regressor.pkl"))
-        joblib.dump(self.scaler, os.path.join(self.model_dir, "scaler.pkl"))
+        self._time("fit_xgb", self.xgb.fit, X_res_scaled, y_res)
+        self._time("fit_rf", self.rf.fit, X_res_scaled, y_res)
         from sklearn.metrics import mean_squared_error, r2_score
         xgb_pred = self.xgb.predict(X_test_scaled)
         rf_pred = self.rf.predict(X_test_scaled)
-        print("\n--- XGBoost ---")
-        print("MSE:", mean_squared_error(y_test, xgb_pred))
-        print("R2 :", r2_score(y_test, xgb_pred))
-        print("\n--- Random Forest ---")
-        print("MSE:", mean_squared_error(y_test, rf_pred))
-        print("R2 :", r2_score(y_test, rf_pred))
+        self._report("XGBoost", mean_squared_error(y_test, xgb_pred), r2_score(y_test, xgb_pred))
+        self._report("Random Forest", mean_squared_error(y_test, rf_pred), r2_score(y_test, rf_pred))
+
+    def _fit_chunked(self, db, mlb_genres, feature_store, batch_size, n_batches):
+        def train_test_batches():
+            for X, y in iter_rating_batches(db, mlb_genres, batch_size, feature_store, self.timings):
+                yield train_test_split(X, y, test_size=0.3, random_state=42)
+
+        # Pass 1: scaler statistics
+        for X_train, _, _, _ in train_test_batches():
+            self._time("scale", self.scaler.partial_fit, X_train)
+
+        # Pass 2: each chunk adds its share of boosting rounds and trees
+        xgb_rounds = max(1, self.xgb.get_params()["n_estimators"] // n_batches)
+        rf_trees = max(1, self.rf.get_params()["n_estimators"] // n_batches)
+        self.xgb.set_params(n_estimators=xgb_rounds)
+        self.rf.set_params(warm_start=True, n_estimators=0)
+        for i, (X_train, _, y_train, _) in enumerate(train_test_batches()):
+            X_train_scaled = self.scaler.transform(X_train)
+            booster = self.xgb.get_booster() if i else None
+            self._time("fit_xgb", self.xgb.fit, X_train_scaled, y_train, xgb_model=booster)
+            self.rf.set_params(n_estimators=self.rf.n_estimators + rf_trees)
+            self._time("fit_rf", self.rf.fit, X_train_scaled, y_train)
+        self.rf.set_params(warm_start=False)
+
+        # Pass 3: score the finished models on the same held-out rows (batches are ordered by rating id,
+        # so the splits repeat), making the report comparable with the in-memory path
+        test_stats = {"XGBoost": [0.0, 0.0, 0.0, 0], "Random Forest": [0.0, 0.0, 0.0, 0]}
+        for _, X_test, _, y_test in train_test_batches():
+            X_test_scaled = self.scaler.transform(X_test)
+            for name, model in (("XGBoost", self.xgb), ("Random Forest", self.rf)):
+                # Running sums for MSE and R2: squared error, sum y, sum y^2, count
+                stats = test_stats[name]
+                stats[0] += float(((model.predict(X_test_scaled) - y_test) ** 2).sum())
+                stats[1] += float(y_test.sum())
+                stats[2] += float((y_test ** 2).sum())
+                stats[3] += len(y_test)
+        for name, (sse, sum_y, sum_y2, n) in test_stats.items():
+            sst = sum_y2 - sum_y ** 2 / n if n else 0.0
+            self._report(name, sse / n if n else float("nan"), 1 - sse / sst if sst else float("nan"))
+
+    def _report(self, name, mse, r2):
+        print(f"\n--- {name} ---")
+        print("MSE:", mse)
+        print("R2 :", r2)
+
+    def _save(self):
+        version = new_version_name()
+        self.path = os.path.join(self.model_dir, "versions", version)
+        writer = ArtifactWriter(self.path)
+        writer.add_xgb("xgb_regressor", self.xgb)
+        writer.add_object("rf_regressor", self.rf)
+        writer.add_object("scaler", self.scaler)
+        self.n_features = int(self.scaler.n_features_in_)
+        writer.write(meta={"n_features": self.n_features})
+        publish_version(version, self.model_dir)
+
+    @property
+    def rf(self):
+        # The forest is only needed for the rf/ensemble modes, so it is loaded on first use
+        if self._rf is None and self._bundle is not None:
+            self._bundle.verify(["rf_regressor"])  # checked again on first use, not only at load
+            self._rf = self._bundle.get("rf_regressor")
+        return self._rf
+
+    @rf.setter
+    def rf(self, value):
+        self._rf = value
 
     def load(self):
-        self.xgb = joblib.load(os.path.join(self.model_dir, "xgb_regressor.pkl"))
-        self.rf = joblib.load(os.path.join(self.model_dir, "rf_regressor.pkl"))
-        self.scaler = joblib.load(os.path.join(self.model_dir, "scaler.pkl"))
+        started = time.perf_counter()
+        self.path = current_version_path(self.model_dir)
+        if ArtifactBundle.exists(self.path):
+            bundle = ArtifactBundle(self.path)
+            bundle.verify()
+            loaded = bundle.get_many(["xgb_regressor", "scaler"])
+            self.xgb = loaded["xgb_regressor"]
+            self.scaler = loaded["scaler"]
+            self.n_features = bundle.meta.get("n_features")
+            self._rf = None
+            self._bundle = bundle
+        else:
+            self.xgb = joblib.load(os.path.join(self.path, "xgb_regressor.pkl"))
+            self.rf = joblib.load(os.path.join(self.path, "rf_regressor.pkl"))
+            self.scaler = joblib.load(os.path.join(self.path, "scaler.pkl"))
+        if self.n_features is None:
+            self.n_features = getattr(self.scaler, "n_features_in_", None)
         self.fitted = True
+        print(f"{time.strftime('%H:%M:%S')} - Rating models loaded from {self.path} in {time.perf_counter() - started:.2f}s")
+
+    def accepts(self, n_features):
+        # The models only work on rows as wide as the ones they were trained on
+        return self.n_features is None or self.n_features == n_features
 
     def predict(self, movie, mlb_genres, model="xgb"):
-        features = extract_features(movie, mlb_genres)
-        X = pd.DataFrame([features])
-        X_scaled = self.scaler.transform(X)
-        if model == "xgb":
-            return float(self.xgb.predict(X_scaled)[0])
-        elif model == "rf":
-            return float(self.rf.predict(X_scaled)[0])
-        elif model == "ensemble":
-            xgb_pred = self.xgb.predict(X_scaled)
-            rf_pred = self.rf.predict(X_scaled)
-            return float((xgb_pred + rf_pred) / 2)
-        else:
-            raise ValueError("Unknown model: choose 'xgb' or 'rf'")
\ No newline at end of file
+        return float(self.predict_many([movie], mlb_genres, model=model)[0])
+
+    def predict_many(self, movies, mlb_genres, model="xgb", feature_store=None):
+        return self.predict_features(extract_features_many(movies, mlb_genres, feature_store), model=model)
+
+    def predict_features(self, X, model="xgb"):
+        if model not in ("xgb", "rf", "ensemble"):
+            raise ValueError("Unknown model: choose 'xgb', 'rf' or 'ensemble'")
+        if len(X) == 0:
+            return np.empty(0)
+        with PREDICTOR_LATENCY.time(model):
+            X_scaled = self.scaler.transform(X)
+            if model == "xgb":
+                return self.xgb.predict(X_scaled).astype(float)
+            elif model == "rf":
+                return self.rf.predict(X_scaled).astype(float)
+            else:
+                return (self.xgb.predict(X_scaled) + self.rf.predict(X_scaled)) / 2
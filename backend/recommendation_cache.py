@@ -0,0 +1,141 @@
+import json
+import os
+import threading
+from collections import OrderedDict
+from streaming import dumps
+
+RECS_CACHE_SIZE = int(os.getenv("RECS_CACHE_SIZE", "10000"))
+RECS_CACHE_MAX_BYTES = int(os.getenv("RECS_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+RECS_CACHE_TTL = int(os.getenv("RECS_CACHE_TTL", "3600"))
+REDIS_URL = os.getenv("REDIS_URL")
+
+class LocalBackend:
+    """
+    In-process LRU of serialized results, bounded by entry count and total bytes. Holds one
+    entry per user (the newest key wins); rating versions live in a plain dict next to it.
+    Async only to share the RedisBackend interface; nothing here awaits.
+    """
+
+    def __init__(self, max_entries=RECS_CACHE_SIZE, max_bytes=RECS_CACHE_MAX_BYTES):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        self._entries = OrderedDict()  # user_id -> (key, serialized results)
+        self._versions = {}
+        self._lock = threading.Lock()
+        self.evictions = 0
+
+    async def get(self, user_id, key):
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None or entry[0] != key:
+                return None
+            self._entries.move_to_end(user_id)
+            return entry[1]
+
+    async def set(self, user_id, key, value: bytes):
+        with self._lock:
+            old = self._entries.pop(user_id, None)
+            if old is not None:
+                self.bytes -= len(old[1])
+            self._entries[user_id] = (key, value)
+            self.bytes += len(value)
+            while self._entries and (len(self._entries) > self.max_entries or self.bytes > self.max_bytes):
+                _, (_, evicted) = self._entries.popitem(last=False)
+                self.bytes -= len(evicted)
+                self.evictions += 1
+
+    async def version(self, user_id):
+        return self._versions.get(user_id, 0)
+
+    async def bump_version(self, user_id):
+        with self._lock:
+            self._versions[user_id] = self._versions.get(user_id, 0) + 1
+            # The cached entry is unreachable now; free it instead of waiting for the LRU
+            old = self._entries.pop(user_id, None)
+            if old is not None:
+                self.bytes -= len(old[1])
+
+    async def close(self):
+        pass
+
+    def stats(self):
+        return {"entries": len(self._entries), "bytes": self.bytes, "max_bytes": self.max_bytes, "evictions": self.evictions}
+
+class RedisBackend:
+    """
+    Shared backend for several workers, for Redis or any server speaking its protocol.
+    Memory is capped by the server (maxmemory + an LRU policy) and every entry gets a TTL.
+    Uses the asyncio client, so a slow server never blocks the event loop.
+    """
+
+    def __init__(self, url, ttl_seconds=RECS_CACHE_TTL, prefix="recs"):
+        import redis.asyncio
+        self.client = redis.asyncio.Redis.from_url(url)
+        self.ttl_seconds = ttl_seconds
+        self.prefix = prefix
+
+    async def get(self, user_id, key):
+        return await self.client.get(f"{self.prefix}:{key}")
+
+    async def set(self, user_id, key, value: bytes):
+        await self.client.set(f"{self.prefix}:{key}", value, ex=self.ttl_seconds)
+
+    async def version(self, user_id):
+        value = await self.client.get(f"{self.prefix}:ver:{user_id}")
+        return int(value) if value is not None else 0
+
+    async def bump_version(self, user_id):
+        await self.client.incr(f"{self.prefix}:ver:{user_id}")
+
+    async def close(self):
+        await self.client.aclose()
+
+    def stats(self):
+        return {}
+
+def default_backend():
+    if REDIS_URL:
+        try:
+            return RedisBackend(REDIS_URL)
+        except ImportError:
+            print("REDIS_URL is set but the redis package is not installed; using the in-process recommendation cache")
+    return LocalBackend()
+
+class RecommendationCache:
+    """
+    Finished /recommendations results per user, keyed by (user_id, model version, catalog version,
+    user rating version). Rating mutations bump the user's rating version, a model swap changes the
+    model version and a catalog refresh the catalog version (results embed movie rows), so stale
+    entries are never read and simply age out. Results must depend only on the
+    database and the model version (not on per-worker state) for a shared backend to be correct.
+    """
+
+    def __init__(self, backend=None):
+        self.backend = backend or default_backend()
+        self.counters = {"hits": 0, "misses": 0, "invalidations": 0}
+
+    async def key(self, user_id, model_version, catalog_version=None):
+        # Take the key before computing, so a rating that lands meanwhile is not hidden behind it
+        return f"{user_id}:{model_version}:{catalog_version}:{await self.backend.version(user_id)}"
+
+    async def get(self, user_id, key):
+        value = await self.backend.get(user_id, key)
+        if value is None:
+            self.counters["misses"] += 1
+            return None
+        self.counters["hits"] += 1
+        return json.loads(value)
+
+    async def set(self, user_id, key, results):
+        await self.backend.set(user_id, key, dumps(results))
+
+    async def invalidate_user(self, user_id):
+        self.counters["invalidations"] += 1
+        await self.backend.bump_version(user_id)
+
+    async def close(self):
+        await self.backend.close()
+
+    def stats(self):
+        return dict(self.counters, **self.backend.stats())
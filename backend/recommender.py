@@ -1,23 +1,145 @@
 import pandas as pd
 import numpy as np
-from sklearn.cluster import KMeans
+from sklearn.base import clone
+from sklearn.feature_extraction.text import TfidfVectorizer
 from sklearn.preprocessing import MultiLabelBinarizer
 from sqlalchemy.orm import Session
-from models import Movie, Rating
+from models import Movie
+from catalog import catalog_signature
+from feature_store import FeatureStore
+from artifacts import (
+    ArtifactBundle, ArtifactWriter, ArtifactError, current_version_path, new_version_name, publish_version
+)
+from utils import build_feature_matrix
+from clustering import GenreClusterer
+from similarity import SimilarityIndex, item_embeddings
+from metrics import RECOMMENDER_PHASE
 import joblib
 import os
+import time
+
+# IMDb weighted rating: (v/(v+m))*R + (m/(v+m))*C with m votes as the threshold
+VOTE_THRESHOLD = 1500
+MAX_CANDIDATES = 2000
+# Movies per batch fed to the minibatch clustering
+CLUSTER_BATCH_ROWS = 10000
+# Extra candidates from the similar-titles index: neighbours of the user's best rated titles
+SIMILAR_SEEDS = 5
+SIMILAR_PER_SEED = 50
+
+ARTIFACT_ROOT = "recommender_data"
+KEEP_VERSIONS = 3
+
+def current_artifact_path(root=ARTIFACT_ROOT):
+    return current_version_path(root)
+
+def publish_artifacts(version, root=ARTIFACT_ROOT, keep=KEEP_VERSIONS):
+    publish_version(version, root, keep)
+
+def previous_centers(root=ARTIFACT_ROOT):
+    # Centroids of the published version, used to warm-start the next fit
+    path = current_artifact_path(root)
+    try:
+        bundle = ArtifactBundle(path)
+        return bundle.get("centroids") if "centroids" in bundle else None
+    except ArtifactError:
+        return None
+
+def previous_genre_encoder(root=ARTIFACT_ROOT):
+    # The genre encoder the rating predictor was trained against: the published one, else the shipped
+    # mlb_genres.pkl. Refits keep its classes so the feature width never changes under the predictor
+    try:
+        bundle = ArtifactBundle(current_artifact_path(root))
+        if "mlb_genres" in bundle:
+            return bundle.get("mlb_genres")
+    except ArtifactError:
+        pass
+    legacy = os.path.join(root, "mlb_genres.pkl")
+    return joblib.load(legacy) if os.path.exists(legacy) else None
+
+def load_or_fit_recommender(db: Session, root=ARTIFACT_ROOT):
+    """
+    Load the published artifacts if they were built from the current catalog (same catalog
+    signature), otherwise fit from the database and publish the result as a new version.
+    """
+    started = time.perf_counter()
+    path = current_artifact_path(root)
+    try:
+        if not ArtifactBundle.exists(path):
+            reason = f"no artifact manifest in {path}"
+        else:
+            built_for = ArtifactBundle(path).meta.get("catalog_version")
+            current = catalog_signature(db)
+            if built_for == current:
+                recommender = Recommender(db, load_only=True, path=path)
+                print(f"{time.strftime('%H:%M:%S')} - Recommender loaded for catalog {current} in {time.perf_counter() - started:.2f}s")
+                return recommender
+            reason = f"artifacts built for catalog {built_for}, current catalog is {current}"
+    except ArtifactError as e:
+        reason = str(e)
+    print(f"{time.strftime('%H:%M:%S')} - Fitting recommender: {reason}")
+    recommender = Recommender(db, init_centers=previous_centers(root), mlb_genres=previous_genre_encoder(root))
+    version = new_version_name()
+    recommender.save(os.path.join(root, "versions", version))
+    publish_artifacts(version, root)
+    print(f"{time.strftime('%H:%M:%S')} - Recommender fitted and published as {version} in {time.perf_counter() - started:.2f}s")
+    return recommender
+
+def refresh_recommender(db: Session, changed_ids, root=ARTIFACT_ROOT, chunksize=10000):
+    """
+    Apply a catalog delta (updated and new movie ids) to the published recommender without
+    refitting: only the affected rows get new features and clusters, then a new version is published.
+    Falls back to load_or_fit_recommender when there is nothing to patch.
+    """
+    started = time.perf_counter()
+    path = current_artifact_path(root)
+    if not ArtifactBundle.exists(path):
+        return load_or_fit_recommender(db, root)
+    recommender = Recommender(db, load_only=True, path=path)
+    if recommender.feature_store is None:
+        return load_or_fit_recommender(db, root)
+    changed_ids = list(changed_ids)
+    columns = [
+        Movie.id, Movie.title, Movie.genres, Movie.averageRating, Movie.startYear, Movie.numVotes,
+        Movie.directors, Movie.writers
+    ]
+    rows = []
+    for start in range(0, len(changed_ids), chunksize):
+        rows.extend(db.query(*columns).filter(Movie.id.in_(changed_ids[start:start + chunksize])))
+    changes = pd.DataFrame(rows, columns=[c.key for c in columns]).set_index("id")
+    recommender.apply_catalog_changes(changes, catalog_signature(db))
+    version = new_version_name()
+    recommender.save(os.path.join(root, "versions", version))
+    publish_artifacts(version, root)
+    print(f"{time.strftime('%H:%M:%S')} - Recommender refreshed for {len(changes)} movies and published as {version} in {time.perf_counter() - started:.2f}s")
+    return recommender
 
 def split_comma_space(x):
     return x.split(", ") if x else []
 
+def name_vectorizer(name, root=ARTIFACT_ROOT):
+    # The shipped tfidf_{directors,writers}.pkl fix the settings; the copy is refitted on the current catalog
+    path = os.path.join(root, f"tfidf_{name}.pkl")
+    if os.path.exists(path):
+        return clone(joblib.load(path))
+    return TfidfVectorizer(tokenizer=split_comma_space, lowercase=False, token_pattern=None)
+
 class Recommender:
-    def __init__(self, db: Session, load_only: bool = False, path="recommender_data"):
+    def __init__(self, db: Session, load_only: bool = False, path="recommender_data", init_centers=None, mlb_genres=None):
         self.db = db
-        self.kmeans = KMeans(n_clusters=50, random_state=42, n_init=10)
+        self.kmeans = None
+        self.init_centers = init_centers
         self.movie_data = None
-        self.user_ratings = None
+        self.cluster_index = {}
+        self.feature_store = None
+        self.cluster_centers = None
+        self.artifact_meta = {}
         self.movie_clusters = None
-        self.mlb_genres = MultiLabelBinarizer()
+        self.similarity = None
+        self.tfidf_directors = None
+        self.tfidf_writers = None
+        # A given encoder fixes the genre classes (and so the feature width); unseen genre values encode as zeros
+        self.mlb_genres = MultiLabelBinarizer(classes=list(mlb_genres.classes_)) if mlb_genres is not None else MultiLabelBinarizer()
         if load_only and os.path.exists(path):
             self.load(path)
         else:
@@ -25,9 +147,9 @@ class Recommender:
 
     def fit(self):
         movies = self.db.query(Movie).all()
-        ratings = self.db.query(Rating).all()
         movie_data = pd.DataFrame([{
             "id": m.id,
+            "title": m.title,
             "genres": m.genres,
             "averageRating": m.averageRating,
             "startYear": m.startYear,
@@ -36,117 +158,309 @@ class Recommender:
         self.movie_data = movie_data.set_index("id")
         self.movie_data["genres_list"] = self.movie_data["genres"].apply(split_comma_space)
         self.mlb_genres.fit(self.movie_data["genres_list"])
-        genres_encoded = self.mlb_genres.transform(self.movie_data["genres_list"])
-        features = np.concatenate([genres_encoded, genres_encoded], axis=1)  # double weight
-        self.features = features
-        self.movie_clusters = self.kmeans.fit_predict(features)
+        self.feature_store = FeatureStore(
+            build_feature_matrix(
+                self.movie_data["genres_list"], self.movie_data["averageRating"], self.movie_data["numVotes"],
+                self.mlb_genres
+            ).astype(np.float32),
+            self.movie_data.index.to_numpy(),
+            n_genres=len(self.mlb_genres.classes_),
+            catalog_version=catalog_signature(self.db)
+        )
+        self.features = self.feature_store.genre_features  # genres, double weight
+        clusterer = GenreClusterer(self.mlb_genres, init_centers=self.init_centers)
+        if clusterer.engine == "minibatch":
+            genres_lists = self.movie_data["genres_list"]
+            clusterer.fit_batches(
+                genres_lists.iloc[start:start + CLUSTER_BATCH_ROWS].tolist()
+                for start in range(0, len(genres_lists), CLUSTER_BATCH_ROWS)
+            )
+            self.movie_clusters = clusterer.predict(self.movie_data["genres_list"])
+        else:
+            self.movie_clusters = clusterer.fit(self.movie_data["genres_list"])
+        self.cluster_centers = clusterer.cluster_centers_
+        self.kmeans = clusterer.model
         self.movie_data["cluster"] = self.movie_clusters
-        if ratings:
-            self.user_ratings = pd.DataFrame([{
-                "user_id": r.user_id,
-                "movie_id": r.movie_id,
-                "rating": r.rating
-            } for r in ratings])
+        self._cache_columns()
+        self._build_cluster_index()
+        self._build_similarity([m.directors for m in movies], [m.writers for m in movies])
+
+    def _build_similarity(self, directors, writers):
+        started = time.perf_counter()
+        try:
+            self.tfidf_directors = name_vectorizer("directors").fit([d for d in directors if isinstance(d, str)])
+            self.tfidf_writers = name_vectorizer("writers").fit([w for w in writers if isinstance(w, str)])
+        except ValueError:
+            # No crew names at all (empty vocabulary): /movies/{id}/similar stays unavailable
+            print(f"{time.strftime('%H:%M:%S')} - No directors/writers in the catalog; similar-titles index skipped")
+            return
+        embeddings = item_embeddings(
+            self.movie_data["genres_list"], directors, writers, self.mlb_genres, self.tfidf_directors, self.tfidf_writers
+        )
+        self.similarity = SimilarityIndex.build(self.movie_data.index.to_numpy(), embeddings)
+        print(f"{time.strftime('%H:%M:%S')} - Similar-titles index built for {len(self.similarity)} movies in {time.perf_counter() - started:.2f}s")
+
+    def apply_catalog_changes(self, changes: pd.DataFrame, catalog_version):
+        """
+        Patch in updated/new movies (indexed by id, same columns as fit's movie_data). Features are
+        rebuilt for these rows only; new titles and titles whose genres changed join the nearest
+        existing centroid, everything else keeps its cluster.
+        """
+        if changes.empty:
+            return
+        changes = changes.copy()
+        changes["genres_list"] = changes["genres"].apply(split_comma_space)
+        unknown = {g for genres in changes["genres_list"] for g in genres} - set(self.mlb_genres.classes_)
+        if unknown:
+            print(f"{time.strftime('%H:%M:%S')} - {len(unknown)} genre values unknown to the fitted model are ignored until the next full fit")
+        X = build_feature_matrix(
+            changes["genres_list"], changes["averageRating"], changes["numVotes"], self.mlb_genres
+        ).astype(np.float32)
+        self.feature_store = self.feature_store.with_rows(changes.index.to_numpy(), X, catalog_version)
+        self.features = self.feature_store.genre_features
+        if self.similarity is not None and "directors" in changes:
+            self.similarity = self.similarity.with_rows(changes.index.to_numpy(), item_embeddings(
+                changes["genres_list"], changes["directors"], changes["writers"],
+                self.mlb_genres, self.tfidf_directors, self.tfidf_writers
+            ))
+
+        ids = changes.index
+        existing = ids.isin(self.movie_data.index)
+        clusters = np.full(len(ids), -1, dtype=np.int64)
+        clusters[existing] = self.movie_data.loc[ids[existing], "cluster"].to_numpy()
+        same_genres = np.zeros(len(ids), dtype=bool)
+        same_genres[existing] = (
+            self.movie_data.loc[ids[existing], "genres"].fillna("").to_numpy() == changes["genres"][existing].fillna("").to_numpy()
+        )
+        reassign = ~same_genres
+        if reassign.any():
+            # Nearest centroid via |x|^2 - 2x.c + |c|^2, without materializing all differences
+            block = X[reassign, :2 * self.feature_store.n_genres].astype(float)
+            centers = np.asarray(self.cluster_centers, dtype=float)
+            distances = (block ** 2).sum(1)[:, None] - 2 * block @ centers.T + (centers ** 2).sum(1)[None, :]
+            clusters[reassign] = distances.argmin(1)
+        changes["cluster"] = clusters
+
+        kept = self.movie_data.drop(index=ids[existing])
+        self.movie_data = pd.concat([kept, changes[[c for c in kept.columns if c in changes.columns]]])
+        self._cache_columns()
+        self._build_cluster_index()
+        self.artifact_meta = dict(self.artifact_meta, catalog_version=catalog_version)
+
+    def _cache_columns(self):
+        # Array-backed copies of the columns used for scoring, plus the global mean C
+        avg_rating = self.movie_data["averageRating"].to_numpy(dtype=float)
+        num_votes = self.movie_data["numVotes"].fillna(0).to_numpy(dtype=float)
+        self.global_mean = 0.0 if np.all(np.isnan(avg_rating)) else float(np.nanmean(avg_rating))
+        avg_rating = np.nan_to_num(avg_rating)
+        m = VOTE_THRESHOLD
+        weighted = np.where(
+            num_votes > 0,
+            (num_votes / (num_votes + m)) * avg_rating + (m / (num_votes + m)) * self.global_mean,
+            0.0
+        )
+        self.movie_data["weighted_score"] = weighted
+        self._avg_rating = avg_rating
+        self._num_votes = num_votes
+        self._weighted = weighted
+        self._clusters = self.movie_data["cluster"].to_numpy()
+        self._start_years = self.movie_data["startYear"].to_numpy()
+        if "title" in self.movie_data:
+            self._titles = self.movie_data["title"].to_numpy()
         else:
-            self.user_ratings = pd.DataFrame(columns=["user_id", "movie_id", "rating"])
+            self._titles = np.full(len(self.movie_data), None, dtype=object)
 
-    def get_recommendations(self, user_id: int, n: int = 10, rating_predictor=None):
-        user_ratings = self.user_ratings[self.user_ratings["user_id"] == user_id]
-        if user_ratings.empty:
+    def _build_cluster_index(self):
+        # cluster -> (movie ids, weighted scores), both sorted by weighted score desc then id
+        ids = self.movie_data.index.to_numpy()
+        weighted = self._weighted
+        clusters = self._clusters
+        order = np.lexsort((ids, -weighted, clusters))
+        ids, weighted, clusters = ids[order], weighted[order], clusters[order]
+        cluster_ids, starts = np.unique(clusters, return_index=True)
+        self.cluster_index = {
+            int(c): (ids_part, scores_part)
+            for c, ids_part, scores_part in zip(cluster_ids, np.split(ids, starts[1:]), np.split(weighted, starts[1:]))
+        }
+
+    def _candidate_ids(self, clusters, exclude, limit=MAX_CANDIDATES):
+        # Top-k merge of the per-cluster ranked lists, skipping already rated titles
+        head = limit + len(exclude)
+        parts = [self.cluster_index[c] for c in clusters if c in self.cluster_index]
+        if not parts:
+            return np.array([], dtype=np.int64)
+        ids = np.concatenate([p_ids[:head] for p_ids, _ in parts])
+        scores = np.concatenate([p_scores[:head] for _, p_scores in parts])
+        keep = ~np.isin(ids, np.fromiter(exclude, dtype=ids.dtype, count=len(exclude)))
+        ids, scores = ids[keep], scores[keep]
+        return ids[np.lexsort((ids, -scores))[:limit]]
+
+    def _similar_candidates(self, user_ratings, exclude, known):
+        # Neighbours of the best rated titles that the cluster candidates do not already cover
+        seeds = user_ratings.sort_values(ascending=False, kind="stable").index[:SIMILAR_SEEDS]
+        found = [np.array([], dtype=np.int64)]
+        for movie_id in seeds:
+            try:
+                found.append(self.similarity.similar(movie_id, SIMILAR_PER_SEED, exclude=exclude)[0])
+            except KeyError:
+                continue
+        found = pd.unique(np.concatenate(found))
+        return found[~np.isin(found, known) & np.isin(found, self.movie_data.index)]
+
+    def get_recommendations(self, user_ratings, n: int = 10, rating_predictor=None, prediction_model="xgb"):
+        """
+        user_ratings ({movie_id: rating}) is read from the database for the request; the recommender
+        keeps no per-user state, so every worker and every loaded version agree.
+        """
+        if not user_ratings:
             return self._get_top_n_movies(n)
-         
-        rated_movies = user_ratings.merge(self.movie_data, left_on="movie_id", right_index=True)
+
+        phase_started = time.perf_counter()
+        user_ratings = pd.Series(user_ratings, name="rating")
+        rated_movies = self.movie_data[["cluster"]].join(user_ratings, how="inner")
         cluster_ratings = rated_movies.groupby("cluster")["rating"].mean().to_dict()
-        rated_movie_ids = set(user_ratings["movie_id"])
-        cluster_scores = [(cluster, rating) for cluster, rating in cluster_ratings.items()]
-        cluster_scores.sort(key=lambda x: x[1], reverse=True)
-        
-        candidate_movies = set()
-        for cluster, _ in cluster_scores:
-            cluster_movies = self.movie_data[self.movie_data["cluster"] == cluster].index
-            candidate_movies.update(cluster_movies)
-        
-        candidate_movies = candidate_movies - rated_movie_ids
-
-        # limit to 100 titles for performance
-        candidate_movies = list(candidate_movies)[:100]
-
-        movie_objs = self.db.query(Movie).filter(Movie.id.in_(candidate_movies)).all()
-        movie_map = {m.id: m for m in movie_objs}
-
-        movie_scores = []
-        for movie_id in candidate_movies:
-            movie = movie_map.get(movie_id)
-            if not movie:
-                continue
-            cluster = self.movie_data.loc[movie_id, "cluster"]
-            cluster_score = cluster_ratings.get(cluster, 0.0)
-            avg_rating = movie.averageRating if movie.averageRating is not None else 0
-            num_votes = movie.numVotes if movie.numVotes is not None else 0
-
-            # Predict user rating if predictor is provided
-            predicted_rating = None
-            if rating_predictor is not None:
-                try:
-                    predicted_rating = rating_predictor.predict(user_id, movie_id)
-                except Exception:
-                    predicted_rating = None
-
-            # Weighted score: prioritize both average rating and number of votes
-            # IMDb formula: weighted = (v/(v+m))*R + (m/(v+m))*C
-            # where R = avg_rating, v = num_votes, m = 1500 (threshold), C = mean of all avg_ratings
-            m = 1500
-            C = self.movie_data["averageRating"].mean() if not np.isnan(self.movie_data["averageRating"].mean()) else 0
-            if num_votes > 0:
-                weighted_score = (num_votes / (num_votes + m)) * avg_rating + (m / (num_votes + m)) * C
-            else:
-                weighted_score = 0
-
-            movie_scores.append({
-                "id": movie_id,
-                "title": movie.title,
-                "averageRating": avg_rating,
-                "startYear": movie.startYear,
-                "numVotes": num_votes,
-                "cluster_score": cluster_score,
-                "weighted_score": weighted_score,
-                "predicted_rating": predicted_rating
-            })
-
-        # Sort by predicted_rating if available, else by weighted_score
-        movie_scores.sort(
-            key=lambda x: (x["predicted_rating"] if x["predicted_rating"] is not None else -1, x["weighted_score"]),
-            reverse=True
-        )
-        return movie_scores[:n]
+        rated_movie_ids = set(user_ratings.index)
+        best_clusters = sorted(cluster_ratings, key=cluster_ratings.get, reverse=True)
+        candidate_ids = self._candidate_ids(best_clusters, rated_movie_ids)
+        if self.similarity is not None:
+            similar_ids = self._similar_candidates(user_ratings, rated_movie_ids, candidate_ids)
+            candidate_ids = np.concatenate([candidate_ids, similar_ids])
+        pos = self.movie_data.index.get_indexer(candidate_ids)
+        RECOMMENDER_PHASE.observe(time.perf_counter() - phase_started, "candidates")
+
+        # Score all candidates in one pass over the cached columns
+        cluster_lookup = np.zeros(int(self._clusters.max()) + 1)
+        cluster_lookup[list(cluster_ratings)] = list(cluster_ratings.values())
+        cluster_score = cluster_lookup[self._clusters[pos]]
+        weighted_score = self._weighted[pos]
+
+        # Predict user rating if predictor is provided
+        phase_started = time.perf_counter()
+        predicted = np.full(len(pos), np.nan)
+        if rating_predictor is not None and len(pos):
+            try:
+                if self.feature_store is not None:
+                    X = self.feature_store.rows(candidate_ids)
+                else:
+                    X = build_feature_matrix(
+                        self.movie_data["genres_list"].iloc[pos], self._avg_rating[pos], self._num_votes[pos],
+                        self.mlb_genres
+                    )
+                predicted = rating_predictor.predict_features(X, model=prediction_model)
+            except Exception:
+                pass
+        RECOMMENDER_PHASE.observe(time.perf_counter() - phase_started, "scoring")
+
+        # Sort by predicted rating if available, else by weighted score
+        phase_started = time.perf_counter()
+        order = np.lexsort((-weighted_score, -np.nan_to_num(predicted, nan=-1.0)))[:n]
+        RECOMMENDER_PHASE.observe(time.perf_counter() - phase_started, "ranking")
+        return [
+            {
+                "id": int(candidate_ids[i]),
+                "title": self._titles[pos[i]],
+                "averageRating": float(self._avg_rating[pos[i]]),
+                "startYear": None if pd.isna(self._start_years[pos[i]]) else int(self._start_years[pos[i]]),
+                "numVotes": int(self._num_votes[pos[i]]),
+                "cluster_score": float(cluster_score[i]),
+                "weighted_score": float(weighted_score[i]),
+                "predicted_rating": None if np.isnan(predicted[i]) else float(predicted[i])
+            }
+            for i in order
+        ]
 
     def _get_top_n_movies(self, n: int = 10):
-        movies = self.db.query(Movie).order_by(Movie.averageRating.desc()).limit(n).all()
+        # From the cached columns: no database I/O on the request path
+        ids = self.movie_data.index.to_numpy()
+        order = np.lexsort((ids, -self._avg_rating))[:n]
         return [
             {
-                "id": m.id,
-                "title": m.title,
-                "averageRating": m.averageRating,
-                "startYear": m.startYear,
-                "numVotes": m.numVotes,
+                "id": int(ids[i]),
+                "title": self._titles[i],
+                "averageRating": float(self._avg_rating[i]),
+                "startYear": None if pd.isna(self._start_years[i]) else int(self._start_years[i]),
+                "numVotes": int(self._num_votes[i]),
                 "cluster_score": 0.0
             }
-            for m in movies
+            for i in order
         ]
 
     def train_model(self):
         self.fit()
 
+    @property
+    def n_features(self):
+        # Width of the predictor's feature rows: doubled genres + averageRating + numVotes
+        return 2 * len(self.mlb_genres.classes_) + 2
+
     def save(self, path="recommender_data"):
-        if not os.path.exists(path):
-            os.makedirs(path)
-        joblib.dump(self.kmeans, f"{path}/kmeans.pkl")
-        joblib.dump(self.movie_data, f"{path}/movie_data.pkl")
-        joblib.dump(self.user_ratings, f"{path}/user_ratings.pkl")
-        joblib.dump(self.mlb_genres, f"{path}/mlb_genres.pkl")
+        started = time.perf_counter()
+        writer = ArtifactWriter(path)
+        writer.add_frame("movie_data", self.movie_data.drop(columns=["genres_list"], errors="ignore"))
+        writer.add_array("centroids", self.cluster_centers)
+        writer.add_object("mlb_genres", self.mlb_genres)
+        clusters = sorted(self.cluster_index)
+        writer.add_array("cluster_ids", np.array(clusters, dtype=np.int64))
+        writer.add_array("cluster_offsets", np.cumsum([0] + [len(self.cluster_index[c][0]) for c in clusters]))
+        writer.add_array("cluster_movie_ids", np.concatenate([self.cluster_index[c][0] for c in clusters]))
+        writer.add_array("cluster_scores", np.concatenate([self.cluster_index[c][1] for c in clusters]))
+        if self.feature_store is not None:
+            self.feature_store.save(f"{path}/features")
+            writer.add_existing("features", "features/features.npy", "npy_mmap")
+            writer.add_existing("feature_ids", "features/ids.npy", "npy")
+        if self.similarity is not None:
+            writer.add_object("tfidf_directors", self.tfidf_directors)
+            writer.add_object("tfidf_writers", self.tfidf_writers)
+            self.similarity.write(writer)
+        writer.write(meta={
+            "catalog_version": self.feature_store.catalog_version if self.feature_store is not None else None,
+            "n_clusters": len(self.cluster_centers),
+            "movies": len(self.movie_data),
+        })
+        print(f"{time.strftime('%H:%M:%S')} - Recommender artifacts written to {path} in {time.perf_counter() - started:.2f}s")
 
     def load(self, path="recommender_data"):
+        started = time.perf_counter()
+        if not ArtifactBundle.exists(path):
+            self._load_legacy(path)
+        else:
+            bundle = ArtifactBundle(path)
+            bundle.verify()
+            loaded = bundle.get_many([
+                "movie_data", "centroids", "mlb_genres",
+                "cluster_ids", "cluster_offsets", "cluster_movie_ids", "cluster_scores"
+            ])
+            self.artifact_meta = bundle.meta
+            self.movie_data = loaded["movie_data"]
+            self.movie_data["genres_list"] = self.movie_data["genres"].apply(split_comma_space)
+            self.cluster_centers = loaded["centroids"]
+            self.mlb_genres = loaded["mlb_genres"]
+            offsets = loaded["cluster_offsets"]
+            self.cluster_index = {
+                int(c): (loaded["cluster_movie_ids"][start:end], loaded["cluster_scores"][start:end])
+                for c, start, end in zip(loaded["cluster_ids"], offsets[:-1], offsets[1:])
+            }
+            if "features" in bundle:
+                self.feature_store = FeatureStore.load(f"{path}/features")
+                self.features = self.feature_store.genre_features
+            if "similar_ids" in bundle:
+                self.similarity = SimilarityIndex.from_bundle(bundle)
+                self.tfidf_directors = bundle.get("tfidf_directors")
+                self.tfidf_writers = bundle.get("tfidf_writers")
+            self._cache_columns()
+        print(f"{time.strftime('%H:%M:%S')} - Recommender artifacts loaded from {path} in {time.perf_counter() - started:.2f}s")
+
+    def _load_legacy(self, path):
+        # joblib pickles written before the manifest format
         self.kmeans = joblib.load(f"{path}/kmeans.pkl")
+        self.cluster_centers = self.kmeans.cluster_centers_
         self.movie_data = joblib.load(f"{path}/movie_data.pkl")
-        self.user_ratings = joblib.load(f"{path}/user_ratings.pkl")
-        self.mlb_genres = joblib.load(f"{path}/mlb_genres.pkl")
\ No newline at end of file
+        self.mlb_genres = joblib.load(f"{path}/mlb_genres.pkl")
+        self._cache_columns()
+        if os.path.exists(f"{path}/features/meta.json"):
+            self.feature_store = FeatureStore.load(f"{path}/features")
+            self.features = self.feature_store.genre_features
+        if os.path.exists(f"{path}/cluster_index.pkl"):
+            self.cluster_index = joblib.load(f"{path}/cluster_index.pkl")
+        else:
+            self._build_cluster_index()
@@ -0,0 +1,243 @@
+import argparse
+import re
+import time
+from functools import reduce
+import numpy as np
+from sqlalchemy import or_, func, select, text
+from sqlalchemy.orm import Session
+from models import Movie, Genre, Person, MovieGenre, MoviePerson
+
+SORT_COLUMNS = ("averageRating", "numVotes", "relevance")
+PERSON_ROLES = {"directors": "director", "writers": "writer"}
+
+def split_names(value):
+    # genres are stored as "Action,Drama", people as "Name One, Name Two"
+    if not isinstance(value, str) or not value:
+        return []
+    return [part.strip() for part in value.split(",") if part.strip()]
+
+def split_terms(value):
+    return [term.strip() for term in value.split(",") if term.strip()] if value else []
+
+def trigrams(s):
+    return {s[i:i + 3] for i in range(len(s) - 2)}
+
+def word_trigrams(s):
+    # pg_trgm's extraction: lowercase alphanumeric words, each padded with two spaces before and one after
+    grams = set()
+    for word in re.findall(r"[^\W_]+", s.lower()):
+        padded = f"  {word} "
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+def trigram_similarity(a, b):
+    # pg_trgm's similarity(): shared word trigrams over the union
+    ta, tb = word_trigrams(a), word_trigrams(b)
+    return len(ta & tb) / len(ta | tb) if ta and tb else 0.0
+
+# --- Normalized tables (PostgreSQL and SQLite) ---
+def build_search_tables(db: Session, chunksize=20000):
+    """
+    Rebuild genres, people, movie_genres and movie_people from the comma-joined columns of
+    movies, and create the trigram indexes when running on PostgreSQL.
+    """
+    started = time.perf_counter()
+    genre_ids, person_ids = {}, {}
+    movie_genres, movie_people = [], []
+    for movie_id, genres, directors, writers in (
+        db.query(Movie.id, Movie.genres, Movie.directors, Movie.writers).yield_per(chunksize)
+    ):
+        for name in set(split_names(genres)):
+            movie_genres.append({"movie_id": movie_id, "genre_id": genre_ids.setdefault(name, len(genre_ids) + 1)})
+        for role, names in (("director", directors), ("writer", writers)):
+            for name in set(split_names(names)):
+                person_id = person_ids.setdefault(name, len(person_ids) + 1)
+                movie_people.append({"movie_id": movie_id, "person_id": person_id, "role": role})
+
+    for model in (MovieGenre, MoviePerson, Genre, Person):
+        db.query(model).delete()
+    db.bulk_insert_mappings(Genre, [{"id": i, "name": n} for n, i in genre_ids.items()])
+    db.bulk_insert_mappings(Person, [{"id": i, "name": n} for n, i in person_ids.items()])
+    for rows, model in ((movie_genres, MovieGenre), (movie_people, MoviePerson)):
+        for start in range(0, len(rows), chunksize):
+            db.bulk_insert_mappings(model, rows[start:start + chunksize])
+    db.commit()
+    ensure_search_indexes(db)
+    print(
+        f"{time.strftime('%H:%M:%S')} - Search tables built: {len(genre_ids)} genres, {len(person_ids)} people, "
+        f"{len(movie_people)} credits in {time.perf_counter() - started:.1f}s"
+    )
+
+def ensure_search_tables(db: Session):
+    """
+    Build the normalized tables when the catalog has genres or crew but they were never built, as on
+    deployments upgraded from before they existed (genre/person filters would otherwise match nothing).
+    """
+    ensure_search_indexes(db)
+    missing_genres = db.query(Genre.id).first() is None and db.query(Movie.id).filter(Movie.genres.isnot(None)).first()
+    missing_people = db.query(Person.id).first() is None and db.query(Movie.id).filter(
+        or_(Movie.directors.isnot(None), Movie.writers.isnot(None))
+    ).first()
+    if missing_genres or missing_people:
+        print(f"{time.strftime('%H:%M:%S')} - Search tables are empty; building them now")
+        build_search_tables(db)
+
+def ensure_search_indexes(db: Session):
+    if db.get_bind().dialect.name != "postgresql":
+        return
+    db.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+    db.execute(text("CREATE INDEX IF NOT EXISTS ix_movies_title_trgm ON movies USING gin (title gin_trgm_ops)"))
+    db.execute(text("CREATE INDEX IF NOT EXISTS ix_people_name_trgm ON people USING gin (name gin_trgm_ops)"))
+    db.execute(text("CREATE INDEX IF NOT EXISTS ix_genres_name_trgm ON genres USING gin (name gin_trgm_ops)"))
+    for column in ("averageRating", "numVotes"):
+        db.execute(text(
+            f'CREATE INDEX IF NOT EXISTS "ix_movies_{column}_key" ON movies ((COALESCE("{column}", 0)), id)'
+        ))
+    db.commit()
+
+def sql_search_query(db: Session, title=None, genres=None, writers=None, directors=None, sort_by="averageRating"):
+    """
+    Filtered query over movies using the normalized tables; ILIKE on title and names is
+    served by the pg_trgm GIN indexes. Returns (query of (Movie, sort value), sort expression).
+    """
+    if sort_by == "relevance":
+        sort_expr = func.similarity(Movie.title, title)
+    else:
+        # NULL sorts as 0, like the in-process index: a NULL in a keyset cursor would match no row
+        # and end paging early. Served by the expression indexes from ensure_search_indexes
+        sort_expr = func.coalesce(getattr(Movie, sort_by), 0)
+    db_query = db.query(Movie, sort_expr)
+    if title:
+        db_query = db_query.filter(Movie.title.ilike(f"%{title}%"))
+    terms = split_terms(genres)
+    if terms:
+        matching = (
+            select(MovieGenre.movie_id)
+            .join(Genre, Genre.id == MovieGenre.genre_id)
+            .where(or_(*[Genre.name.ilike(f"%{t}%") for t in terms]))
+        )
+        db_query = db_query.filter(Movie.id.in_(matching))
+    for field, value in (("writers", writers), ("directors", directors)):
+        terms = split_terms(value)
+        if terms:
+            matching = (
+                select(MoviePerson.movie_id)
+                .join(Person, Person.id == MoviePerson.person_id)
+                .where(MoviePerson.role == PERSON_ROLES[field], or_(*[Person.name.ilike(f"%{t}%") for t in terms]))
+            )
+            db_query = db_query.filter(Movie.id.in_(matching))
+    return db_query, sort_expr
+
+# --- In-process fallback for SQLite/test setups ---
+class TrigramIndex:
+    """Case-insensitive substring lookup over a list of strings via trigram posting lists."""
+
+    def __init__(self, values):
+        self.values = [v.lower() if isinstance(v, str) else "" for v in values]
+        postings = {}
+        for pos, value in enumerate(self.values):
+            for gram in trigrams(value):
+                postings.setdefault(gram, []).append(pos)
+        self.postings = {gram: np.array(p, dtype=np.int64) for gram, p in postings.items()}
+
+    def match(self, term):
+        term = term.lower()
+        grams = trigrams(term)
+        if not grams:
+            return np.array([p for p, v in enumerate(self.values) if term in v], dtype=np.int64)
+        lists = sorted((self.postings.get(g, np.empty(0, dtype=np.int64)) for g in grams), key=len)
+        candidates = reduce(lambda a, b: np.intersect1d(a, b, assume_unique=True), lists)
+        return np.array([p for p in candidates if term in self.values[p]], dtype=np.int64)
+
+class SearchIndex:
+    """
+    In-memory equivalent of sql_search_query plus keyset paging, used when the database has no
+    trigram index support. Built from the movies table; catalog_version records which catalog.
+    """
+
+    def __init__(self, ids, titles, avg_ratings, num_votes, genres, directors, writers, catalog_version=None):
+        self.catalog_version = catalog_version
+        self.ids = np.asarray(ids, dtype=np.int64)
+        self.columns = {
+            "averageRating": np.nan_to_num(np.asarray(avg_ratings, dtype=float)),
+            "numVotes": np.nan_to_num(np.asarray(num_votes, dtype=float)),
+        }
+        self.titles = TrigramIndex(titles)
+        self.genres = self._name_index(genres)
+        self.people = {"directors": self._name_index(directors), "writers": self._name_index(writers)}
+
+    @staticmethod
+    def _name_index(values):
+        # (TrigramIndex over distinct names, name position -> movie positions)
+        names, postings = {}, []
+        for pos, value in enumerate(values):
+            for name in set(split_names(value)):
+                if name not in names:
+                    names[name] = len(postings)
+                    postings.append([])
+                postings[names[name]].append(pos)
+        return TrigramIndex(list(names)), [np.array(p, dtype=np.int64) for p in postings]
+
+    @classmethod
+    def from_db(cls, db: Session):
+        from catalog import catalog_signature
+        started = time.perf_counter()
+        version = catalog_signature(db)  # taken first, so a change during the read is seen by the next check
+        rows = db.query(
+            Movie.id, Movie.title, Movie.averageRating, Movie.numVotes, Movie.genres, Movie.directors, Movie.writers
+        ).all()
+        index = cls(*zip(*rows), catalog_version=version) if rows else cls([], [], [], [], [], [], [], version)
+        print(f"{time.strftime('%H:%M:%S')} - In-process search index built for {len(rows)} movies in {time.perf_counter() - started:.1f}s")
+        return index
+
+    def _match_names(self, name_index, value):
+        names, postings = name_index
+        matched = [postings[p] for term in split_terms(value) for p in names.match(term)]
+        return np.unique(np.concatenate(matched)) if matched else np.empty(0, dtype=np.int64)
+
+    def search(self, title=None, genres=None, writers=None, directors=None,
+               sort_by="averageRating", sort_order="desc", after=None, limit=50):
+        """Return (page of movie ids, (sort value, id) of the last row or None if no more pages, total matches)."""
+        sets = []
+        if title:
+            sets.append(self.titles.match(title))
+        if split_terms(genres):
+            sets.append(self._match_names(self.genres, genres))
+        for field, value in (("writers", writers), ("directors", directors)):
+            if split_terms(value):
+                sets.append(self._match_names(self.people[field], value))
+        positions = reduce(np.intersect1d, sets) if sets else np.arange(len(self.ids))
+        total = len(positions)
+
+        ids = self.ids[positions]
+        if sort_by == "relevance":
+            term = title.lower()
+            keys = np.array([trigram_similarity(term, self.titles.values[p]) for p in positions])
+        else:
+            keys = self.columns[sort_by][positions]
+        if after is not None:
+            value, last_id = after
+            if sort_order == "desc":
+                keep = (keys < value) | ((keys == value) & (ids < last_id))
+            else:
+                keep = (keys > value) | ((keys == value) & (ids > last_id))
+            ids, keys = ids[keep], keys[keep]
+        order = np.lexsort((-ids, -keys)) if sort_order == "desc" else np.lexsort((ids, keys))
+        page = order[:limit + 1]
+        next_key = None
+        if len(page) > limit:
+            page = page[:limit]
+            next_key = (float(keys[page[-1]]), int(ids[page[-1]]))
+        return [int(i) for i in ids[page]], next_key, total
+
+if __name__ == "__main__":
+    from catalog import ensure_catalog_schema
+    from database import SessionLocal, engine
+    parser = argparse.ArgumentParser(description="Rebuild the normalized genre/people search tables.")
+    parser.parse_args()
+    ensure_catalog_schema(engine)
+    db = SessionLocal()
+    try:
+        build_search_tables(db)
+    finally:
+        db.close()
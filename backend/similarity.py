@@ -0,0 +1,120 @@
+import os
+import numpy as np
+import pandas as pd
+from scipy import sparse
+from sklearn.cluster import MiniBatchKMeans
+from sklearn.decomposition import TruncatedSVD
+from sklearn.preprocessing import normalize
+
+SIMILAR_DIM = int(os.getenv("SIMILAR_DIM", "128"))
+SIMILAR_N_PROBE = int(os.getenv("SIMILAR_N_PROBE", "8"))
+# Share of the (unit) squared norm given to each block of an item embedding
+BLOCK_WEIGHTS = (("genres", 0.5), ("directors", 0.3), ("writers", 0.2))
+
+def _names(values):
+    # NULL crew columns come back as None or NaN
+    return [v if isinstance(v, str) else "" for v in values]
+
+def item_embeddings(genres_lists, directors, writers, mlb_genres, tfidf_directors, tfidf_writers):
+    """
+    Sparse L2-normalized item embeddings: the genre encoding plus the directors and writers
+    TF-IDF vectors, each block normalized and weighted by BLOCK_WEIGHTS, so the dot product of
+    two rows is their cosine similarity.
+    """
+    blocks = {
+        "genres": sparse.csr_matrix(mlb_genres.transform(genres_lists), dtype=np.float32),
+        "directors": tfidf_directors.transform(_names(directors)),
+        "writers": tfidf_writers.transform(_names(writers)),
+    }
+    weighted = [normalize(blocks[name]) * np.sqrt(weight) for name, weight in BLOCK_WEIGHTS]
+    return normalize(sparse.hstack(weighted, format="csr")).astype(np.float32)
+
+def _project(projection, rows):
+    # Dense unit vectors used to pick the lists; tiny catalogs are indexed without a projection
+    dense = projection.transform(rows) if projection is not None else rows.toarray()
+    return normalize(dense).astype(np.float32)
+
+class SimilarityIndex:
+    """
+    Approximate cosine nearest neighbours over item embeddings, as an inverted file (IVF). The
+    sparse embeddings are projected to SIMILAR_DIM dimensions with TruncatedSVD and partitioned
+    into ~sqrt(n) lists with MiniBatchKMeans; a query scans the n_probe lists whose centroids are
+    closest to its projection and re-ranks those rows by exact cosine on the sparse embeddings.
+    """
+
+    def __init__(self, ids, embeddings, projection, centroids, assignments):
+        self.ids = np.asarray(ids)
+        self.embeddings = embeddings
+        self.projection = projection
+        self.centroids = centroids
+        self.assignments = assignments
+        self._index = pd.Index(self.ids)
+        # Row positions grouped by list, with list l at members[offsets[l]:offsets[l + 1]]
+        self.members = np.argsort(assignments, kind="stable")
+        self.offsets = np.concatenate([[0], np.cumsum(np.bincount(assignments, minlength=len(centroids)))])
+
+    def __len__(self):
+        return len(self.ids)
+
+    @classmethod
+    def build(cls, ids, embeddings, dim=SIMILAR_DIM, n_lists=None, random_state=42):
+        n = embeddings.shape[0]
+        dim = min(dim, embeddings.shape[1] - 1, n - 1)
+        projection = TruncatedSVD(n_components=dim, random_state=random_state).fit(embeddings) if dim >= 1 else None
+        dense = _project(projection, embeddings)
+        n_lists = min(n_lists or max(1, int(np.sqrt(n))), n)
+        kmeans = MiniBatchKMeans(n_clusters=n_lists, random_state=random_state, batch_size=4096, n_init=3).fit(dense)
+        return cls(ids, embeddings, projection, normalize(kmeans.cluster_centers_).astype(np.float32), kmeans.labels_)
+
+    def _assign(self, rows):
+        return (_project(self.projection, rows) @ self.centroids.T).argmax(1)
+
+    def with_rows(self, ids, embeddings):
+        """Copy with the given rows replaced (known ids) or appended (new ids), assigned to their nearest list."""
+        ids = np.asarray(ids)
+        keep = np.ones(len(self.ids), dtype=bool)
+        pos = self._index.get_indexer(ids)
+        keep[pos[pos >= 0]] = False
+        return SimilarityIndex(
+            np.concatenate([self.ids[keep], ids]),
+            sparse.vstack([self.embeddings[keep], embeddings], format="csr"),
+            self.projection,
+            self.centroids,
+            np.concatenate([self.assignments[keep], self._assign(embeddings)]),
+        )
+
+    def search(self, vector, k=10, n_probe=SIMILAR_N_PROBE, exclude=()):
+        """Top-k (movie ids, cosine scores) for one embedding row, best first."""
+        scores = self.centroids @ _project(self.projection, vector)[0]
+        n_probe = min(n_probe, len(scores))
+        lists = np.argpartition(-scores, n_probe - 1)[:n_probe]
+        candidates = np.concatenate([self.members[self.offsets[l]:self.offsets[l + 1]] for l in lists])
+        if len(exclude):
+            candidates = candidates[~np.isin(self.ids[candidates], np.fromiter(exclude, dtype=self.ids.dtype))]
+        similarity = (self.embeddings[candidates] @ vector.T).toarray().ravel()
+        top = np.argpartition(-similarity, k - 1)[:k] if len(similarity) > k else np.arange(len(similarity))
+        top = top[np.lexsort((self.ids[candidates[top]], -similarity[top]))]
+        return self.ids[candidates[top]], similarity[top]
+
+    def similar(self, movie_id, k=10, n_probe=SIMILAR_N_PROBE, exclude=()):
+        pos = self._index.get_indexer([movie_id])[0]
+        if pos < 0:
+            raise KeyError(movie_id)
+        return self.search(self.embeddings[pos], k, n_probe, set(exclude) | {movie_id})
+
+    def write(self, writer):
+        writer.add_array("similar_ids", self.ids)
+        writer.add_object("similar_embeddings", self.embeddings)
+        writer.add_object("similar_projection", self.projection)
+        writer.add_array("similar_centroids", self.centroids)
+        writer.add_array("similar_assignments", self.assignments)
+
+    @classmethod
+    def from_bundle(cls, bundle):
+        loaded = bundle.get_many([
+            "similar_ids", "similar_embeddings", "similar_projection", "similar_centroids", "similar_assignments"
+        ])
+        return cls(
+            loaded["similar_ids"], loaded["similar_embeddings"], loaded["similar_projection"],
+            loaded["similar_centroids"], loaded["similar_assignments"]
+        )
@@ -0,0 +1,48 @@
+import json
+from fastapi import HTTPException
+from fastapi.responses import StreamingResponse
+
+try:
+    import orjson
+
+    def dumps(obj) -> bytes:
+        return orjson.dumps(obj, option=orjson.OPT_SERIALIZE_NUMPY)
+except ImportError:
+    def dumps(obj) -> bytes:
+        return json.dumps(obj, default=float).encode()
+
+STREAM_FORMATS = ("ndjson", "json")
+STREAM_BATCH_SIZE = 500
+
+def _ndjson(rows):
+    for row in rows:
+        yield dumps(row) + b"\n"
+
+def _json_array(rows):
+    yield b"["
+    first = True
+    for row in rows:
+        yield dumps(row) if first else b"," + dumps(row)
+        first = False
+    yield b"]"
+
+def stream_response(rows, fmt):
+    """
+    Serialize an iterator of dicts as it is consumed, either as NDJSON or as one chunked JSON
+    array. Sync generators are run in Starlette's threadpool, so they may hit the database.
+    """
+    if fmt == "ndjson":
+        return StreamingResponse(_ndjson(rows), media_type="application/x-ndjson")
+    if fmt == "json":
+        return StreamingResponse(_json_array(rows), media_type="application/json")
+    raise HTTPException(status_code=400, detail="Invalid stream parameter. Use 'ndjson' or 'json'.")
+
+def batched(iterable, size=STREAM_BATCH_SIZE):
+    batch = []
+    for item in iterable:
+        batch.append(item)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
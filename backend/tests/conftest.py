@@ -0,0 +1,24 @@
+import os
+import sys
+import pytest
+
+# Tests import the backend modules directly, like the bench and eval scripts
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+# database.py creates its engine on import; keep the tests off the default PostgreSQL URL
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+@pytest.fixture
+def db():
+    """Session on a fresh in-memory SQLite database with the full schema."""
+    sqlalchemy = pytest.importorskip("sqlalchemy")
+    from sqlalchemy.orm import sessionmaker
+    from sqlalchemy.pool import StaticPool
+    from models import Base
+    engine = sqlalchemy.create_engine("sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False})
+    Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine, autoflush=False)()
+    try:
+        yield session
+    finally:
+        session.close()
+        engine.dispose()
@@ -0,0 +1,65 @@
+import os
+import pytest
+
+np = pytest.importorskip("numpy")
+pytest.importorskip("pandas")
+pytest.importorskip("joblib")
+
+import artifacts
+from artifacts import ArtifactBundle, ArtifactError, ArtifactWriter, current_version_path, publish_version
+
+CENTERS = np.arange(12, dtype=np.float32).reshape(3, 4)
+
+def write_bundle(path):
+    writer = ArtifactWriter(str(path))
+    writer.add_array("centers", CENTERS)
+    writer.add_object("settings", {"k": 3})
+    writer.write(meta={"n_features": 4})
+    return ArtifactBundle(str(path))
+
+def flip_last_byte(path):
+    with open(path, "r+b") as f:
+        f.seek(-1, os.SEEK_END)
+        last = f.read(1)
+        f.seek(-1, os.SEEK_END)
+        f.write(bytes([last[0] ^ 0xFF]))
+
+def test_bundle_round_trip(tmp_path):
+    bundle = write_bundle(tmp_path)
+    bundle.verify()
+    assert bundle.meta == {"n_features": 4}
+    np.testing.assert_array_equal(bundle.get("centers"), CENTERS)
+    assert bundle.get_many(["settings"]) == {"settings": {"k": 3}}
+
+def test_tampered_file_fails_checksum(tmp_path, monkeypatch):
+    monkeypatch.setattr(artifacts, "VERIFY_CHECKSUMS", True)
+    bundle = write_bundle(tmp_path)
+    flip_last_byte(tmp_path / "centers.npy")
+    with pytest.raises(ArtifactError, match="Checksum mismatch"):
+        bundle.verify()
+    with pytest.raises(ArtifactError, match="Checksum mismatch"):
+        bundle.verify(["centers"])
+    bundle.verify(["settings"])
+
+def test_truncated_or_missing_file_fails(tmp_path):
+    bundle = write_bundle(tmp_path)
+    with open(tmp_path / "centers.npy", "ab") as f:
+        f.write(b"\0")
+    with pytest.raises(ArtifactError, match="Size mismatch"):
+        bundle.verify(["centers"])
+    os.remove(tmp_path / "settings.joblib")
+    with pytest.raises(ArtifactError, match="Missing"):
+        bundle.verify(["settings"])
+
+def test_bundle_without_manifest_is_rejected(tmp_path):
+    with pytest.raises(ArtifactError):
+        ArtifactBundle(str(tmp_path))
+
+def test_publish_version_moves_pointer_and_prunes(tmp_path):
+    root = str(tmp_path)
+    assert current_version_path(root) == root
+    for version in ("v1", "v2", "v3", "v4"):
+        write_bundle(tmp_path / "versions" / version)
+        publish_version(version, root, keep=2)
+    assert current_version_path(root) == os.path.join(root, "versions", "v4")
+    assert sorted(os.listdir(tmp_path / "versions")) == ["v3", "v4"]
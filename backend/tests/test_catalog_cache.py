@@ -0,0 +1,51 @@
+import pytest
+
+pytest.importorskip("sqlalchemy")
+
+from catalog import bump_catalog_version
+from catalog_cache import CatalogCache
+from models import Movie
+
+def add_movies(db, *movies):
+    db.add_all(Movie(id=i, title=t, genres=g, numVotes=v) for i, t, g, v in movies)
+    db.commit()
+
+def test_snapshot_is_cached_until_the_catalog_changes(db):
+    add_movies(db, (1, "Alien", "Horror,Sci-Fi", 900), (2, "Heat", "Crime", 650))
+    cache = CatalogCache(version_check_seconds=0)
+    assert [m.id for m in cache.top_movies(db, n=2)] == [1, 2]
+    assert cache.genres(db) == ("Crime", "Horror", "Sci-Fi")
+    assert cache.top_movies(db, n=1)[0].title == "Alien"
+    assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 2
+
+    add_movies(db, (3, "Solaris", "Drama", 1000))
+    bump_catalog_version(db, source="test", added=1)
+    assert [m.id for m in cache.top_movies(db, n=3)] == [3, 1, 2]
+    assert "Drama" in cache.genres(db)
+    assert cache.stats()["invalidations"] == 1
+
+def test_get_movie_caches_misses_and_invalidates(db):
+    add_movies(db, (1, "Alien", "Horror", 900))
+    cache = CatalogCache(version_check_seconds=3600)
+    assert cache.get_movie(db, 1).title == "Alien"
+    assert cache.get_movie(db, 2) is None
+    add_movies(db, (2, "Heat", "Crime", 650))
+    assert cache.get_movie(db, 2) is None  # negative entries live until the next version check
+    cache.invalidate()
+    assert cache.get_movie(db, 2).title == "Heat"
+    assert cache.stats()["cached_movies"] == 1
+
+def test_lru_evicts_oldest_movie(db):
+    add_movies(db, *[(i, f"Movie {i}", "Drama", i) for i in range(1, 4)])
+    cache = CatalogCache(max_entries=2, version_check_seconds=3600)
+    for movie_id in (1, 2, 1, 3):
+        cache.get_movie(db, movie_id)
+    stats = cache.stats()
+    assert stats["evictions"] == 1 and stats["cached_movies"] == 2 and stats["hits"] == 1
+
+def test_current_version_follows_the_catalog(db):
+    add_movies(db, (1, "Alien", "Horror", 900))
+    cache = CatalogCache(version_check_seconds=0)
+    before = cache.current_version(db)
+    bump_catalog_version(db, source="test", updated=1)
+    assert cache.current_version(db) != before
@@ -0,0 +1,45 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+pytest.importorskip("sklearn")
+pytest.importorskip("pandas")
+
+from sklearn.preprocessing import MultiLabelBinarizer
+from clustering import GenreClusterer
+
+COMBOS = [["Horror", "Sci-Fi"], ["Comedy", "Romance"], ["Crime", "Drama", "Thriller"]]
+
+def catalog(n=3000, seed=0):
+    rng = np.random.default_rng(seed)
+    return [list(COMBOS[i]) for i in rng.integers(0, len(COMBOS), n)]
+
+def batches(genres_lists, size):
+    return (genres_lists[start:start + size] for start in range(0, len(genres_lists), size))
+
+def test_fit_batches_separates_distinct_combinations():
+    genres_lists = catalog()
+    mlb = MultiLabelBinarizer().fit(genres_lists)
+    clusterer = GenreClusterer(mlb, n_clusters=3, engine="minibatch")
+    clusterer.fit_batches(batches(genres_lists, 500), n_epochs=5)
+    labels = clusterer.predict(genres_lists)
+    by_combo = {tuple(g): set() for g in COMBOS}
+    for genres, label in zip(genres_lists, labels):
+        by_combo[tuple(genres)].add(int(label))
+    assert all(len(found) == 1 for found in by_combo.values())
+    assert len(set.union(*by_combo.values())) == 3
+
+def test_fit_batches_merges_small_batches_and_falls_back_to_fit():
+    genres_lists = catalog(200)
+    mlb = MultiLabelBinarizer().fit(genres_lists)
+    # One movie per batch: batches are merged until the first partial_fit has n_clusters combinations
+    streamed = GenreClusterer(mlb, n_clusters=3, engine="minibatch").fit_batches(batches(genres_lists, 1))
+    assert streamed.cluster_centers_.shape == (3, 2 * len(mlb.classes_))
+    # More clusters than combinations in the whole catalog: a plain fit on every movie
+    small = GenreClusterer(mlb, n_clusters=5, engine="minibatch").fit_batches(batches(genres_lists, 50))
+    assert len(small.predict(genres_lists)) == len(genres_lists)
+
+def test_fit_batches_requires_the_minibatch_engine():
+    genres_lists = catalog(10)
+    clusterer = GenreClusterer(MultiLabelBinarizer().fit(genres_lists), n_clusters=2, engine="kmeans")
+    with pytest.raises(ValueError):
+        clusterer.fit_batches(batches(genres_lists, 5))
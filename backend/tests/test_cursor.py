@@ -0,0 +1,40 @@
+import base64
+import json
+import pytest
+
+for module in ("fastapi", "jose", "passlib", "dotenv", "sqlalchemy", "numpy", "pandas", "sklearn", "xgboost"):
+    pytest.importorskip(module)
+
+from fastapi import HTTPException
+from main import decode_cursor, encode_cursor
+
+def raw_cursor(payload):
+    return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode()
+
+@pytest.mark.parametrize("sort_value, movie_id", [(8.5, 42), (0, 1), (1234567, 99)])
+def test_round_trip(sort_value, movie_id):
+    assert decode_cursor(encode_cursor(sort_value, movie_id), "averageRating") == (sort_value, movie_id)
+
+@pytest.mark.parametrize("cursor", [
+    "not base64!",
+    raw_cursor({"value": 1}),
+    raw_cursor([8.5]),
+    raw_cursor(["8.5", 42]),
+    raw_cursor([[8.5], 42]),
+    raw_cursor([{"$gt": 0}, 42]),
+    raw_cursor([True, 42]),
+    raw_cursor([8.5, "42"]),
+    raw_cursor([8.5, 4.2]),
+    raw_cursor([None, 42]),
+    base64.urlsafe_b64encode(b'[NaN, 42]').decode(),
+])
+def test_tampered_cursor_is_a_400(cursor):
+    with pytest.raises(HTTPException) as excinfo:
+        decode_cursor(cursor, "averageRating", allow_null=True)
+    assert excinfo.value.status_code == 400
+
+def test_null_sort_value_only_for_sql_relevance():
+    cursor = raw_cursor([None, 42])
+    assert decode_cursor(cursor, "relevance", allow_null=True) == (None, 42)
+    with pytest.raises(HTTPException):
+        decode_cursor(cursor, "relevance")
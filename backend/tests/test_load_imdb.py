@@ -0,0 +1,130 @@
+import pytest
+
+pd = pytest.importorskip("pandas")
+pytest.importorskip("sqlalchemy")
+
+from sqlalchemy.orm import sessionmaker
+import load_imdb
+from load_imdb import _changed_mask, _resolve_ids, backfill_tconst, load_imdb_data, refresh_catalog
+from models import Movie
+
+@pytest.fixture
+def catalog(db, monkeypatch):
+    # Point the loader's engine and sessions at the test database
+    bind = db.get_bind()
+    monkeypatch.setattr(load_imdb, "engine", bind)
+    monkeypatch.setattr(load_imdb, "SessionLocal", sessionmaker(bind=bind, autoflush=False))
+    return db
+
+def write_csv(path, rows):
+    pd.DataFrame(rows).to_csv(path, index=False)
+    return str(path)
+
+def stored(db):
+    db.expire_all()
+    return {m.id: m for m in db.query(Movie)}
+
+def test_changed_mask_treats_missing_values_as_equal():
+    old = pd.DataFrame({"title": ["Alien", "Heat", None], "averageRating": [8.5, None, 7.0]})
+    new = pd.DataFrame({"title": ["Alien", "Heat", None], "averageRating": [8.6, None, 7.0]})
+    assert _changed_mask(new, old, ["title", "averageRating"]).tolist() == [True, False, False]
+    assert _changed_mask(new, old, ["title"]).tolist() == [False, False, False]
+
+def test_resolve_ids_keeps_stored_ids_and_avoids_clashes(db):
+    db.add_all([Movie(id=1, tconst="tt1", title="Alien"), Movie(id=2, tconst="tt2", title="Heat")])
+    db.commit()
+    chunk = pd.DataFrame({
+        "id": [7, 2, 9, 10],
+        "tconst": ["tt1", "tt9", "tt10", None],
+        "title": ["Alien", "Solaris", "Stalker", "Untagged"],
+    })
+    resolved, next_id = _resolve_ids(db, chunk, next_id=3)
+    # tt1 keeps id 1, tt9 cannot take id 2 (Heat) and gets one past every id in the chunk
+    assert resolved["id"].tolist() == [1, 11, 9, 10]
+    assert next_id == 12
+
+def test_full_load_upserts_on_tconst(catalog, tmp_path):
+    catalog.add(Movie(id=1, tconst="tt1", title="Alien", averageRating=8.5))
+    catalog.commit()
+    csv = write_csv(tmp_path / "imdb.csv", [
+        {"id": 5, "tconst": "tt1", "title": "Alien", "averageRating": 8.6},
+        {"id": 1, "tconst": "tt9", "title": "Solaris", "averageRating": 8.1},
+    ])
+    assert load_imdb_data(csv) == 2
+    movies = stored(catalog)
+    assert (movies[1].tconst, movies[1].averageRating) == ("tt1", 8.6)
+    assert (movies[2].tconst, movies[2].title) == ("tt9", "Solaris")
+    assert len(movies) == 2
+
+def test_refresh_updates_changed_and_appends_new_titles(catalog, tmp_path):
+    catalog.add_all([
+        Movie(id=1, tconst="tt1", title="Alien", genres="Horror", averageRating=8.5, numVotes=900),
+        Movie(id=2, tconst="tt2", title="Heat", genres="Crime", averageRating=8.3, numVotes=650),
+    ])
+    catalog.commit()
+    csv = write_csv(tmp_path / "imdb.csv", [
+        {"id": 40, "tconst": "tt1", "title": "Alien", "genres": "Horror", "averageRating": 8.6, "numVotes": 950},
+        {"id": 41, "tconst": "tt2", "title": "Heat", "genres": "Crime", "averageRating": 8.3, "numVotes": 650},
+        {"id": 42, "tconst": "tt3", "title": "Solaris", "genres": "Sci-Fi", "averageRating": 8.1, "numVotes": 90},
+    ])
+    updated, added, text_changed = refresh_catalog(csv)
+    assert (updated, added, text_changed) == ([1], [3], True)
+    movies = stored(catalog)
+    assert (movies[1].averageRating, movies[1].numVotes) == (8.6, 950)
+    assert (movies[3].tconst, movies[3].title) == ("tt3", "Solaris")
+
+    # A second refresh from the same snapshot is a no-op
+    assert refresh_catalog(csv) == ([], [], False)
+
+def test_backfill_tconst_skips_ambiguous_keys(catalog, tmp_path):
+    catalog.add_all([
+        Movie(id=1, title="Alien", startYear=1979),
+        Movie(id=2, title="Heat", startYear=1995),
+        Movie(id=3, title="Heat", startYear=1995),
+        Movie(id=4, title="Solaris", startYear=1972),
+        Movie(id=5, title="Stalker", startYear=1979),
+    ])
+    catalog.commit()
+    csv = write_csv(tmp_path / "imdb.csv", [
+        {"id": 1, "tconst": "tt1", "title": "Alien", "startYear": 1979},
+        {"id": 2, "tconst": "tt2", "title": "Heat", "startYear": 1995},
+        {"id": 3, "tconst": "tt4", "title": "Solaris", "startYear": 1972},
+        {"id": 4, "tconst": "tt5", "title": "Solaris", "startYear": 1972},
+        {"id": 5, "tconst": "tt6", "title": "Stalker", "startYear": 1980},
+    ])
+    assert backfill_tconst(csv) == 1
+    assert {i: m.tconst for i, m in stored(catalog).items()} == {1: "tt1", 2: None, 3: None, 4: None, 5: None}
+
+def test_full_load_refuses_an_untagged_catalog(catalog, tmp_path):
+    catalog.add_all([Movie(id=1, title="Alien", averageRating=8.5), Movie(id=2, title="Heat", averageRating=8.3)])
+    catalog.commit()
+    csv = write_csv(tmp_path / "imdb.csv", [
+        {"id": 1, "tconst": "tt1", "title": "Alien", "averageRating": 8.6},
+        {"id": 2, "tconst": "tt2", "title": "Heat", "averageRating": 8.3},
+    ])
+    with pytest.raises(SystemExit, match="backfill-tconst"):
+        load_imdb_data(csv)
+    assert {i: (m.tconst, m.averageRating) for i, m in stored(catalog).items()} == {1: (None, 8.5), 2: (None, 8.3)}
+
+def test_full_load_without_tconst_stays_keyed_on_id(catalog, tmp_path):
+    catalog.add(Movie(id=1, title="Alien", averageRating=8.5))
+    catalog.commit()
+    csv = write_csv(tmp_path / "imdb.csv", [
+        {"id": 1, "title": "Alien", "averageRating": 8.6},
+        {"id": 2, "title": "Heat", "averageRating": 8.3},
+    ])
+    assert load_imdb_data(csv) == 2
+    assert load_imdb_data(csv) == 2
+    assert {i: m.averageRating for i, m in stored(catalog).items()} == {1: 8.6, 2: 8.3}
+
+def test_full_load_after_backfill(catalog, tmp_path):
+    catalog.add_all([Movie(id=1, title="Alien", startYear=1979), Movie(id=2, title="Heat", startYear=1995)])
+    catalog.commit()
+    csv = write_csv(tmp_path / "imdb.csv", [
+        {"id": 1, "tconst": "tt1", "title": "Alien", "startYear": 1979},
+        {"id": 2, "tconst": "tt2", "title": "Heat", "startYear": 1995},
+        {"id": 3, "tconst": "tt3", "title": "Solaris", "startYear": 1972},
+    ])
+    assert backfill_tconst(csv) == 2
+    assert load_imdb_data(csv) == 3
+    assert {i: m.tconst for i, m in stored(catalog).items()} == {1: "tt1", 2: "tt2", 3: "tt3"}
@@ -0,0 +1,72 @@
+import asyncio
+import pytest
+
+pytest.importorskip("fastapi")
+
+from recommendation_cache import LocalBackend, RecommendationCache
+
+RESULTS = [{"id": 1, "title": "Alien", "predictedRating": 7.5}]
+
+def run(coro):
+    return asyncio.run(coro)
+
+def test_rating_change_invalidates_the_users_entry():
+    cache = RecommendationCache(LocalBackend())
+
+    async def scenario():
+        key = await cache.key(7, "v1:xgb")
+        assert await cache.get(7, key) is None
+        await cache.set(7, key, RESULTS)
+        assert await cache.get(7, await cache.key(7, "v1:xgb")) == RESULTS
+        await cache.invalidate_user(7)
+        assert await cache.get(7, await cache.key(7, "v1:xgb")) is None
+        assert await cache.get(7, key) is None
+
+    run(scenario())
+    assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 3 and cache.stats()["invalidations"] == 1
+    assert cache.stats()["entries"] == 0 and cache.stats()["bytes"] == 0
+
+def test_model_version_is_part_of_the_key():
+    cache = RecommendationCache(LocalBackend())
+
+    async def scenario():
+        await cache.set(7, await cache.key(7, "v1:xgb"), RESULTS)
+        return await cache.get(7, await cache.key(7, "v2:xgb"))
+
+    assert run(scenario()) is None
+
+def test_result_computed_before_a_rating_is_not_served_after_it():
+    cache = RecommendationCache(LocalBackend())
+
+    async def scenario():
+        key = await cache.key(7, "v1:xgb")  # taken before computing
+        await cache.invalidate_user(7)       # a rating lands while computing
+        await cache.set(7, key, RESULTS)
+        return await cache.get(7, await cache.key(7, "v1:xgb"))
+
+    assert run(scenario()) is None
+
+def test_local_backend_is_bounded_by_entries_and_bytes():
+    backend = LocalBackend(max_entries=2, max_bytes=10)
+
+    async def scenario():
+        await backend.set(1, "a", b"1234")
+        await backend.set(2, "b", b"1234")
+        await backend.set(3, "c", b"1234")
+        assert await backend.get(1, "a") is None
+        await backend.set(2, "b2", b"123456789")
+        assert await backend.get(3, "c") is None and await backend.get(2, "b2") == b"123456789"
+
+    run(scenario())
+    assert backend.stats()["evictions"] == 2 and backend.bytes == 9
+
+def test_catalog_refresh_makes_entries_unreachable():
+    cache = RecommendationCache(LocalBackend())
+
+    async def scenario():
+        await cache.set(7, await cache.key(7, "v1:xgb", "v1-3-3-0-0"), RESULTS)
+        fresh = await cache.get(7, await cache.key(7, "v1:xgb", "v1-3-3-0-0"))
+        refreshed = await cache.get(7, await cache.key(7, "v1:xgb", "v2-4-4-0-0"))
+        return fresh, refreshed
+
+    assert run(scenario()) == (RESULTS, None)
@@ -0,0 +1,110 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+pytest.importorskip("sqlalchemy")
+
+from sqlalchemy import and_, or_
+from models import Movie
+from search_index import SearchIndex, sql_search_query
+
+# (id, title, averageRating, numVotes, genres); ties and NULL ratings straddle the page boundaries
+MOVIES = [
+    (1, "Alien", 8.5, 900, "Horror, Sci-Fi"),
+    (2, "Aliens", 8.4, 700, "Action, Sci-Fi"),
+    (3, "Alien 3", 6.4, None, "Horror"),
+    (4, "Heat", 8.3, 650, "Crime, Drama"),
+    (5, "Unrated A", None, 3, "Drama"),
+    (6, "Tied A", 7.0, 100, "Drama"),
+    (7, "Tied B", 7.0, 100, "Drama"),
+    (8, "Unrated B", None, None, None),
+    (9, "Tied C", 7.0, 100, "Comedy"),
+    (10, "Solaris", 8.1, 90, "Sci-Fi"),
+]
+
+def expected_order(sort_by, sort_order):
+    column = {"averageRating": 2, "numVotes": 3}[sort_by]
+    keyed = [((m[column] or 0), m[0]) for m in MOVIES]
+    return [i for _, i in sorted(keyed, reverse=sort_order == "desc")]
+
+def search_index():
+    ids, titles, ratings, votes, genres = zip(*MOVIES)
+    return SearchIndex(ids, titles, ratings, votes, genres, [None] * len(ids), [None] * len(ids))
+
+@pytest.mark.parametrize("sort_by", ["averageRating", "numVotes"])
+@pytest.mark.parametrize("sort_order", ["desc", "asc"])
+def test_search_index_pages_cover_every_row_once(sort_by, sort_order):
+    index = search_index()
+    seen, after = [], None
+    while True:
+        page, after, total = index.search(sort_by=sort_by, sort_order=sort_order, after=after, limit=3)
+        seen.extend(page)
+        assert total == len(MOVIES)
+        if after is None:
+            break
+    assert seen == expected_order(sort_by, sort_order)
+
+def test_search_index_filters_and_relevance():
+    index = search_index()
+    page, after, total = index.search(title="alien", sort_by="relevance", limit=10)
+    assert page[0] == 1 and set(page) == {1, 2, 3} and total == 3 and after is None
+    page, _, _ = index.search(genres="sci-fi", sort_by="averageRating", limit=10)
+    assert page == [1, 2, 10]
+
+def sql_page(db, sort_by, sort_order, after, limit):
+    # Same keyset predicate as main.sql_search_page
+    db_query, sort_expr = sql_search_query(db, sort_by=sort_by)
+    if after:
+        value, last_id = after
+        if sort_order == "desc":
+            db_query = db_query.filter(or_(sort_expr < value, and_(sort_expr == value, Movie.id < last_id)))
+        else:
+            db_query = db_query.filter(or_(sort_expr > value, and_(sort_expr == value, Movie.id > last_id)))
+    if sort_order == "desc":
+        db_query = db_query.order_by(sort_expr.desc(), Movie.id.desc())
+    else:
+        db_query = db_query.order_by(sort_expr.asc(), Movie.id.asc())
+    rows = db_query.limit(limit + 1).all()
+    next_key = (rows[limit - 1][1], rows[limit - 1][0].id) if len(rows) > limit else None
+    return [movie.id for movie, _ in rows[:limit]], next_key
+
+@pytest.mark.parametrize("sort_by", ["averageRating", "numVotes"])
+@pytest.mark.parametrize("sort_order", ["desc", "asc"])
+def test_sql_keyset_pages_survive_null_sort_values(db, sort_by, sort_order):
+    db.add_all(Movie(id=i, title=t, averageRating=r, numVotes=v, genres=g) for i, t, r, v, g in MOVIES)
+    db.commit()
+    seen, after = [], None
+    while True:
+        page, after = sql_page(db, sort_by, sort_order, after, limit=3)
+        assert after is None or after[0] is not None
+        seen.extend(page)
+        if after is None:
+            break
+    assert seen == expected_order(sort_by, sort_order)
+
+def test_trigram_similarity_matches_pg_trgm():
+    from search_index import trigram_similarity, word_trigrams
+    # SELECT show_trgm('word'), similarity('word', 'two words') on PostgreSQL
+    assert word_trigrams("Word") == {"  w", " wo", "wor", "ord", "rd "}
+    assert trigram_similarity("word", "two words") == pytest.approx(4 / 11)
+    assert trigram_similarity("alien", "Alien") == 1.0
+    assert trigram_similarity("", "alien") == 0.0
+
+def test_ensure_search_tables_builds_missing_tables(db):
+    from models import Genre, Person
+    from search_index import ensure_search_tables
+    db.add_all(Movie(id=i, title=t, averageRating=r, numVotes=v, genres=g) for i, t, r, v, g in MOVIES)
+    db.add(Movie(id=11, title="Solaris (1972)", genres="Sci-Fi", directors="Andrei Tarkovsky"))
+    db.commit()
+    ensure_search_tables(db)
+    assert db.query(Genre).count() == 6 and db.query(Person).count() == 1
+    db_query, _ = sql_search_query(db, genres="sci", directors="tarkovsky")
+    assert [movie.id for movie, _ in db_query] == [11]
+
+def test_search_index_records_catalog_version(db):
+    from catalog import bump_catalog_version, catalog_signature
+    db.add(Movie(id=1, title="Alien", averageRating=8.5, numVotes=900))
+    db.commit()
+    index = SearchIndex.from_db(db)
+    assert index.catalog_version == catalog_signature(db)
+    bump_catalog_version(db, source="test", updated=1)
+    assert index.catalog_version != catalog_signature(db)
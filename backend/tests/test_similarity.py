@@ -0,0 +1,62 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+pytest.importorskip("pandas")
+pytest.importorskip("sklearn")
+sparse = pytest.importorskip("scipy.sparse")
+
+from sklearn.preprocessing import normalize
+from similarity import SimilarityIndex
+
+def embeddings(n, dim=60, seed=0):
+    # Clustered sparse unit rows, so the IVF lists mean something
+    rng = np.random.default_rng(seed)
+    centers = rng.random((8, dim)) * (rng.random((8, dim)) < 0.2)
+    rows = centers[rng.integers(0, 8, n)] + rng.random((n, dim)) * (rng.random((n, dim)) < 0.1)
+    return normalize(sparse.csr_matrix(rows, dtype=np.float32))
+
+def exact_top(matrix, pos, k):
+    similarity = (matrix @ matrix[pos].T).toarray().ravel()
+    similarity[pos] = -np.inf
+    return set(np.argsort(-similarity, kind="stable")[:k])
+
+def test_probing_every_list_is_exact():
+    matrix = embeddings(400)
+    ids = np.arange(1, 401)
+    index = SimilarityIndex.build(ids, matrix, dim=16)
+    for pos in range(0, 400, 40):
+        found, scores = index.similar(ids[pos], k=5, n_probe=len(index.centroids))
+        assert set(found - 1) == exact_top(matrix, pos, 5)
+        assert ids[pos] not in found and np.all(np.diff(scores) <= 1e-6)
+
+def test_default_probe_recall_against_brute_force():
+    matrix = embeddings(2000, seed=1)
+    ids = np.arange(1, 2001)
+    index = SimilarityIndex.build(ids, matrix, dim=16)
+    queries = range(0, 2000, 20)
+    hits = sum(len(exact_top(matrix, pos, 10) & set(index.similar(ids[pos], k=10)[0] - 1)) for pos in queries)
+    assert hits / (10 * len(queries)) >= 0.9
+
+def test_with_rows_replaces_and_appends():
+    matrix = embeddings(300, seed=2)
+    index = SimilarityIndex.build(np.arange(1, 301), matrix, dim=16)
+    # Movie 1 becomes a copy of movie 2, and movie 301 a copy of movie 3
+    patched = index.with_rows(np.array([1, 301]), sparse.vstack([matrix[1], matrix[2]], format="csr"))
+    assert len(patched) == 301 and len(index) == 300
+    n_probe = len(index.centroids)
+    assert patched.similar(1, k=1, n_probe=n_probe)[0][0] == 2
+    assert patched.similar(301, k=1, n_probe=n_probe)[0][0] == 3
+    with pytest.raises(KeyError):
+        index.similar(301)
+
+def test_bundle_round_trip(tmp_path):
+    pytest.importorskip("joblib")
+    from artifacts import ArtifactBundle, ArtifactWriter
+    matrix = embeddings(200, seed=3)
+    index = SimilarityIndex.build(np.arange(1, 201), matrix, dim=8)
+    writer = ArtifactWriter(str(tmp_path))
+    index.write(writer)
+    writer.write()
+    loaded = SimilarityIndex.from_bundle(ArtifactBundle(str(tmp_path)))
+    for movie_id in (1, 50, 200):
+        np.testing.assert_array_equal(loaded.similar(movie_id, k=5)[0], index.similar(movie_id, k=5)[0])
@@ -1,14 +1,11 @@
 from database import get_db
-from models import Movie, Rating
-from recommender import Recommender
+from recommender import load_or_fit_recommender
 from predict import RatingPredictor
 
 db = next(get_db())
-recommender = Recommender(db)
-movies = db.query(Movie).all()
-ratings = db.query(Rating).all()
+recommender = load_or_fit_recommender(db)
 mlb_genres = recommender.mlb_genres
 
 rating_predictor = RatingPredictor(model_dir="models")
-rating_predictor.fit(movies, ratings, mlb_genres)
+rating_predictor.fit(db, mlb_genres, feature_store=recommender.feature_store)
 print("Model trained and saved.")
\ No newline at end of file
@@ -0,0 +1,38 @@
+import time
+import numpy as np
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+from models import Movie, Rating
+from utils import extract_features_many
+
+def count_ratings(db: Session) -> int:
+    return db.query(func.count(Rating.id)).join(Movie, Rating.movie_id == Movie.id).scalar() or 0
+
+def iter_rating_batches(db: Session, mlb_genres, batch_size=100000, feature_store=None, timings=None):
+    """
+    Yield (X, y) batches for every rating joined to its movie on the database side.
+    Rows are streamed with yield_per, so only one batch of rows and features is held at a time.
+    """
+    query = (
+        db.query(Movie.id, Movie.genres, Movie.averageRating, Movie.numVotes, Rating.rating)
+        .join(Movie, Rating.movie_id == Movie.id)
+        .order_by(Rating.id)
+        .yield_per(batch_size)
+    )
+    rows = []
+    started = time.perf_counter()
+    for row in query:
+        rows.append(row)
+        if len(rows) == batch_size:
+            yield _to_batch(rows, mlb_genres, feature_store, timings, started)
+            rows = []
+            started = time.perf_counter()
+    if rows:
+        yield _to_batch(rows, mlb_genres, feature_store, timings, started)
+
+def _to_batch(rows, mlb_genres, feature_store, timings, started):
+    X = extract_features_many(rows, mlb_genres, feature_store)
+    y = np.array([r.rating for r in rows], dtype=float)
+    if timings is not None:
+        timings["load"] = timings.get("load", 0.0) + time.perf_counter() - started
+    return X, y
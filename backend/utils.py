@@ -12,4 +12,23 @@ def extract_features(movie, mlb_genres):
 
     # Combine all features
     features = np.concatenate([genres_vec, [avg_rating, num_votes]])
-    return features
\ No newline at end of file
+    return features
+
+def build_feature_matrix(genres_lists, avg_ratings, num_votes, mlb_genres):
+    # Same layout as extract_features, one row per movie, with a single mlb_genres.transform call
+    genres_mat = mlb_genres.transform(genres_lists)
+    numeric = np.nan_to_num(np.column_stack([avg_ratings, num_votes]).astype(float))  # None/NaN -> 0
+    return np.hstack([genres_mat, genres_mat, numeric])
+
+def extract_features_many(movies, mlb_genres, feature_store=None):
+    movies = list(movies)
+    if not movies:
+        return np.empty((0, 2 * len(mlb_genres.classes_) + 2))
+    if feature_store is not None:
+        ids = [m.id for m in movies]
+        if feature_store.contains_all(ids):
+            return feature_store.rows(ids)
+    genres_lists = [m.genres.split(", ") if isinstance(m.genres, str) and m.genres else [] for m in movies]
+    avg_ratings = [m.averageRating for m in movies]
+    num_votes = [m.numVotes for m in movies]
+    return build_feature_matrix(genres_lists, avg_ratings, num_votes, mlb_genres)
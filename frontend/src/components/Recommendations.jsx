@@ -18,6 +18,8 @@ const titleTypeMap = {
   videoGame: "Video Game"
 };
 
+const RETRAIN_POLL_MS = 2000;
+
 function Recommendations() {
   const { logout } = useContext(AuthContext);
   const [recommendations, setRecommendations] = useState([]);
@@ -83,10 +85,16 @@ function Recommendations() {
   const handleRefresh = async () => {
     setRefreshing(true);
     try {
-      // Call backend endpoint to retrain KMeans and recommender
-      await axios.post(`${apiUrl}/retrain-recommender`, {}, {
-        headers: { Authorization: `Bearer ${token}` }
-      });
+      // Retraining runs as a background job: start it, then poll its status until it finishes
+      const headers = { Authorization: `Bearer ${token}` };
+      let { data: job } = await axios.post(`${apiUrl}/retrain-recommender`, {}, { headers });
+      while (job.status === 'running') {
+        await new Promise(resolve => setTimeout(resolve, RETRAIN_POLL_MS));
+        ({ data: job } = await axios.get(`${apiUrl}/retrain-recommender/${job.job_id}`, { headers }));
+      }
+      if (job.status !== 'done') {
+        throw new Error(job.error || 'Retraining failed');
+      }
       // After retraining, fetch new recommendations
       await fetchRecommendations();
     } catch (err) {
@@ -342,7 +350,7 @@ function Recommendations() {
                   <TableCell align="center">
                     {/* Predicted column with Predict button */}
                     {predicted[movie.id] !== undefined ? (
-                      predicted[movie.id].toFixed(2)
+                      predicted[movie.id] === null ? 'n/a' : predicted[movie.id].toFixed(2)
                     ) : (
                       <Button
                         size="small"
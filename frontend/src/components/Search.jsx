@@ -24,6 +24,7 @@ function Search() {
   const [sortBy, setSortBy] = useState('averageRating');
   const [sortOrder, setSortOrder] = useState('desc');
   const [results, setResults] = useState([]);
+  const [nextCursor, setNextCursor] = useState(null);
   const [loading, setLoading] = useState(false);
   const [error, setError] = useState(null);
   const [predicted, setPredicted] = useState({});
@@ -107,25 +108,27 @@ function Search() {
 
   useEffect(() => { setDomReady(true); }, []);
 
-  const handleSearch = async (query = searchQuery, type = searchType) => {
+  const handleSearch = async (query = searchQuery, type = searchType, cursor = null) => {
   if (!query || query.trim().length < 3) {
     setError('Invalid input, please try again.');
     setResults([]);
+    setNextCursor(null);
     return;
   }
   setLoading(true);
   try {
     const response = await axios.post(
       `${apiUrl}/search`,
-      { [type]: query, sort_by: sortBy, sort_order: sortOrder },
+      { [type]: query, sort_by: sortBy, sort_order: sortOrder, cursor },
       { headers: { Authorization: `Bearer ${token}` } }
     );
     // Attach userRating to each result
-    const resultsWithRatings = response.data.map(movie => ({
+    const resultsWithRatings = response.data.items.map(movie => ({
       ...movie,
       userRating: userRatings[movie.id]
     }));
-    setResults(resultsWithRatings);
+    setResults(prev => (cursor ? [...prev, ...resultsWithRatings] : resultsWithRatings));
+    setNextCursor(response.data.next_cursor);
     setError(null);
     } catch (err) {
       setError('Failed to fetch search results. Please try again later.');
@@ -568,7 +571,7 @@ function Search() {
                   <TableCell align="center">
                     {/* Predicted logic */}
                     {predicted[movie.id] !== undefined ? (
-                      predicted[movie.id].toFixed(2)
+                      predicted[movie.id] === null ? 'n/a' : predicted[movie.id].toFixed(2)
                     ) : (
                       <Button
                         size="small"
@@ -607,6 +610,16 @@ function Search() {
               ))}
             </TableBody>
           </Table>
+          {nextCursor && (
+            <Button
+              onClick={() => handleSearch(searchQuery, searchType, nextCursor)}
+              disabled={loading}
+              fullWidth
+              sx={{ py: 1.5, color: '#fff', textTransform: 'none', fontFamily: "'Archivo', Arial, sans-serif" }}
+            >
+              Load more
+            </Button>
+          )}
         </Paper>
       )}
     </Layout>
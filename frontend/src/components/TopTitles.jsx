@@ -297,7 +297,7 @@ function TopTitles() {
                   <TableCell align="center">
                     {/* Predicted logic */}
                     {predicted[movie.id] !== undefined ? (
-                      predicted[movie.id].toFixed(2)
+                      predicted[movie.id] === null ? 'n/a' : predicted[movie.id].toFixed(2)
                     ) : (
                       <Button
                         size="small"